@@ -80,6 +80,20 @@ def build():
         '--hidden-import=services.calculator',
         '--hidden-import=kr_etf_investor.loader',
         '--hidden-import=kr_etf_investor.portfolio',
+        '--hidden-import=kr_etf_investor.universe_store',
+        '--hidden-import=kr_etf_investor.universe_snapshot',
+        '--hidden-import=kr_etf_investor.universe_db',
+        '--hidden-import=kr_etf_investor.price_history_cache',
+        '--hidden-import=kr_etf_investor.async_session',
+        '--hidden-import=kr_etf_investor.rate_limiter',
+        '--hidden-import=kr_etf_investor.refresh_planner',
+        '--hidden-import=kr_etf_investor.response_cache',
+        '--hidden-import=kr_etf_investor.krx_daily_store',
+        '--hidden-import=kr_etf_investor.trading_calendar',
+        '--hidden-import=kr_etf_investor.parse_pool',
+        '--hidden-import=kr_etf_investor.num_parse',
+        '--hidden-import=kr_etf_investor.fnguide_snapshot',
+        '--hidden-import=kr_etf_investor.progress_events',
         '--hidden-import=kr_etf_investor.flask_app',
     ])
 
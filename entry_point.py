@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 import webbrowser
@@ -44,6 +45,9 @@ def setup_tray():
         print(f"Tray Icon Error: {e}")
 
 if __name__ == "__main__":
+    # Parse workers (kr_etf_investor.parse_pool) are spawned from the frozen exe
+    multiprocessing.freeze_support()
+
     # Singleton Pattern Checks (Windows)
     try:
         import ctypes
@@ -0,0 +1,217 @@
+"""
+Shared Async HTTP Session
+✅ 백그라운드 스레드 하나가 asyncio 이벤트 루프를 계속 돌리며 aiohttp.ClientSession 1개를 소유
+   - 호출마다 asyncio.run() + 새 세션/커넥터를 만들지 않음
+   - keep-alive 커넥션, TLS 세션, DNS 캐시를 전체 갱신/가격 갱신 간에 재사용
+✅ 동기 코드(Flask 핸들러, loader.load_data)는 run() 으로 코루틴을 제출하고 결과를 기다림
+✅ RunSession + @single_flight: 한 번의 갱신(run) 안에서 같은 URL 요청은 진행 중이든 완료됐든 1번만 수행
+   - 종목 단위 scope() 가 끝나면 그 종목 응답은 memo 에서 제거, 그 외 응답도 MEMO_MAX_ENTRIES 개까지만 보관
+   - 기다리던 호출이 모두 취소되면 공유 요청도 취소 (중단 후 요청이 계속 돌지 않음)
+"""
+
+import asyncio
+import atexit
+import contextlib
+import contextvars
+import copy
+import functools
+import sys
+import threading
+from collections import OrderedDict
+
+import aiohttp
+
+# Hard ceilings of the pool; rate_limiter adapts the actual per-host concurrency below them
+CONNECTION_LIMIT = 48
+CONNECTION_LIMIT_PER_HOST = 16
+DNS_CACHE_TTL = 300 # seconds
+KEEPALIVE_TIMEOUT = 60 # seconds an idle connection stays in the pool
+REQUEST_TIMEOUT = 60 # default total timeout per request (fetchers pass shorter ones)
+
+# Finished responses kept per run outside of a scope (e.g. the ETF list); oldest are dropped first
+MEMO_MAX_ENTRIES = 256
+
+# Scope (e.g. ticker) of the task issuing a request; inherited by the tasks it creates
+_MEMO_SCOPE = contextvars.ContextVar("memo_scope", default=None)
+
+
+class AsyncSessionRunner:
+    """
+    Owns a daemon thread running an event loop and one pooled ClientSession
+    created on that loop. Coroutines always run on the loop thread.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is not None and self._thread.is_alive():
+                return self._loop
+            if sys.platform == 'win32':
+                # Same selector loop the old asyncio.run() calls used on Windows
+                loop = asyncio.SelectorEventLoop()
+            else:
+                loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=_run, name="aiohttp-loop", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            self._session = None
+            return loop
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            conn = aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=conn, timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+            )
+        return self._session
+
+    async def _call(self, fn, args, kwargs):
+        session = await self._get_session()
+        return await fn(session, *args, **kwargs)
+
+    def run(self, fn, *args, timeout=None, **kwargs):
+        """
+        Blocking: runs `await fn(session, *args, **kwargs)` on the loop thread
+        and returns its result. On timeout the coroutine is cancelled.
+        """
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._call(fn, args, kwargs), loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def submit(self, fn, *args, **kwargs):
+        """Non-blocking variant of run(): returns a concurrent.futures.Future."""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._call(fn, args, kwargs), loop)
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None or not loop.is_running():
+            return
+
+        async def _close():
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_close(), loop).result(5)
+        except Exception as e:
+            print(f"[Session] Close error: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+
+
+class RunSession:
+    """
+    Wraps the shared session for one update/refresh run and carries its
+    request memo. Everything else is delegated to the wrapped session.
+    """
+
+    def __init__(self, session, max_entries=MEMO_MAX_ENTRIES):
+        self._session = session
+        self.max_entries = max_entries
+        self.memo = OrderedDict() # key (URL) -> asyncio.Future of the parsed result
+        self._scoped = {} # scope -> keys requested inside it
+        self._waiters = {} # future -> number of callers awaiting it
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    @contextlib.contextmanager
+    def scope(self, name):
+        """Responses requested inside (one ticker) leave the memo when the block exits."""
+        token = _MEMO_SCOPE.set(name)
+        try:
+            yield
+        finally:
+            _MEMO_SCOPE.reset(token)
+            for key in self._scoped.pop(name, ()):
+                future = self.memo.get(key)
+                if future is not None and future.done():
+                    del self.memo[key]
+
+    def _remember(self, key, future):
+        self.memo[key] = future
+        scope = _MEMO_SCOPE.get()
+        if scope is not None:
+            self._scoped.setdefault(scope, set()).add(key)
+        excess = len(self.memo) - self.max_entries
+        if excess > 0:
+            for old in [k for k, f in self.memo.items() if f.done()][:excess]:
+                del self.memo[old]
+
+    async def share(self, key, factory):
+        """Result of the request for `key`, starting factory() unless one is in flight or done."""
+        future = self.memo.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._remember(key, future)
+        else:
+            self.memo.move_to_end(key)
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Last caller cancelled (stop/timeout): cancel the request instead of letting it run on
+            if self._waiters[future] == 1 and not future.done():
+                future.cancel()
+                if self.memo.get(key) is future:
+                    del self.memo[key]
+            raise
+        finally:
+            left = self._waiters.pop(future) - 1
+            if left:
+                self._waiters[future] = left
+
+
+def single_flight(key_fn):
+    """
+    Decorator for `async def fetch(session, *args)`: with a RunSession, calls
+    with the same key share one request (in flight or already finished).
+    Each caller gets its own copy of the result since callers patch them.
+    Without a RunSession the fetcher runs as usual.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(session, *args, **kwargs):
+            if not isinstance(session, RunSession):
+                return await fn(session, *args, **kwargs)
+            key = key_fn(*args, **kwargs)
+            result = await session.share(key, lambda: fn(session, *args, **kwargs))
+            return copy.deepcopy(result)
+        return wrapper
+    return decorator
+
+
+_RUNNER = None
+_RUNNER_LOCK = threading.Lock()
+
+def get_runner():
+    """Process-wide runner shared by loader and flask_app."""
+    global _RUNNER
+    with _RUNNER_LOCK:
+        if _RUNNER is None:
+            _RUNNER = AsyncSessionRunner()
+            atexit.register(_RUNNER.close)
+        return _RUNNER
@@ -5,6 +5,8 @@ import os
 import sys
 import threading
 import time
+from queue import Empty
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
 
 APP_NAME = "KR ETF Dividend Insight"
@@ -16,9 +18,15 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from datetime import datetime, timedelta
 from pykrx import stock
+import numpy as np
 from .portfolio import PortfolioStorage
 import threading
 from . import loader
+from . import universe_store
+from . import price_history_cache
+from . import refresh_planner
+from . import progress_events
+from .price_history_cache import to_epoch_days
 from services.calculator import calculate_div_simulation
 
 def get_base_path():
@@ -58,11 +66,18 @@ app = Flask(__name__,
             template_folder=os.path.join(base_path, 'templates'))
 
 portfolio_storage = PortfolioStorage(data_dir=data_path)
+universe_cache = universe_store.get_cache(os.path.join(data_path, 'dividend_universe.json'))
 
-# Simple in-memory cache for price history: {ticker: {date: price, ...}}
-# In a real app, use Redis or file cache.
-PRICE_CACHE = {}
-CACHE_EXPIRY = {} # ticker -> timestamp
+# Persistent per-ticker OHLCV cache (data/price_history), LRU in memory.
+# Only days after the last cached date are fetched from KRX.
+history_cache = price_history_cache.get_cache(os.path.join(data_path, 'price_history'))
+
+# KRX history fetches run on a bounded pool instead of the request thread
+HISTORY_FETCH_WORKERS = 6
+HISTORY_FETCH_TIMEOUT = 20 # seconds per ticker once its fetch has started
+history_executor = ThreadPoolExecutor(max_workers=HISTORY_FETCH_WORKERS, thread_name_prefix="history")
+HISTORY_INFLIGHT = {} # ticker -> (future, started) shared by concurrent requests
+HISTORY_INFLIGHT_LOCK = threading.Lock()
 
 # System Status
 UPDATE_STATUS = {
@@ -73,39 +88,47 @@ UPDATE_STATUS = {
     "summary": None # { "total": 0, "new": 0, "updated": 0 }
 }
 STOP_EVENT = threading.Event()
+# Pushes every UPDATE_STATUS change to /api/system/events subscribers
+UPDATE_EVENTS = progress_events.ProgressBroadcaster()
+
+def publish_status(event_type):
+    UPDATE_EVENTS.publish(event_type, **UPDATE_STATUS)
 
 def update_progress(msg, pct):
     global UPDATE_STATUS
     UPDATE_STATUS["message"] = msg
     UPDATE_STATUS["progress"] = pct
+    publish_status("progress")
 
-def run_update_task(target_tickers=None):
+def run_update_task(target_tickers=None, force=False, priority_tickers=None, shards=None):
     global UPDATE_STATUS
+    outcome = "failed"
     try:
         UPDATE_STATUS["is_running"] = True
         UPDATE_STATUS["message"] = "Starting Update..."
         UPDATE_STATUS["progress"] = 0
         UPDATE_STATUS["summary"] = None
+        publish_status("started")
         print(f"[System] Update started. Targets: {len(target_tickers) if target_tickers else 'ALL'}")
         
-        # 1. Load old data for comparison
-        old_data = load_universe_data() or {}
-        old_keys = set(old_data.keys())
+        # 1. Load old data for comparison (tickers only, no history columns)
+        old_keys = set((universe_cache.get_records([]) or {}).keys())
         
         STOP_EVENT.clear()
 
         # 2. Run the loader with callback
-        loader.load_data(progress_callback=update_progress, target_tickers=target_tickers, stop_event=STOP_EVENT)
+        loader.load_data(progress_callback=update_progress, target_tickers=target_tickers, stop_event=STOP_EVENT,
+                         force=force, priority_tickers=priority_tickers, shards=shards)
         
         if STOP_EVENT.is_set():
-            UPDATE_STATUS["message"] = "Update Cancelled"
+            UPDATE_STATUS["message"] = "Update Cancelled (finished tickers saved)"
             UPDATE_STATUS["is_running"] = False
+            outcome = "cancelled"
             print("[System] Update cancelled by user.")
             return
 
         # 3. Load new data
-        new_data = load_universe_data() or {}
-        new_keys = set(new_data.keys())
+        new_keys = set((universe_cache.get_records([]) or {}).keys())
         
         # 4. Compare
         new_items = new_keys - old_keys
@@ -123,6 +146,7 @@ def run_update_task(target_tickers=None):
         UPDATE_STATUS["message"] = "Update Completed"
         UPDATE_STATUS["progress"] = 100
         UPDATE_STATUS["summary"] = summary
+        outcome = "completed"
         
         print(f"[System] Update completed. Summary: {summary}")
         
@@ -132,6 +156,8 @@ def run_update_task(target_tickers=None):
         print(f"[System] Update failed: {e}")
     finally:
         UPDATE_STATUS["is_running"] = False
+        # Final event (carries the summary on success) once is_running is False
+        publish_status(outcome)
 
 @app.route('/api/simulate', methods=['POST'])
 def run_simulation():
@@ -155,15 +181,8 @@ def find_data_file():
     return None
 
 def load_universe_data():
-    path = os.path.join(data_path, 'dividend_universe.json')
-    if os.path.exists(path):
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading universe: {e}")
-            return None # Or return {} depending on desired behavior for corrupted file
-    return {} # Return empty dict if file not found
+    # Parsed once per process; reloaded only when the file changes on disk.
+    return universe_cache.get()
 
 @app.route('/')
 def index():
@@ -172,22 +191,138 @@ def index():
 # ==========================
 # API: Universe
 # ==========================
+UNIVERSE_QUERY_PARAMS = ("fields", "exclude", "sort", "offset", "limit", "symbols", "sector", "min_yield", "annual_yield_label")
+
 @app.route('/api/universe', methods=['GET'])
 def get_universe():
-    data = load_universe_data()
-    if data is None:
+    """
+    Query (all optional):
+      view=full|list      pre-serialized payload (list: without dist_history etc.)
+      fields=a,b / exclude=a,b, sort=-income_yield_annual_used, offset=0, limit=100,
+      symbols=069500,..., sector=..., min_yield=3.5, annual_yield_label=TTM|EST|NONE
+    Filtered/paged responses carry the pre-paging match count in X-Total-Count.
+    """
+    if any(k in request.args for k in UNIVERSE_QUERY_PARAMS):
+        return query_universe()
+
+    view = request.args.get('view', 'full')
+    if view not in universe_store.VIEWS:
+        return jsonify({'error': f'Unknown view: {view}'}), 400
+
+    # Body + gzip/brotli are serialized once per universe version
+    payload = universe_cache.get_payload(view)
+    if payload is None:
         return jsonify({'error': 'Universe data not found'}), 404
-    
+
     # Return as list for easier frontend handling
     # {symbol, data: {...}} format
+    return send_universe_payload(payload)
+
+def query_universe():
+    args = request.args
+    try:
+        offset = int(args.get('offset', 0))
+        limit = int(args['limit']) if args.get('limit') else None
+        min_yield = float(args['min_yield']) if args.get('min_yield') else None
+    except ValueError:
+        return jsonify({'error': 'offset/limit/min_yield must be numeric'}), 400
+    # List slicing and SQLite (LIMIT -1 = no limit) disagree on negatives: reject before picking a path
+    if offset < 0 or (limit is not None and limit < 0):
+        return jsonify({'error': 'offset/limit must not be negative'}), 400
+
+    def split_arg(name):
+        return [x.strip() for x in args.get(name, '').split(',') if x.strip()]
+
+    symbols = split_arg('symbols')
+    sector = args.get('sector')
+    label = args.get('annual_yield_label')
+    sort_key = args.get('sort')
+
+    store = universe_cache.store
+    if store is not None:
+        # sqlite backend: filter/sort/page in SQL, then load only the page rows
+        total, page = store.query(symbols, sector, min_yield, label, sort_key, offset, limit)
+        items = [(s, store.get(s)) for s in page]
+    else:
+        data = load_universe_data()
+        if data is None:
+            return jsonify({'error': 'Universe data not found'}), 404
+        items = filter_universe_items(data, symbols, sector, min_yield, label, sort_key)
+        total = len(items)
+        items = items[offset:offset + limit] if limit is not None else items[offset:]
+
+    fields = split_arg('fields')
+    exclude = set(split_arg('exclude'))
     result = []
-    for symbol, info in data.items():
-        result.append({
-            "symbol": symbol,
-            "data": info
-        })
-        
-    return jsonify(result)
+    for symbol, info in items:
+        if fields:
+            info = {k: info[k] for k in fields if k in info}
+        elif exclude:
+            info = {k: v for k, v in info.items() if k not in exclude}
+        result.append({"symbol": symbol, "data": info})
+
+    resp = jsonify(result)
+    resp.headers['X-Total-Count'] = str(total)
+    return resp
+
+def filter_universe_items(data, symbols, sector, min_yield, label, sort_key):
+    if symbols:
+        items = [(s, data[s]) for s in symbols if s in data]
+    else:
+        items = list(data.items())
+
+    if sector:
+        items = [(s, d) for s, d in items if d.get('sector') == sector]
+    if min_yield is not None:
+        items = [(s, d) for s, d in items if (d.get('income_yield_annual_used') or 0) >= min_yield]
+    if label:
+        items = [(s, d) for s, d in items if d.get('annual_yield_label') == label]
+
+    if sort_key:
+        desc = sort_key.startswith('-')
+        key = sort_key.lstrip('-')
+        present = [x for x in items if x[1].get(key) is not None]
+        missing = [x for x in items if x[1].get(key) is None]
+        try:
+            present.sort(key=lambda x: x[1][key], reverse=desc)
+        except TypeError:
+            present.sort(key=lambda x: str(x[1][key]), reverse=desc)
+        items = present + missing # Missing values always last
+    return items
+
+@app.route('/api/universe/<symbol>', methods=['GET'])
+def get_universe_item(symbol):
+    """Full record of one ticker (incl. dist_history) for lazy detail loading."""
+    if universe_cache.store is not None:
+        info = universe_cache.store.get(symbol)
+    else:
+        data = load_universe_data()
+        if data is None:
+            return jsonify({'error': 'Universe data not found'}), 404
+        info = data.get(symbol)
+    if info is None:
+        return jsonify({'error': f'Unknown symbol: {symbol}'}), 404
+    return jsonify({"symbol": symbol, "data": info})
+
+def send_universe_payload(payload):
+    encoding = "identity"
+    for enc in ("br", "gzip"):
+        if enc in payload.encoded and request.accept_encodings.quality(enc) > 0:
+            encoding = enc
+            break
+
+    etag = payload.etag_for(encoding)
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": "no-cache", # Always revalidate, reuse body on 304
+        "Vary": "Accept-Encoding"
+    }
+    if request.if_none_match.contains(etag):
+        return flask.Response(status=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return flask.Response(payload.encoded[encoding], mimetype='application/json', headers=headers)
 
 # Legacy support if needed, but /api/universe is preferred
 @app.route('/api/etfs') 
@@ -534,74 +669,104 @@ def import_portfolio():
 @app.route('/api/history', methods=['POST'])
 def get_history():
     """
-    Body: { "tickers": ["069500", "491620"] }
+    Body: { "tickers": ["069500", "491620"], "stream": false, "format": "rows" }
     Returns: { "069500": [{"date": "2024-01-01", "price": 10000}, ...], ... }
+    format="columnar": { "069500": {"dates": ["2024-01-01", ...], "prices": [10000, ...]}, ... }
+    stream=true: NDJSON, one {"ticker": ..., "history": ...} line per ticker as it completes.
     """
     try:
         req = request.json
         tickers = req.get('tickers', [])
         if not tickers:
             return jsonify({})
+        columnar = req.get('format') == 'columnar'
 
-        # Cache check time
-        now = datetime.now()
-        yesterday = (now - timedelta(days=1)).strftime("%Y%m%d")
-        # Fetch extra days (380) to ensure we capture the "look-back" trading day 
-        # that loader.py uses (closest date <= 365 days ago)
-        start_date = (now - timedelta(days=380)).strftime("%Y%m%d")
-        end_date = now.strftime("%Y%m%d")
-        
-        result = {}
-        
-        for t in tickers:
-            # Check Cache (Simple 24h expiry or primitive check)
-            # For simplicity: if exists and not empty, use it. 
-            # Ideally we check if it includes recent dates, but strictly speaking 
-            # PyKRX calls are expensive so we want to maximize cache hit.
-            if t in PRICE_CACHE and len(PRICE_CACHE[t]) > 0:
-                # Refresh if too old? Let's just keep it simple for this session.
-                # If we really want, check CACHE_EXPIRY
-                if t in CACHE_EXPIRY and (now - CACHE_EXPIRY[t]).seconds < 3600 * 6:
-                     result[t] = PRICE_CACHE[t]
-                     continue
-
-            # Fetch from KRX
-            try:
-                # optimization: don't fetch if non-numeric ticker (though all ETF are numeric)
-                df = stock.get_etf_ohlcv_by_date(start_date, end_date, t)
-                if df.empty:
-                    # Try stock API just in case it's misclassified or mixed universe
-                    df = stock.get_market_ohlcv_by_date(start_date, end_date, t)
-                
-                if not df.empty:
-                    # Convert to list of dicts: {date: 'YYYY-MM-DD', price: 1234}
-                    # DF index is datetime
-                    history = []
-                    for dt, row in df.iterrows():
-                        history.append({
-                            "date": dt.strftime("%Y-%m-%d"),
-                            "price": int(row['종가'])
-                        })
-                    
-                    PRICE_CACHE[t] = history
-                    CACHE_EXPIRY[t] = now
-                    result[t] = history
-                else:
-                    result[t] = []
-            except Exception as e:
-                print(f"Error fetching history for {t}: {e}")
-                if t in PRICE_CACHE:
-                    result[t] = PRICE_CACHE[t] # Fallback to old cache
-                else:
-                    result[t] = []
+        if req.get('stream'):
+            def generate():
+                for t, history in iter_histories(tickers, columnar):
+                    yield json.dumps({"ticker": t, "history": history}, ensure_ascii=False) + "\n"
+            return flask.Response(generate(), mimetype='application/x-ndjson')
 
-        return jsonify(result)
+        return jsonify(dict(iter_histories(tickers, columnar)))
         
     except Exception as e:
         print(e)
         return jsonify({'error': str(e)}), 500
 
-        return jsonify({'error': str(e)}), 500
+def iter_histories(tickers, columnar=False):
+    """
+    Yields (ticker, history) as each ticker becomes available.
+    Fresh cache hits come first; stale tickers are refreshed concurrently and
+    fall back to cached bars on error or timeout.
+    """
+    now = datetime.now()
+    # Fetch extra days (380) to ensure we capture the "look-back" trading day 
+    # that loader.py uses (closest date <= 365 days ago)
+    window_start = now - timedelta(days=380)
+    start_date = window_start.strftime("%Y%m%d")
+    end_date = now.strftime("%Y%m%d")
+    since = window_start.strftime("%Y-%m-%d")
+    read = history_cache.get_columns if columnar else history_cache.get
+
+    pending = {}
+    for t in dict.fromkeys(tickers):
+        if history_cache.is_fresh(t, loader.TRADING_CALENDAR):
+            yield t, read(t, since=since)
+            continue
+        submitted = None
+        with HISTORY_INFLIGHT_LOCK:
+            inflight = HISTORY_INFLIGHT.get(t)
+            if inflight is None:
+                started = {}
+                submitted = history_executor.submit(refresh_history, t, start_date, end_date, started)
+                inflight = (submitted, started)
+                HISTORY_INFLIGHT[t] = inflight
+        if submitted is not None:
+            # Registered outside the lock: a future that is already done runs the callback right here
+            submitted.add_done_callback(lambda f, t=t: forget_history_inflight(t, f))
+        pending[inflight[0]] = (t, inflight[1])
+
+    while pending:
+        done, _ = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+        for f in done:
+            t, _ = pending.pop(f)
+            yield t, read(t, since=since)
+
+        # Give up waiting on slow tickers; the fetch still lands in the cache
+        mono = time.monotonic()
+        for f, (t, started) in list(pending.items()):
+            if "at" in started and mono - started["at"] > HISTORY_FETCH_TIMEOUT:
+                print(f"[History] Timeout fetching {t}, serving cached bars")
+                pending.pop(f)
+                yield t, read(t, since=since)
+
+def forget_history_inflight(t, future):
+    """Done-callback: drops the in-flight entry under the same lock as the inserts."""
+    with HISTORY_INFLIGHT_LOCK:
+        inflight = HISTORY_INFLIGHT.get(t)
+        if inflight is not None and inflight[0] is future:
+            del HISTORY_INFLIGHT[t]
+
+def refresh_history(t, start_date, end_date, started):
+    started["at"] = time.monotonic()
+    # Incremental: only the days missing since the last cached bar
+    fetch_from = history_cache.fetch_start(t, start_date)
+    try:
+        df = stock.get_etf_ohlcv_by_date(fetch_from, end_date, t)
+        if df.empty:
+            # Try stock API just in case it's misclassified or mixed universe
+            df = stock.get_market_ohlcv_by_date(fetch_from, end_date, t)
+        history_cache.append(t, *ohlcv_bars(df))
+    except Exception as e:
+        print(f"Error fetching history for {t}: {e}")
+        # Fallback to whatever is cached
+
+def ohlcv_bars(df):
+    """pykrx OHLCV DataFrame -> (int32 epoch days, int64 [n, 5] open/high/low/close/volume)"""
+    if df is None or df.empty:
+        return np.empty(0, dtype=np.int32), np.empty((0, 5), dtype=np.int64)
+    bars = df.reindex(columns=['시가', '고가', '저가', '종가', '거래량']).fillna(0).to_numpy(dtype=np.int64)
+    return to_epoch_days(df.index), bars
 
 # ==========================
 # API: System / Data Update
@@ -618,6 +783,40 @@ def get_system_info():
 def get_system_status():
     return jsonify(UPDATE_STATUS)
 
+@app.route('/api/system/events', methods=['GET'])
+def stream_system_events():
+    """
+    Server-Sent Events: a snapshot of UPDATE_STATUS on connect, then one event
+    per change (started / progress / stopping / completed / cancelled / failed).
+    Each open stream holds a server thread until the client leaves, so the app
+    must be served threaded (app.run's default); beyond
+    progress_events.MAX_SUBSCRIBERS streams the answer is 503 and the page polls
+    /api/system/status instead.
+    """
+    q = UPDATE_EVENTS.subscribe()
+    if q is None:
+        return jsonify({'message': 'Too many event streams, poll /api/system/status'}), 503
+
+    def generate():
+        yield "retry: 3000\n\n"
+        yield progress_events.format_sse(UPDATE_EVENTS.make_event("snapshot", **UPDATE_STATUS))
+        while True:
+            try:
+                event = q.get(timeout=progress_events.KEEPALIVE_INTERVAL)
+            except Empty:
+                # Comment frame: keeps proxies open and detects closed clients
+                yield ": keep-alive\n\n"
+                continue
+            yield progress_events.format_sse(event)
+
+    response = flask.Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    # Runs on disconnect and also if the stream never started (a generator's finally would not)
+    response.call_on_close(lambda: UPDATE_EVENTS.unsubscribe(q))
+    return response
+
 @app.route('/api/system/update', methods=['POST'])
 def trigger_system_update():
     global UPDATE_STATUS
@@ -631,31 +830,42 @@ def trigger_system_update():
     # 3. If 'full=true' param is passed, update all.
     
     full_update = request.args.get('full', 'false').lower() == 'true'
+    # force=true refetches every source instead of only stale ones (refresh_planner)
+    force = request.args.get('force', 'false').lower() == 'true'
+    # shards=N fetches tickers in N worker processes (default: loader.UPDATE_SHARDS)
+    shards = request.args.get('shards', type=int)
+    if shards is not None:
+        shards = max(1, min(shards, os.cpu_count() or 1)) # One process per core at most
     target_tickers = None
-    
+
+    # Collect portfolio tickers from all accounts (fetched first on a full update too)
+    pfl = portfolio_storage.load()
+    p_tickers = []
+    for acc in pfl.get('accounts', {}).values():
+        p_tickers.extend(acc.get('positions', {}).keys())
+    p_tickers = list(set(p_tickers)) # Unique
+
     if not full_update:
-        # Collect portfolio tickers from all accounts
-        pfl = portfolio_storage.load()
-        p_tickers = []
-        for acc in pfl.get('accounts', {}).values():
-            p_tickers.extend(acc.get('positions', {}).keys())
-        p_tickers = list(set(p_tickers)) # Unique
         # Add Universe Seed tickers?
         # seed_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'universe_seed.json')
         # ... logic to load seeds ...
         # For simplicity, just update portfolio + default basic ones?
         # Actually, let's update ALL if portfolio is empty, otherwise just portfolio.
         if p_tickers:
-            target_tickers = p_tickers
+            target_tickers = list(p_tickers)
             # Also add some defaults like 069500 (KODEX 200) just in case
             if "069500" not in target_tickers: target_tickers.append("069500")
 
     # Wrapper to pass args
     def _run_wrapper():
-        run_update_task(target_tickers)
+        run_update_task(target_tickers, force, p_tickers, shards)
 
     # Note: run_update_task signature needs update in flask_app.py too!
 
+    # Mark running before the thread starts so an immediate status/events read sees it
+    UPDATE_STATUS["is_running"] = True
+    UPDATE_STATUS["message"] = "Starting Update..."
+
     # Start in background
     thread = threading.Thread(target=_run_wrapper)
     thread.daemon = True
@@ -670,20 +880,22 @@ def trigger_price_refresh():
     """
     try:
         full_update = request.args.get('full', 'false').lower() == 'true'
-        target_tickers = []
 
         # 1. Load Current Universe
         universe = load_universe_data() or {}
         
+        # Portfolio Tickers
+        portfolio_tickers = []
+        pfl = portfolio_storage.load()
+        for acc in pfl.get('accounts', {}).values():
+            portfolio_tickers.extend(acc.get('positions', {}).keys())
+        portfolio_tickers = list(set(portfolio_tickers))
+
         # 2. Determine Targets
         if full_update:
             target_tickers = list(universe.keys())
         else:
-            # Portfolio Tickers
-            pfl = portfolio_storage.load()
-            for acc in pfl.get('accounts', {}).values():
-                target_tickers.extend(acc.get('positions', {}).keys())
-            target_tickers = list(set(target_tickers))
+            target_tickers = portfolio_tickers
             # Also add whatever is in universe but maybe missing from pfl? 
             # No, just refresh what controls the user view + maybe top 10?
             # User specifically asked for this feature to check current prices. 
@@ -694,35 +906,48 @@ def trigger_price_refresh():
         if not target_tickers:
             return jsonify({'message': 'No targets found'})
 
-        print(f"[System] Fast Refreshing {len(target_tickers)} tickers...")
+        # Quotes fetched after the last close cannot move on weekends/holidays/after hours
+        calendar = loader.TRADING_CALENDAR
+        settled = {t for t in target_tickers
+                   if (fetched := refresh_planner.fetched_time(universe.get(t), 'price')) and calendar.quiet_since(fetched)}
+        target_tickers = [t for t in target_tickers if t not in settled]
+        if not target_tickers:
+            return jsonify({'message': 'Prices already final (market closed)', 'count': 0, 'results': {}})
+
+        print(f"[System] Fast Refreshing {len(target_tickers)} tickers ({len(settled)} already final)...")
         
         # 3. Fetch New Data (Sync wrapper around Async)
         # Note: loader.refresh_prices return dict { ticker: { closePrice, change_rate, change_val, name } }
-        new_data = loader.refresh_prices(target_tickers)
+        # Prices come from the single etfItemList call; intraday trends (one call per
+        # ticker) are only refreshed for portfolio holdings on a full refresh.
+        # Other rows drop their old trend below so no stale sparkline is drawn next to the new price.
+        new_data = loader.refresh_prices(target_tickers, trend_tickers=portfolio_tickers if full_update else None)
         
         # 4. Merge & Save
-        updates_count = 0
+        # Only the touched snapshot columns are rewritten (no full-universe dump)
+        today = datetime.now().strftime("%Y-%m-%d")
+        patches = {}
         for t, info in new_data.items():
             if t in universe:
                 # Update specific fields only to preserve other metadata
-                universe[t]['updated_price'] = info['closePrice'] # Use 'updated_price' as primary for display
-                # Also update 'price' just in case
-                universe[t]['price'] = info['closePrice']
-                
-                universe[t]['daily_change_rate'] = info['change_rate']
-                universe[t]['daily_change_value'] = info['change_val']
-                # universe[t]['name'] = info['name'] # Optional
-                
+                patch = {
+                    'updated_price': info['closePrice'], # Use 'updated_price' as primary for display
+                    'price': info['closePrice'], # Also update 'price' just in case
+                    'daily_change_rate': info['change_rate'],
+                    'daily_change_value': info['change_val'],
+                    'last_updated': today,
+                    'fetched_at': refresh_planner.mark_fetched(universe[t].get('fetched_at'), ['price'])
+                }
+                # patch['name'] = info['name'] # Optional
                 if info.get('trend_1d'):
-                    universe[t]['trend_1d'] = info['trend_1d']
+                    patch['trend_1d'] = info['trend_1d']
+                elif universe[t].get('trend_1d'):
+                    patch['trend_1d'] = [] # Trend not refreshed: no longer matches the new price
+                patches[t] = patch
+        updates_count = len(patches)
 
-                universe[t]['last_updated'] = datetime.now().strftime("%Y-%m-%d")
-                updates_count += 1
-        
-        # Save back
-        path = os.path.join(data_path, 'dividend_universe.json')
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(universe, f, ensure_ascii=False, indent=4)
+        if patches:
+            universe_cache.update_fields(patches)
 
         return jsonify({'message': 'Price refresh completed', 'count': updates_count, 'results': new_data})
 
@@ -738,6 +963,7 @@ def stop_system_update():
          
     STOP_EVENT.set()
     UPDATE_STATUS["message"] = "Stopping..."
+    publish_status("stopping")
     return jsonify({'message': 'Stop signal sent'})
 
 @app.route('/api/system/shutdown', methods=['POST'])
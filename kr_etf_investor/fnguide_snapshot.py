@@ -0,0 +1,47 @@
+"""
+FnGuide ETF Snapshot Extractor
+✅ etf_snapshot.asp HTML 을 앞에서부터 한 번만 훑어 필요한 값을 한꺼번에 추출
+   - 배당수익률 / 최근 분배금 / 최근 분배금 지급기준일 / 연 분배횟수 / 종목명(giName)
+   - 라벨마다 HTML 전체를 복사(replace)한 뒤 `.*?` 정규식으로 다시 스캔하던 방식 대체
+   - 모든 라벨을 하나의 패턴으로 찾고, 값을 다 찾으면(요약 영역을 지나면) 나머지 HTML 은 보지 않음
+✅ 결과는 기존과 동일: 각 라벨이 처음 나온 위치 뒤의 '가장 가까운 날짜/숫자'
+
+벤치마크: python tools/bench_fnguide_snapshot.py [<dir with *.html>]
+"""
+
+import re
+
+# field -> label; longer variants ("배당수익률(%)") start with these, so the first hit is the same
+LABELS = {
+    "yield": "배당수익률",
+    "dist_recent": "최근 분배금",
+    "dist_base_date": "최근 분배금 지급기준일",
+    "dist_freq_1y": "연 분배횟수",
+}
+# Longest first so "최근 분배금 지급기준일" is not cut short at "최근 분배금"
+LABEL_PATTERN = re.compile("|".join(re.escape(lab) for lab in sorted(set(LABELS.values()), key=len, reverse=True)))
+VALUE_PATTERN = re.compile(r"\d{4}[/.\-]\d{2}[/.\-]\d{2}|[0-9]+(?:\.[0-9]+)?")
+NAME_PATTERN = re.compile(r"<h1[^>]*id=\"giName\"[^>]*>(.*?)</h1>")
+
+
+def extract_snapshot(html):
+    """
+    FnGuide etf_snapshot HTML -> {"yield", "dist_recent", "dist_base_date", "dist_freq_1y": raw text, "name"}
+    Missing values are "".
+    """
+    html = html or ""
+    values = {}
+    for m in LABEL_PATTERN.finditer(html):
+        hit = m.group(0)
+        for field, lab in LABELS.items():
+            # A "최근 분배금 지급기준일" hit is also the first "최근 분배금" if none came before
+            if field in values or not hit.startswith(lab):
+                continue
+            v = VALUE_PATTERN.search(html, m.start() + len(lab))
+            values[field] = v.group(0) if v else ""
+        if len(values) == len(LABELS):
+            break
+    out = {field: values.get(field, "") for field in LABELS}
+    name = NAME_PATTERN.search(html)
+    out["name"] = name.group(1).strip() if name else ""
+    return out
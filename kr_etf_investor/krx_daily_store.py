@@ -0,0 +1,125 @@
+"""
+KRX Daily Close Store (loader 기간 수익률 기준가)
+✅ 전 종목 ETF 종가 스냅샷을 거래일별로 data/krx_daily/<YYYYMMDD>.csv 에 저장
+   - 지난 거래일 종가는 바뀌지 않으므로 한 번 받으면 다시 요청하지 않음 (불변 파일)
+   - 오늘 스냅샷은 장중에 계속 바뀌므로 저장하지 않고 매번 조회
+✅ KRX 가 빈 결과를 준 지난 날짜(캘린더 없이 평일로 추정한 휴장일)는 closed_days.txt 에 기록
+   - 캘린더(is_trading_day)가 거래일이라고 하는 날의 빈 결과는 일시 장애로 보고 아무것도 기록하지 않음
+✅ load_data 의 기준일 7개(now, 1m … 5y) 중 과거 기준일은 두 번째 실행부터 네트워크 호출 없음
+✅ 기준일 → 거래일 변환은 trading_calendar.py 가 담당 (날짜별 역방향 탐색 없음)
+"""
+
+import os
+import threading
+from datetime import date
+
+import pandas as pd
+from pykrx import stock
+
+CLOSE_COLUMN = "종가"
+CLOSED_DAYS_FILE = "closed_days.txt"
+
+
+class KrxDailyStore:
+    def __init__(self, store_dir, is_trading_day=None):
+        self.store_dir = store_dir
+        self.is_trading_day = is_trading_day # callable(YYYYMMDD) -> bool, e.g. TradingCalendar.is_trading_day
+        self._mem = {} # YYYYMMDD -> DataFrame[["종가"]] (past days only)
+        self._closed = None # set of YYYYMMDD with no KRX trading
+        self._lock = threading.RLock()
+        os.makedirs(store_dir, exist_ok=True)
+
+    def _path(self, day):
+        return os.path.join(self.store_dir, f"{day}.csv")
+
+    def _closed_days(self):
+        with self._lock:
+            if self._closed is None:
+                try:
+                    with open(os.path.join(self.store_dir, CLOSED_DAYS_FILE), encoding="utf-8") as f:
+                        self._closed = {line.strip() for line in f if line.strip()}
+                except OSError:
+                    self._closed = set()
+            return self._closed
+
+    def _mark_closed(self, day):
+        with self._lock:
+            closed = self._closed_days()
+            if day in closed:
+                return
+            closed.add(day)
+            with open(os.path.join(self.store_dir, CLOSED_DAYS_FILE), "a", encoding="utf-8") as f:
+                f.write(day + "\n")
+
+    def is_closed(self, day):
+        return day in self._closed_days()
+
+    def load(self, day):
+        """Stored snapshot of a past trading day (YYYYMMDD) or None."""
+        with self._lock:
+            df = self._mem.get(day)
+            if df is not None:
+                return df
+        path = self._path(day)
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_csv(path, dtype={"ticker": str}).set_index("ticker")[[CLOSE_COLUMN]]
+        except Exception as e:
+            print(f"[KRX] Unreadable snapshot {day}: {e}")
+            return None
+        with self._lock:
+            self._mem[day] = df
+        return df
+
+    def save(self, day, df):
+        path = self._path(day)
+        temp = path + ".tmp"
+        out = df[[CLOSE_COLUMN]].copy()
+        out.index.name = "ticker"
+        out.to_csv(temp, encoding="utf-8")
+        os.replace(temp, path)
+        with self._lock:
+            self._mem[day] = out
+
+    def fetch(self, day, today=None):
+        """
+        Whole-market closes of one day (YYYYMMDD): local for past days,
+        otherwise KRX. Empty DataFrame if the market did not trade;
+        ValueError if KRX returns nothing for a known trading day.
+        """
+        today = (today or date.today()).strftime("%Y%m%d")
+        past = day < today
+        if past:
+            if self.is_closed(day):
+                return pd.DataFrame()
+            df = self.load(day)
+            if df is not None:
+                return df
+        df = stock.get_etf_ohlcv_by_ticker(day) # Exceptions propagate: nothing is recorded
+        if df.empty:
+            if past:
+                if self.is_trading_day is not None and self.is_trading_day(day):
+                    raise ValueError(f"KRX returned no closes for trading day {day}") # Not recorded as closed
+                self._mark_closed(day)
+            return pd.DataFrame()
+        df = df[[CLOSE_COLUMN]]
+        if past:
+            self.save(day, df)
+        return df
+
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+def get_store(store_dir, is_trading_day=None):
+    """Shared KrxDailyStore per directory (is_trading_day: see KrxDailyStore)."""
+    key = os.path.normcase(os.path.abspath(store_dir))
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = KrxDailyStore(store_dir, is_trading_day)
+            _STORES[key] = store
+        elif is_trading_day is not None:
+            store.is_trading_day = is_trading_day
+        return store
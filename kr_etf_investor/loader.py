@@ -9,26 +9,60 @@ ETF Universe Loader (Async Optimized)
 ✅ 월 현금흐름(추정/TTM 기반): monthly_income_est
 
 출력 파일:
-  ./data/dividend_universe.json
+  ./data/dividend_universe.cols/   (컬럼 스냅샷, universe_snapshot.py)
+  ./data/dividend_universe.json    (호환용 compact export)
+  ./data/http_cache/               (원본 응답 캐시, response_cache.py)
+  ./data/price_history/            (종목별 일봉, price_history_cache.py)
+  ./data/krx_daily/                (거래일별 전 종목 종가, krx_daily_store.py)
+  ./data/trading_calendar.json     (KRX 영업일, trading_calendar.py)
+
+샤딩 갱신 (종목을 N 개 워커 프로세스로 나눠 수집, 호스트별 요청 예산은 N 등분):
+  python -m kr_etf_investor.loader --shards 4   또는   KR_ETF_UPDATE_SHARDS=4
 
 설치:
   pip install pykrx pandas requests beautifulsoup4 lxml tqdm aiohttp
 """
 
 from pykrx import stock
+import numpy as np
 import pandas as pd
 import json
 import os
 import requests
 from requests.adapters import HTTPAdapter
-from io import StringIO
-import re
 from datetime import datetime, timedelta, date
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 import asyncio
 import aiohttp
+import multiprocessing
 import sys
+from queue import Empty
+
+try:
+    from . import universe_store
+    from . import async_session
+    from . import refresh_planner
+    from .async_session import single_flight
+    from .rate_limiter import retry_delay, scale_limits
+    from .response_cache import ResponseCache
+    from .price_history_cache import CLOSE as PRICE_CLOSE, get_cache as get_price_history_cache, to_epoch_days
+    from .krx_daily_store import get_store as get_krx_daily_store
+    from .trading_calendar import get_calendar as get_trading_calendar, now_kst
+    from .parse_pool import ParsePool, extract_history_from_html_tables, parse_fnguide_snapshot
+    from .num_parse import clean_num as _clean_num, safe_float as _safe_float, safe_int as _safe_int
+except ImportError:
+    import universe_store
+    import async_session
+    import refresh_planner
+    from async_session import single_flight
+    from rate_limiter import retry_delay, scale_limits
+    from response_cache import ResponseCache
+    from price_history_cache import CLOSE as PRICE_CLOSE, get_cache as get_price_history_cache, to_epoch_days
+    from krx_daily_store import get_store as get_krx_daily_store
+    from trading_calendar import get_calendar as get_trading_calendar, now_kst
+    from parse_pool import ParsePool, extract_history_from_html_tables, parse_fnguide_snapshot
+    from num_parse import clean_num as _clean_num, safe_float as _safe_float, safe_int as _safe_int
 
 # =========================
 # 콘솔 인코딩(윈도우)
@@ -53,13 +87,55 @@ def get_data_dir():
 DATA_DIR = get_data_dir()
 OUTPUT_PATH = os.path.join(DATA_DIR, "dividend_universe.json")
 
-MAX_Async_CONCURRENCY = 10 # Lowering further to avoid rate limits during heavy price history fetches
+# Raw FnGuide/Naver responses, gzip per URL with per-endpoint TTLs (response_cache.py)
+HTTP_CACHE = ResponseCache(os.path.join(DATA_DIR, "http_cache"))
+
+# Daily bars per ticker, shared with /api/history (price_history_cache.py)
+PRICE_HISTORY = get_price_history_cache(os.path.join(DATA_DIR, "price_history"))
+
+# KRX trading days + market hours, shared with flask_app (trading_calendar.py)
+TRADING_CALENDAR = get_trading_calendar(os.path.join(DATA_DIR, "trading_calendar.json"))
+
+# Whole-market ETF closes per past trading day, immutable once written (krx_daily_store.py)
+KRX_DAILY = get_krx_daily_store(os.path.join(DATA_DIR, "krx_daily"), TRADING_CALENDAR.is_trading_day)
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Accept": "application/json, text/plain, */*",
     "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7"
 }
 
+# Naver endpoints (also the single-flight memo keys)
+NAVER_ETF_LIST_URL = "https://finance.naver.com/api/sise/etfItemList.nhn"
+NAVER_DIVIDEND_HISTORY_URL = "https://m.stock.naver.com/api/etf/{ticker}/dividend/history?page={page}&pageSize={page_size}&firstPageSize={page_size}"
+NAVER_PRICE_URL = "https://m.stock.naver.com/api/stock/{ticker}/price?pageSize={page_size}&page={page}"
+NAVER_INTRADAY_URL = "https://api.stock.naver.com/chart/domestic/item/{ticker}?periodType=day"
+NAVER_STOCK_BASIC_URL = "https://m.stock.naver.com/api/stock/{ticker}/basic"
+NAVER_ETF_BASIC_URL = "https://m.stock.naver.com/api/etf/{ticker}/basic"
+
+# Dividend history: first fetch of a ticker / incremental pages after the last stored ex-date
+DIVIDEND_PAGE_SIZE = 24
+DIVIDEND_INCREMENTAL_PAGE_SIZE = 3
+DIVIDEND_MAX_PAGES = 8
+
+# Naver price pages a ticker's stored series may lag behind before it is rebuilt from scratch
+PRICE_GAP_MAX_PAGES = 100 # ~8 years of trading days at 20 per page
+
+# FnGuide/table parsing in worker processes while load_data runs (parse_pool.py)
+PARSE_POOL = ParsePool()
+PARSE_POOL_MIN_TICKERS = 20 # fewer FnGuide parses than this run in threads (spawn + warm-up costs more)
+
+# Full/targeted update: fixed worker pool pulling tickers from a priority queue
+# (the per-host limiter sets the real request concurrency below this)
+TICKER_WORKERS = 24
+PRIORITY_PORTFOLIO, PRIORITY_SEED, PRIORITY_REST = 0, 1, 2
+SEED_PATH = os.path.join(DATA_DIR, "universe_seed.json")
+STOP_POLL_INTERVAL = 0.2 # seconds
+
+# Sharded update: tickers split across N worker processes (KR_ETF_UPDATE_SHARDS / loader --shards N)
+UPDATE_SHARDS = max(1, _safe_int(os.environ.get("KR_ETF_UPDATE_SHARDS"), 1))
+SHARD_MIN_TICKERS = 100 # smaller runs are not worth the process start-up
+
 # (선택) 디버그
 DEBUG = False
 DEBUG_TICKERS = set()
@@ -67,11 +143,6 @@ DEBUG_TICKERS = set()
 # =========================
 # 유틸
 # =========================
-def _clean_num(x):
-    if x is None:
-        return ""
-    return re.sub(r"[^\d\.\-]", "", str(x))
-
 def _parse_date_any(s):
     if not s:
         return None
@@ -83,32 +154,24 @@ def _parse_date_any(s):
             pass
     return None
 
-def _find_text_by_label(labels, html):
+def merge_dist_history(fetched, stored, naver_since=None):
     """
-    FnGuide 페이지 구조가 dt/dd가 아니어도 잡히도록,
-    라벨 뒤의 '가장 가까운 숫자/날짜'를 정규식으로 탐색
+    Fetched Naver rows [(date, amount)] over the stored dist_history -> [(date, amount, source)].
+    Manual / FnGuide rows carry record or pay dates where Naver has the ex-date, so once
+    Naver returned rows only Naver-origin stored rows are kept (one payout must not count twice).
+    Rows stored before sources were tagged are taken as Naver rows if an incremental
+    fetch point (naver_since) exists; a fetched row wins on the same date.
     """
-    h = html.replace("\n", " ").replace("\t", " ")
-    for lab in labels:
-        m = re.search(
-            rf"{re.escape(lab)}.*?(\d{{4}}[\/\.\-]\d{{2}}[\/\.\-]\d{{2}}|[0-9]+(?:\.[0-9]+)?)",
-            h
-        )
-        if m:
-            return m.group(1)
-    return ""
-
-def _safe_float(x, default=0.0):
-    try:
-        return float(x)
-    except Exception:
-        return default
-
-def _safe_int(x, default=0):
-    try:
-        return int(x)
-    except Exception:
-        return default
+    rows = {d: (d, v, "naver") for d, v in fetched}
+    for r in stored:
+        source = r.get("source") or ("naver" if naver_since else None)
+        if fetched and source != "naver":
+            continue
+        d = _parse_date_any(r.get("date"))
+        v = _safe_int(r.get("amount"))
+        if d and v > 0 and d not in rows:
+            rows[d] = (d, v, source)
+    return list(rows.values())
 
 def _round2(x):
     try:
@@ -139,84 +202,74 @@ def _total_return_from_cagr(total_cagr_pct, years):
     except Exception:
         return 0.0
 
-# =========================
-# 분배금 히스토리 추출 (read_html)
-# =========================
-def _extract_history_from_html_tables(html):
-    rows = []
-    try:
-        # pandas read_html is blocking/sync, but fast enough for memory string
-        tables = pd.read_html(StringIO(html))
-    except Exception:
-        return rows
-
-    date_keys = ["지급기준일", "분배기준일", "기준일", "지급일", "일자", "날짜"]
-    amt_keys = ["분배금", "현금분배", "현금 분배", "분배금(원)", "현금분배(원)", "금액"]
-
-    def find_col(cols, keys):
-        for c in cols:
-            cs = str(c).replace(" ", "")
-            if any(k.replace(" ", "") in cs for k in keys):
-                return c
-        return None
-
-    for t in tables:
-        try:
-            cols = list(t.columns)
-            date_col = find_col(cols, date_keys)
-            amt_col = find_col(cols, amt_keys)
-            if date_col is None or amt_col is None:
-                continue
-
-            sub = t[[date_col, amt_col]].dropna()
-            for _, rr in sub.iterrows():
-                d = _parse_date_any(rr[date_col])
-                v = _clean_num(rr[amt_col])
-                if d and v.isdigit():
-                    rows.append((d, int(v)))
-        except Exception:
-            continue
-
-    rows = list(set(rows))
-    rows.sort(key=lambda x: x[0], reverse=True)
-    return rows
-
 # =========================
 # Discovery: Naver ETF List API
 # =========================
-async def fetch_naver_etf_list(session):
+@single_flight(lambda: NAVER_ETF_LIST_URL)
+async def fetch_naver_etf_items(session):
     """
-    Get full list of ETFs from Naver Finance API.
-    Returns: { ticker: name, ... }
+    Full etfItemList payload (one request for every listed ETF).
+    Returns: { ticker: item } with itemname, nowVal, risefall, changeVal, changeRate, nav, quant, ...
     """
-    url = "https://finance.naver.com/api/sise/etfItemList.nhn"
+    url = NAVER_ETF_LIST_URL
     try:
-        async with session.get(url, timeout=10) as r:
+        async with HTTP_CACHE.fetch(session, url, timeout=10) as r:
             if r.status == 200:
                 # Naver API might return application/x-javascript or text/plain with euc-kr
                 # We use r.text() to get the raw content and then parse it manually or let json.loads handle it
                 text = await r.text()
                 data = json.loads(text)
                 items = data.get('result', {}).get('etfItemList', [])
-                return {item['itemcode']: item['itemname'] for item in items if item.get('itemcode')}
+                return {item['itemcode']: item for item in items if item.get('itemcode')}
     except Exception as e:
         print(f"[Discovery] Failed to fetch Naver ETF list: {e}")
     return {}
 
+async def fetch_naver_etf_list(session):
+    """
+    Get full list of ETFs from Naver Finance API.
+    Returns: { ticker: name, ... }
+    """
+    items = await fetch_naver_etf_items(session)
+    return {t: item.get('itemname', '') for t, item in items.items()}
+
+def _quote_from_etf_item(item):
+    """etfItemList item -> same shape as fetch_basic_info_only() (without trend_1d)"""
+    price = _safe_int(_clean_num(item.get('nowVal', 0)))
+    if price <= 0:
+        return None
+    rate = _safe_float(item.get('changeRate', 0))
+    val = _safe_int(_clean_num(item.get('changeVal', 0)))
+    # risefall: 1 upper limit, 2 rising, 3 flat, 4 lower limit, 5 falling
+    risefall = str(item.get('risefall', ''))
+    if risefall in ('4', '5'):
+        rate, val = -abs(rate), -abs(val)
+    elif risefall in ('1', '2'):
+        rate, val = abs(rate), abs(val)
+    return {
+        'closePrice': price,
+        'change_rate': rate,
+        'change_val': val,
+        'name': item.get('itemname', ''),
+        'nav': _safe_float(item.get('nav', 0)),
+        'volume': _safe_int(_clean_num(item.get('quant', 0))),
+    }
+
 # =========================
 # Async Fetchers
 # =========================
-async def fetch_naver_etf_dividend_history_async(session, ticker):
+async def _fetch_dividend_history_page(session, ticker, page, page_size):
+    """[(exDividendAt 'YYYY-MM-DD', amount str)] of one page, None if the request failed."""
     for attempt in range(3):
         try:
-            url = f"https://m.stock.naver.com/api/etf/{ticker}/dividend/history?page=1&pageSize=24&firstPageSize=24"
+            url = NAVER_DIVIDEND_HISTORY_URL.format(ticker=ticker, page=page, page_size=page_size)
             headers = {
                 "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1",
                 "Referer": f"https://m.stock.naver.com/domestic/stock/{ticker}/total",
                 "Origin": "https://m.stock.naver.com",
                 "Accept": "application/json, text/plain, */*"
             }
-            async with session.get(url, headers=headers, timeout=10) as res:
+            async with HTTP_CACHE.fetch(session, url, headers=headers, timeout=10) as res:
                 if res.status == 200:
                     data = await res.json()
                     results = []
@@ -226,67 +279,154 @@ async def fetch_naver_etf_dividend_history_async(session, ticker):
                             for item in items:
                                 date_str = str(item.get('exDividendAt', '')).replace('.', '-')
                                 amount = str(item.get('dividendAmount', '0'))
-                                if date_str and amount and amount != '0':
+                                if date_str:
                                     results.append((date_str, amount))
                     return results
                 elif res.status in [403, 429]:
-                    await asyncio.sleep(1)
+                    continue # Host is paused by the rate limiter (Retry-After / backoff)
                 else: break
         except Exception:
-            await asyncio.sleep(1)
-    return []
+            await retry_delay(attempt)
+    return None
 
-async def fetch_naver_price_history_async(session, ticker, pages=15, page_size=20):
-    # Fetch enough history for 1Y calc (approx 250 trading days) -> 13 pages min
-    full_hist = []
-    
-    # Simple Retry Logic (3 attempts)
+@single_flight(lambda ticker, since=None: (NAVER_DIVIDEND_HISTORY_URL.format(ticker=ticker, page=1, page_size=DIVIDEND_PAGE_SIZE), since))
+async def fetch_naver_etf_dividend_history_async(session, ticker, since=None):
+    """
+    [(date, amount)] newest first, zero amounts dropped; None if a request failed.
+    since = latest ex-date already stored ('YYYY-MM-DD'): only newer rows are
+    returned, reading small pages until a known date shows up.
+    """
+    since_date = _parse_date_any(since)
+    if since_date is None:
+        rows = await _fetch_dividend_history_page(session, ticker, 1, DIVIDEND_PAGE_SIZE)
+        if rows is None:
+            return None
+        return [(d, amt) for d, amt in rows if amt and amt != '0']
+
+    results = []
+    for page in range(1, DIVIDEND_MAX_PAGES + 1):
+        rows = await _fetch_dividend_history_page(session, ticker, page, DIVIDEND_INCREMENTAL_PAGE_SIZE)
+        if rows is None:
+            return None # Partial pages would leave a gap below the new rows
+        if not rows:
+            break
+        reached_known = False
+        for d_str, amt in rows:
+            d = _parse_date_any(d_str)
+            if d is not None and d <= since_date:
+                reached_known = True
+            elif amt and amt != '0':
+                results.append((d_str, amt))
+        if reached_known or len(rows) < DIVIDEND_INCREMENTAL_PAGE_SIZE:
+            break
+    return results
+
+async def _fetch_price_page(session, ticker, page, page_size):
+    """[(date, open, high, low, close, volume)] newest first; None if the request failed."""
     for attempt in range(3):
         try:
-            temp_hist = []
-            success = True
-            for p_idx in range(1, pages + 1):
-                 url = f"https://m.stock.naver.com/api/stock/{ticker}/price?pageSize={page_size}&page={p_idx}"
-                 headers = HEADERS.copy()
-                 headers["Referer"] = f"https://m.stock.naver.com/domestic/stock/{ticker}/total"
-                 async with session.get(url, headers=headers, timeout=10) as res:
-                     if res.status == 200:
-                         data = await res.json()
-                         if isinstance(data, list):
-                             if not data: break # End of data
-                             for item in data:
-                                 d_str = item.get('localTradedAt', '')
-                                 p_str = item.get('closePrice', '0')
-                                 d = _parse_date_any(d_str)
-                                 p = _safe_int(_clean_num(p_str))
-                                 if d and p > 0:
-                                     temp_hist.append({'date': d, 'price': p})
-                         else:
-                             break
-                     elif res.status == 403 or res.status == 429:
-                         success = False # Probably blocked
-                         break
-                     else:
-                         break
-            
-            if success and temp_hist:
-                return temp_hist
-            
-            # If failed or empty, wait and retry
-            await asyncio.sleep(1)
+            url = NAVER_PRICE_URL.format(ticker=ticker, page_size=page_size, page=page)
+            headers = HEADERS.copy()
+            headers["Referer"] = f"https://m.stock.naver.com/domestic/stock/{ticker}/total"
+            async with HTTP_CACHE.fetch(session, url, headers=headers, timeout=10) as res:
+                if res.status == 200:
+                    data = await res.json()
+                    if not isinstance(data, list):
+                        return []
+                    rows = []
+                    for item in data:
+                        d = _parse_date_any(item.get('localTradedAt', ''))
+                        close = _safe_int(_clean_num(item.get('closePrice', '0')))
+                        if d and close > 0:
+                            rows.append((d, *(_safe_int(_clean_num(item.get(k, '0'))) for k in
+                                              ('openPrice', 'highPrice', 'lowPrice')), close,
+                                         _safe_int(_clean_num(item.get('accumulatedTradingVolume', '0')))))
+                    return rows
+                elif res.status in [403, 429]:
+                    continue # Host is paused by the rate limiter (Retry-After / backoff)
+                else:
+                    return None
         except Exception:
-            await asyncio.sleep(1)
-            
-    return []
+            await retry_delay(attempt)
+    return None
+
+@single_flight(lambda ticker, pages=15, page_size=20: (NAVER_PRICE_URL.format(ticker=ticker, page_size=page_size, page=1), pages))
+async def fetch_naver_price_history_async(session, ticker, pages=15, page_size=20):
+    """
+    Brings the local series (data/price_history/<ticker>.csv) up to date and returns it (PriceSeries).
+    Page 1 (newest) is read first; the pages needed to reach the last cached
+    trading day follow (estimated ones concurrently, the host limiter bounds them).
+    The series is only written if it stays contiguous: a failed page leaves it
+    untouched (retried next run), a gap past PRICE_GAP_MAX_PAGES rebuilds it.
+    First run: `pages` pages (~250 trading days are needed for the 1y return).
+    File I/O runs in a thread, off the event loop.
+    """
+    series = await asyncio.to_thread(PRICE_HISTORY.load, ticker)
+    if await asyncio.to_thread(PRICE_HISTORY.is_fresh, ticker, TRADING_CALENDAR):
+        return series
+
+    first = await _fetch_price_page(session, ticker, 1, page_size)
+    if not first:
+        return series
+    rows = list(first)
+    last_cached = series.last_date
+    failed = False
+    ended = len(first) < page_size # Naver has nothing older
+
+    def behind_cache():
+        return last_cached is not None and rows[-1][0].isoformat() > last_cached
+
+    def take(page_rows):
+        nonlocal failed, ended
+        if page_rows is None:
+            failed = True
+        else:
+            rows.extend(page_rows)
+            ended = len(page_rows) < page_size
+        return not (failed or ended)
+
+    limit = pages if last_cached is None else PRICE_GAP_MAX_PAGES
+    more = 0
+    if not ended:
+        if last_cached is None:
+            more = pages - 1
+        elif behind_cache():
+            # Calendar gap -> trading days (weekends), rounded up to whole pages
+            gap = (first[-1][0] - date.fromisoformat(last_cached)).days
+            more = min(limit - 1, -(-gap * 5 // 7 // page_size) or 1)
+
+    next_page = 2
+    if more:
+        for page_rows in await asyncio.gather(*[_fetch_price_page(session, ticker, p, page_size)
+                                                for p in range(2, more + 2)]):
+            next_page += 1
+            if not take(page_rows):
+                break
+    # Holidays make the estimate fall short: page on until the last cached day shows up
+    while behind_cache() and not (failed or ended) and next_page <= limit:
+        take(await _fetch_price_page(session, ticker, next_page, page_size))
+        next_page += 1
+
+    days = to_epoch_days([r[0].isoformat() for r in rows])
+    bars = [r[1:] for r in rows]
+    if behind_cache() and not ended:
+        if failed:
+            return series # Appending would leave a hole under the new rows
+        # Gap wider than PRICE_GAP_MAX_PAGES: rebuild from the fetched pages
+        await asyncio.to_thread(PRICE_HISTORY.replace, ticker, days, bars)
+    else:
+        await asyncio.to_thread(PRICE_HISTORY.append, ticker, days, bars)
+    return await asyncio.to_thread(PRICE_HISTORY.load, ticker)
 
+@single_flight(lambda ticker: NAVER_INTRADAY_URL.format(ticker=ticker))
 async def fetch_naver_intraday_async(session, ticker):
     for attempt in range(3):
         try:
             # Correct API for intra-day (1-minute) price points
-            url = f"https://api.stock.naver.com/chart/domestic/item/{ticker}?periodType=day"
+            url = NAVER_INTRADAY_URL.format(ticker=ticker)
             headers = HEADERS.copy()
             headers["Referer"] = f"https://m.stock.naver.com/domestic/stock/{ticker}/total"
-            async with session.get(url, headers=headers, timeout=10) as res:
+            async with HTTP_CACHE.fetch(session, url, headers=headers, timeout=10) as res:
                 if res.status == 200:
                     data = await res.json()
                     if isinstance(data, dict):
@@ -295,19 +435,20 @@ async def fetch_naver_intraday_async(session, ticker):
                             return [float(p.get('currentPrice') or p.get('closePrice') or 0) for p in price_infos if p.get('currentPrice') or p.get('closePrice')]
                     return []
                 elif res.status in [403, 429]:
-                    await asyncio.sleep(1)
+                    continue # Host is paused by the rate limiter (Retry-After / backoff)
                 else: break
         except Exception:
-            await asyncio.sleep(1)
+            await retry_delay(attempt)
     return []
 
+@single_flight(lambda ticker: NAVER_STOCK_BASIC_URL.format(ticker=ticker))
 async def fetch_naver_stock_basic_async(session, ticker):
     for attempt in range(3):
         try:
-            url = f"https://m.stock.naver.com/api/stock/{ticker}/basic"
+            url = NAVER_STOCK_BASIC_URL.format(ticker=ticker)
             headers = HEADERS.copy()
             headers["Referer"] = f"https://m.stock.naver.com/domestic/stock/{ticker}/total"
-            async with session.get(url, headers=headers, timeout=10) as res:
+            async with HTTP_CACHE.fetch(session, url, headers=headers, timeout=10) as res:
                 if res.status == 200:
                     data = await res.json()
                     # Check for "result" key (sometimes nested, sometimes flat)
@@ -316,20 +457,21 @@ async def fetch_naver_stock_basic_async(session, ticker):
                             return data['result']
                         return data
                 elif res.status in [403, 429]:
-                    await asyncio.sleep(1)
+                    continue # Host is paused by the rate limiter (Retry-After / backoff)
                 else: break
         except Exception:
-            await asyncio.sleep(1)
+            await retry_delay(attempt)
     return {}
 
+@single_flight(lambda ticker: NAVER_ETF_BASIC_URL.format(ticker=ticker))
 async def fetch_naver_etf_basic_async(session, ticker):
     for attempt in range(3):
         try:
             headers = HEADERS.copy()
             headers["Referer"] = f"https://m.stock.naver.com/domestic/stock/{ticker}/total"
-            url_etf = f"https://m.stock.naver.com/api/etf/{ticker}/basic"
+            url_etf = NAVER_ETF_BASIC_URL.format(ticker=ticker)
             
-            async with session.get(url_etf, headers=headers, timeout=10) as res:
+            async with HTTP_CACHE.fetch(session, url_etf, headers=headers, timeout=10) as res:
                 if res.status == 200:
                     d = await res.json()
                     res_data = d
@@ -366,10 +508,10 @@ async def fetch_naver_etf_basic_async(session, ticker):
                         'compareToPreviousClosePrice': _safe_int(_clean_num(res_data.get('compareToPreviousClosePrice', '0')))
                     }
                 elif res.status in [403, 429]:
-                    await asyncio.sleep(1)
+                    continue # Host is paused by the rate limiter (Retry-After / backoff)
                 else: break
         except Exception:
-            await asyncio.sleep(1)
+            await retry_delay(attempt)
             
     return {'name': '', 'returns': {}, 'sector': 'Etc'}
 
@@ -439,16 +581,35 @@ def classify_sector(ticker_name, index_name):
         
     return "[기타] 분류미상"
 
-async def get_dividend_info_async(session, ticker, current_price, manual_data):
+def _naver_info_from_record(record):
+    """Stored record -> fetch_naver_etf_basic_async() shape (ETF basic not refetched)."""
+    return {
+        'name': record.get('name', ''),
+        # Raw Naver values as fetched; return_* are already blended with KRX
+        'returns': dict(record.get('naver_returns') or {}),
+        'sector': record.get('sector', 'Etc'),
+        'closePrice': record.get('price', 0),
+        'fluctuationRate': record.get('daily_change_rate', 0.0),
+        'compareToPreviousClosePrice': record.get('daily_change_value', 0),
+    }
+
+async def get_dividend_info_async(session, ticker, current_price, manual_data, existing=None, classes=None):
     """
     Consolidated Async Fetcher
+    classes: stale field classes (refresh_planner); None = fetch everything.
+    Sources that are not needed are taken from the `existing` record instead.
     """
+    existing = existing or {}
+    endpoints = refresh_planner.endpoints_for(classes if existing else None)
+
+    async def skipped(value):
+        return value
     # 1. Fetch FnGuide HTML + Naver Basic + Naver History concurrently
     url_fn = f"https://comp.fnguide.com/svo2/asp/etf_snapshot.asp?pGB=1&gicode=A{ticker}&cID=&MenuYn=Y&ReportGB=&NewMenuID=106&stkGb=770"
     
     async def fetch_text(url):
         try:
-             async with session.get(url, timeout=10) as r:
+             async with HTTP_CACHE.fetch(session, url, timeout=10) as r:
                  if r.status == 200:
                      # encoding might be euc-kr or utf-8? FnGuide usually euc-kr or cp949 but aiohttp auto-detects often
                      # Let's force read content and decode safely
@@ -461,11 +622,24 @@ async def get_dividend_info_async(session, ticker, current_price, manual_data):
             return ""
         return ""
 
-    # Launch initial tasks
-    task_fn = fetch_text(url_fn)
-    task_naver_basic = fetch_naver_etf_basic_async(session, ticker)
-    task_naver_hist = fetch_naver_etf_dividend_history_async(session, ticker)
-    task_naver_intraday = fetch_naver_intraday_async(session, ticker)
+    # Launch initial tasks (fresh classes reuse the stored record)
+    task_fn = fetch_text(url_fn) if "fnguide" in endpoints else skipped("")
+    if "etf_basic" in endpoints:
+        task_naver_basic = fetch_naver_etf_basic_async(session, ticker)
+    else:
+        task_naver_basic = skipped(_naver_info_from_record(existing))
+    # Stored history is kept; Naver is only asked for ex-dates after the latest one it gave us
+    # (dist_history may also hold manual / FnGuide rows, tagged by "source", which must not move this point)
+    known_dist = existing.get("dist_history") or []
+    naver_latest = existing.get("dist_naver_latest") or None
+    if "dividend_history" in endpoints:
+        task_naver_hist = fetch_naver_etf_dividend_history_async(session, ticker, since=naver_latest)
+    else:
+        task_naver_hist = skipped(None)
+    if "intraday" in endpoints:
+        task_naver_intraday = fetch_naver_intraday_async(session, ticker)
+    else:
+        task_naver_intraday = skipped(existing.get("trend_1d", []))
     
     # Gather basics
     results = await asyncio.gather(task_fn, task_naver_basic, task_naver_hist, task_naver_intraday)
@@ -475,10 +649,27 @@ async def get_dividend_info_async(session, ticker, current_price, manual_data):
     naver_hist_raw = results[2]
     intraday_data = results[3]
 
+    # Endpoints requested / answered with real data; refresh_planner only stamps classes whose requests all worked
+    requested = endpoints - {"price_history"} # Only requested below if Naver lacks returns
+    endpoints_ok = set()
+    if "etf_basic" in endpoints and naver_info.get('closePrice', 0) > 0:
+        endpoints_ok.add("etf_basic")
+    if "dividend_history" in endpoints and naver_hist_raw is not None:
+        endpoints_ok.add("dividend_history")
+    if "intraday" in endpoints and intraday_data:
+        endpoints_ok.add("intraday")
+
+    # Stock basic is fetched at most once, and only if an earlier source lacks a field
+    stock_basic_cache = []
+    async def get_stock_basic():
+        if not stock_basic_cache:
+            stock_basic_cache.append(await fetch_naver_stock_basic_async(session, ticker))
+        return stock_basic_cache[0]
+
     # If naver_info (from ETF API) is empty or missing name/price, it might be a regular stock or new listing
     # Fetch stock basic as fallback for price/name
     if not naver_info.get('closePrice') or not naver_info.get('name'):
-        stock_basic = await fetch_naver_stock_basic_async(session, ticker)
+        stock_basic = await get_stock_basic()
         if stock_basic:
             # Normalize stock_basic fields to match naver_info structure
             if not naver_info: naver_info = {}
@@ -527,21 +718,24 @@ async def get_dividend_info_async(session, ticker, current_price, manual_data):
         # Use Naver price directly.
         updated_price = naver_price
 
-    price_hist = []
-    # Always fetch at least 1 page for sparkline (trend_7d)
-    hist_pages = 15 if needs_hist else 1
-    price_hist = await fetch_naver_price_history_async(session, ticker, pages=hist_pages)
+    series = None
+    # Only used to fill missing returns below
+    if needs_hist and "price_history" in endpoints:
+        series = await fetch_naver_price_history_async(session, ticker, pages=15)
+        requested.add("price_history")
+        if series is not None and len(series.days):
+            endpoints_ok.add("price_history")
 
-    # Calc Returns from History if missing (Fallback for 1M, 3M, 6M, 1Y)
+    # Calc Returns from History if missing (Fallback for 1M, 3M, 6M, 1Y), from the local series
     def calc_hist_return(days_ago):
-        if not price_hist: return 0.0
-        cutoff = date.today() - timedelta(days=days_ago)
-        p_now_h = price_hist[0]['price']
-        for r in price_hist:
-            if r['date'] <= cutoff:
-                if r['price'] > 0:
-                     return (p_now_h - r['price']) / r['price'] * 100.0
-                return 0.0
+        if series is None or not len(series.days): return 0.0
+        cutoff = (date.today() - timedelta(days=days_ago) - date(1970, 1, 1)).days
+        idx = int(np.searchsorted(series.days, cutoff, side="right")) - 1 # last day <= cutoff
+        if idx < 0: return 0.0
+        p_now_h = int(series.bars[-1, PRICE_CLOSE])
+        p_then = int(series.bars[idx, PRICE_CLOSE])
+        if p_then > 0:
+            return (p_now_h - p_then) / p_then * 100.0
         return 0.0
 
     if "returns" not in naver_info: naver_info["returns"] = {}
@@ -552,27 +746,26 @@ async def get_dividend_info_async(session, ticker, current_price, manual_data):
             val = calc_hist_return(d)
             if val != 0: naver_info["returns"][k] = round(val, 2)
     
-    # Parse FnGuide
-    div_yield = _safe_float(_clean_num(_find_text_by_label(["배당수익률", "배당수익률(%)"], html_fn)) or 0.0)
-    dist_recent = _safe_int(_clean_num(_find_text_by_label(["최근 분배금", "최근 분배금(원)"], html_fn)) or 0)
-    dist_base_date = _find_text_by_label(["최근 분배금 지급기준일"], html_fn) or ""
-    dist_freq_1y = _safe_int(_clean_num(_find_text_by_label(["연 분배횟수", "연 분배횟수(회)"], html_fn)) or 0)
-
-    # Resolve Name
-    etf_name = naver_info['name']
-    if not etf_name:
-        # Fallback parsing from info... assume stock.get_etf_ticker_name is slow/sync, skip for now or use cached
-        if html_fn:
-            try:
-                # Simple regex for name in title?
-                m = re.search(r"<h1[^>]*id=\"giName\"[^>]*>(.*?)</h1>", html_fn)
-                if m: etf_name = m.group(1).strip()
-            except: pass
+    # Parse FnGuide (worker process during load_data)
+    fn_name = ""
+    snapshot = await PARSE_POOL.run(parse_fnguide_snapshot, html_fn) if "fnguide" in endpoints and html_fn else None
+    if snapshot and any(snapshot):
+        div_yield, dist_recent, dist_base_date, dist_freq_1y, fn_name = snapshot
+        endpoints_ok.add("fnguide")
+    else:
+        # Not planned, or the page failed / was not a snapshot page: keep the stored values
+        div_yield = existing.get("yield", 0.0)
+        dist_recent = existing.get("dist_amount_recent", 0)
+        dist_base_date = existing.get("dist_base_date", "")
+        dist_freq_1y = existing.get("dist_freq_1y", 0)
+
+    # Resolve Name (FnGuide giName as fallback)
+    etf_name = naver_info['name'] or fn_name
             
-    # Final Fallback: Stock Basic API (Reliable for Name)
+    # Final Fallback: Stock Basic API (Reliable for Name); reuses the response fetched above
     if not etf_name or etf_name == str(ticker):
         try:
-             stock_basic = await fetch_naver_stock_basic_async(session, ticker)
+             stock_basic = await get_stock_basic()
              if stock_basic.get('stockName'):
                  etf_name = stock_basic['stockName']
         except:
@@ -581,7 +774,10 @@ async def get_dividend_info_async(session, ticker, current_price, manual_data):
     if not etf_name:
         etf_name = str(ticker)
 
-    sector = classify_sector(etf_name, naver_info['sector'])
+    if "etf_basic" in endpoints or not existing.get("sector"):
+        sector = classify_sector(etf_name, naver_info['sector'])
+    else:
+        sector = existing["sector"] # Already classified
 
     # Build History
     manual_rows = []
@@ -592,20 +788,26 @@ async def get_dividend_info_async(session, ticker, current_price, manual_data):
             if d:
                 manual_rows.append((d, int(v)))
     
-    hist = []
-    for d_str, amt_str in naver_hist_raw:
+    fetched = []
+    # None: distributions are fresh or the fetch failed -> TTM/yields from the stored history only
+    for d_str, amt_str in naver_hist_raw or []:
         d = _parse_date_any(d_str)
         v = _safe_int(amt_str)
         if d and v > 0:
-            hist.append((d, v))
-            
+            fetched.append((d, v))
+    if fetched:
+        newest = max(d for d, _ in fetched).strftime("%Y-%m-%d")
+    # Stored (multi-year) history under the fetched rows, rows tagged by source
+    hist = merge_dist_history(fetched, known_dist, naver_latest)
+    if fetched:
+        naver_latest = max(naver_latest or newest, newest)
+
     if not hist and manual_rows:
-        hist = manual_rows
-        
+        hist = [(d, v, "manual") for d, v in manual_rows]
+
     if not hist and html_fn:
-        # Parsing table from HTML is sync, but CPU bound.
-        # Offloading to thread to prevent blocking event loop during large batch updates.
-        hist = await asyncio.to_thread(_extract_history_from_html_tables, html_fn)
+        # read_html is CPU bound: worker process (thread outside load_data)
+        hist = [(d, v, "fnguide") for d, v in await PARSE_POOL.run(extract_history_from_html_tables, html_fn)]
 
     hist = list(set(hist))
     hist.sort(key=lambda x: x[0], reverse=True)
@@ -616,7 +818,7 @@ async def get_dividend_info_async(session, ticker, current_price, manual_data):
     dist_ttm_count = 0
     dist_ttm_last_date = ""
 
-    for d, amt in hist:
+    for d, amt, _ in hist:
         if d >= cutoff:
             dist_ttm_amount += int(amt)
             dist_ttm_count += 1
@@ -671,12 +873,15 @@ async def get_dividend_info_async(session, ticker, current_price, manual_data):
         "sector": sector,
         "_name_fetched": etf_name,
         "naver_returns": naver_info.get("returns", {}),
-        "dist_history": [{"date": d.strftime("%Y-%m-%d"), "amount": amt} for d, amt in hist],
+        "dist_history": [{"date": d.strftime("%Y-%m-%d"), "amount": amt, **({"source": src} if src else {})}
+                         for d, amt, src in hist],
+        "dist_naver_latest": naver_latest or "",
         "updated_price": updated_price,
         "daily_change_rate": round(float(daily_change_rate), 2),
         "daily_change_value": int(daily_change_value),
-        "price_hist": price_hist,
-        "intraday_data": intraday_data # 1-day trend
+        "intraday_data": intraday_data, # 1-day trend
+        "_endpoints": requested,
+        "_endpoints_ok": endpoints_ok,
     }
 
 def get_income_yield_annual(div_info: dict) -> float:
@@ -694,20 +899,19 @@ def get_income_amount_annual(div_info: dict) -> int:
     return 0
 
 # =========================
-# KRX (Sync) - Kept as is
+# KRX (Sync)
 # =========================
 def get_price_df(date_obj):
-    for i in range(7):
-        d = (date_obj - timedelta(days=i)).strftime("%Y%m%d")
+    """Closes (["종가"]) of the trading day standing for date_obj; past days come from KRX_DAILY."""
+    day = TRADING_CALENDAR.anchor_day(date_obj)
+    for _ in range(3): # Repeats on a KRX failure or a weekday-guessed holiday
         try:
-            # print(f"[DEBUG] Fetching KRX etf ohlcv for {d}...")
-            df = stock.get_etf_ohlcv_by_ticker(d)
+            df = KRX_DAILY.fetch(day.strftime("%Y%m%d"))
             if not df.empty:
-                # print(f"[DEBUG] Success {d} (rows={len(df)})")
-                return df[["종가"]]
+                return df
         except Exception as e:
-            # print(f"[DEBUG] Fail {d}: {e}")
-            continue
+            print(f"[KRX] {day} closes unavailable: {e}")
+        day = TRADING_CALENDAR.previous(day)
     return pd.DataFrame()
 
 def calc_return_pct(now_price, past_price):
@@ -721,73 +925,146 @@ def calc_return_pct(now_price, past_price):
 # =========================
 # Main Logic
 # =========================
-async def process_tickers_async(tickers, master_df, manual_data, progress_callback, stop_event):
-    results = {}
-    conn = aiohttp.TCPConnector(limit=MAX_Async_CONCURRENCY)
-    timeout = aiohttp.ClientTimeout(total=60) # Increased timeout for full discovery
+def load_seed_tickers():
+    """Tickers listed in data/universe_seed.json ([] if missing/unreadable)."""
+    try:
+        with open(SEED_PATH, "r", encoding="utf-8") as f:
+            return [item["ticker"] for item in json.load(f) if item.get("ticker")]
+    except Exception:
+        return []
+
+async def process_tickers_async(session, tickers, master_df, manual_data, progress_callback, stop_event,
+                                existing=None, force=False, priority_tickers=None, checkpoint=None,
+                                resumed_tickers=()):
+    """
+    `session`: the shared pooled session (async_session.get_runner().run)
+    `existing`: current universe; only stale field classes are refetched (force=True: everything)
+    `priority_tickers`: processed before universe_seed.json tickers and the rest (portfolio holdings)
+    `checkpoint`: universe_store.UpdateCheckpoint receiving each finished ticker
+    `resumed_tickers`: already refetched by an interrupted force=True run, skipped even with force
+    """
+    session = async_session.RunSession(session) # Request memo for this run
+    valid_tickers, plans = await select_tickers_async(session, tickers, master_df, progress_callback,
+                                                      existing, force, resumed_tickers)
+    if not valid_tickers:
+        return {}
+    return await run_ticker_queue(session, valid_tickers, plans, master_df, manual_data, progress_callback,
+                                  stop_event, existing, force, priority_tickers, checkpoint)
+
+async def select_tickers_async(session, tickers, master_df, progress_callback, existing=None, force=False,
+                               resumed_tickers=()):
+    """Discovery (Naver ETF list) + refresh plan. Returns (tickers to fetch, {ticker: stale classes})."""
+    # 1. Fetch Definitive ETF List from Naver (Direct Discovery)
+    if progress_callback:
+        progress_callback("Discovering All Listed ETFs (Naver API)...", 5)
+    naver_etf_map = await fetch_naver_etf_list(session)
     
-    async with aiohttp.ClientSession(connector=conn, timeout=timeout) as session:
-        # 1. Fetch Definitive ETF List from Naver (Direct Discovery)
-        if progress_callback:
-            progress_callback("Discovering All Listed ETFs (Naver API)...", 5)
-        naver_etf_map = await fetch_naver_etf_list(session)
-        
-        # 2. Automated Discovery & Filtering
-        # Discovery triggers if:
-        # a) It's a full update (many/no tickers)
-        # b) Any input ticker is NOT found in the current master_df (meaning it might be a new listing)
-        input_set = set(tickers)
-        known_set = set(master_df.index) if not master_df.empty else set()
-        missing_from_master = input_set - known_set
-        
-        is_full_update = (len(tickers) > 50 or not tickers or missing_from_master)
-        
-        if is_full_update and naver_etf_map:
-            # Discovery: Add any tickers from Naver that weren't in the input list
-            discovery_set = set(naver_etf_map.keys())
-            new_discoveries = discovery_set - input_set
-            
-            if new_discoveries:
-                print(f"[Discovery] Found {len(new_discoveries)} new ETFs from Naver list.")
-                tickers = list(input_set | discovery_set) # Merge
-        
-        valid_tickers = []
-        for t in tickers:
-            if t in naver_etf_map:
-                valid_tickers.append(t)
-            else:
-                # Log or handle strictly: only process IF it's in the Naver ETF list
-                # This removes things like "005930" (Samsung) which is a stock.
-                print(f"[Filter] Skipping non-ETF ticker: {t}")
+    # 2. Automated Discovery & Filtering
+    # Discovery triggers if:
+    # a) It's a full update (many/no tickers)
+    # b) Any input ticker is NOT found in the current master_df (meaning it might be a new listing)
+    input_set = set(tickers)
+    known_set = set(master_df.index) if not master_df.empty else set()
+    missing_from_master = input_set - known_set
+    
+    is_full_update = (len(tickers) > 50 or not tickers or missing_from_master)
+    
+    if is_full_update and naver_etf_map:
+        # Discovery: Add any tickers from Naver that weren't in the input list
+        discovery_set = set(naver_etf_map.keys())
+        new_discoveries = discovery_set - input_set
         
-        if not valid_tickers:
-            print("[loader] No valid ETFs to process.")
-            return {}
-
-        total = len(valid_tickers)
-        tasks = []
-        for ticker in valid_tickers:
-            tasks.append(process_single_ticker(session, ticker, master_df, manual_data))
-            
-        # Run
-        done_count = 0
-        for f in asyncio.as_completed(tasks):
-             if stop_event and stop_event.is_set():
-                 break
-                 
-             res = await f
-             done_count += 1
-             
-             if res:
-                 results[res["symbol"]] = res["data"]
-                 
-             if progress_callback:
-                 pct = int((done_count / total) * 100)
-                 progress_callback(f"Collecting Dividends ({done_count}/{total})", pct)
-                 
+        if new_discoveries:
+            print(f"[Discovery] Found {len(new_discoveries)} new ETFs from Naver list.")
+            tickers = list(input_set | discovery_set) # Merge
+    
+    valid_tickers = []
+    for t in tickers:
+        if t in naver_etf_map:
+            valid_tickers.append(t)
+        else:
+            # Log or handle strictly: only process IF it's in the Naver ETF list
+            # This removes things like "005930" (Samsung) which is a stock.
+            print(f"[Filter] Skipping non-ETF ticker: {t}")
+    
+    if not valid_tickers:
+        print("[loader] No valid ETFs to process.")
+        return [], {}
+
+    plans = refresh_planner.plan(existing, valid_tickers, force=force, calendar=TRADING_CALENDAR)
+    fetch_count = sum(len(refresh_planner.endpoints_for(c)) for c in plans.values())
+    print(f"[Planner] {len(plans)}/{len(valid_tickers)} tickers stale, {fetch_count} endpoint fetches "
+          f"(full refetch would be {len(valid_tickers) * len(refresh_planner.ALL_ENDPOINTS)})")
+    valid_tickers = [t for t in valid_tickers if t in plans and not (force and t in resumed_tickers)]
+    if force and resumed_tickers:
+        print(f"[Checkpoint] {len(plans) - len(valid_tickers)} tickers already done by the interrupted run")
+    if not valid_tickers:
+        print("[loader] Everything is fresh.")
+    return valid_tickers, plans
+
+def priority_order(tickers, priority_tickers=None):
+    """Portfolio holdings first, then universe_seed.json, then everything else: [(rank, order, ticker)]"""
+    portfolio = set(priority_tickers or [])
+    seed = set(load_seed_tickers())
+    ranked = []
+    for order, ticker in enumerate(tickers):
+        rank = PRIORITY_PORTFOLIO if ticker in portfolio else PRIORITY_SEED if ticker in seed else PRIORITY_REST
+        ranked.append((rank, order, ticker))
+    return sorted(ranked)
+
+async def run_ticker_queue(session, valid_tickers, plans, master_df, manual_data, progress_callback, stop_event,
+                           existing=None, force=False, priority_tickers=None, checkpoint=None):
+    """
+    Fixed worker pool over the priority queue; progress_callback is called once per finished ticker.
+    `session`: async_session.RunSession of this run
+    """
+    results = {}
+    ranked = priority_order(valid_tickers, priority_tickers)
+    queue = asyncio.PriorityQueue()
+    for entry in ranked:
+        queue.put_nowait(entry)
+    total = len(valid_tickers)
+    portfolio_left = sum(1 for rank, _, _ in ranked if rank == PRIORITY_PORTFOLIO)
+    done_count = 0
+
+    async def worker():
+        nonlocal done_count, portfolio_left
+        while not queue.empty():
+            rank, _, ticker = queue.get_nowait()
+            with session.scope(ticker): # The ticker's responses leave the run memo once it is done
+                res = await process_single_ticker(session, ticker, master_df, manual_data,
+                                                  (existing or {}).get(ticker), plans[ticker])
+            done_count += 1
+            if res:
+                results[res["symbol"]] = res["data"]
+                if checkpoint is not None:
+                    checkpoint.append(res["symbol"], res["data"], force)
+            if rank == PRIORITY_PORTFOLIO:
+                portfolio_left -= 1
+                if portfolio_left == 0:
+                    print(f"[Queue] Portfolio tickers done ({done_count}/{total})")
+            if progress_callback:
+                pct = int((done_count / total) * 100)
+                progress_callback(f"Collecting Dividends ({done_count}/{total})", pct)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(min(TICKER_WORKERS, total))]
+    all_done = asyncio.gather(*workers)
+    # stop_event is a threading.Event: poll it and cancel in-flight tickers right away
+    try:
+        while not all_done.done():
+            if stop_event and stop_event.is_set():
+                break
+            await asyncio.wait([all_done], timeout=STOP_POLL_INTERVAL)
+    finally:
+        all_done.cancel() # No-op once every worker has finished
+    try:
+        await all_done
+    except asyncio.CancelledError:
+        print(f"[Queue] Stopped after {done_count}/{total} tickers")
+
     return results
 
-async def process_single_ticker(session, ticker, master_df, manual_data):
+async def process_single_ticker(session, ticker, master_df, manual_data, existing=None, classes=None):
     try:
         # Default prices to 0 if ticker not found in master_df (e.g. new listing or regular stock)
         if ticker in master_df.index:
@@ -805,7 +1082,7 @@ async def process_single_ticker(session, ticker, master_df, manual_data):
             price_1m = price_3m = price_6m = price_1y = price_3y = price_5y = 0
 
         # Async Data Fetch
-        div = await get_dividend_info_async(session, ticker, price_now, manual_data)
+        div = await get_dividend_info_async(session, ticker, price_now, manual_data, existing, classes)
         
         # Update Price if Naver has better data
         if div.get("updated_price", 0) > 0:
@@ -870,6 +1147,8 @@ async def process_single_ticker(session, ticker, master_df, manual_data):
                 
                 "sector": div.get("sector", ""),
                 "dist_history": div.get("dist_history", []),
+                "dist_naver_latest": div.get("dist_naver_latest", ""), # since= of the next incremental fetch
+                "naver_returns": div.get("naver_returns", {}), # Fallback source when ETF basic is skipped
 
                 "income_yield_annual_used": float(income_yield_annual),
                 "income_amount_annual_used": int(annual_income_amt),
@@ -907,17 +1186,148 @@ async def process_single_ticker(session, ticker, master_df, manual_data):
                 "trend_1d": div.get("intraday_data", []),
 
                 "last_updated": datetime.now().strftime("%Y-%m-%d"),
+                # Classes whose sources failed keep their old timestamp and are retried next run
+                "fetched_at": refresh_planner.mark_fetched(
+                    (existing or {}).get("fetched_at"),
+                    refresh_planner.confirmed_classes(
+                        classes if existing and classes is not None else refresh_planner.FIELD_CLASSES,
+                        div["_endpoints"], div["_endpoints_ok"])),
             }
         }
     except Exception as e:
         # print(f"Error {ticker}: {e}")
         return None
 
-def load_data(progress_callback=None, target_tickers=None, stop_event=None):
+# =========================
+# Sharded Update (multi-process)
+# =========================
+def _run_shard(index, shards, tickers, plans, master_df, manual_data, existing, force, priority_tickers,
+               checkpoint_path, events, stop):
+    """Worker process: own event loop + session, 1/shards of the request budget, events back to the parent."""
+    scale_limits(1.0 / shards)
+    PARSE_POOL.workers = 0 # The shards already occupy the cores
+    done = 0
+
+    def progress(msg, pct):
+        nonlocal done
+        done += 1 # run_ticker_queue reports once per finished ticker
+        events.put(("progress", index, done))
+
+    async def run(session):
+        return await run_ticker_queue(async_session.RunSession(session), tickers, plans, master_df, manual_data,
+                                      progress, stop, existing, force, priority_tickers,
+                                      universe_store.UpdateCheckpoint(checkpoint_path))
+
+    runner = async_session.get_runner()
+    try:
+        # Cache counts ride along so the parent's [DONE] line covers every shard
+        events.put(("result", index, (runner.run(run), HTTP_CACHE.hits, HTTP_CACHE.misses)))
+    except Exception as e:
+        events.put(("error", index, str(e)))
+    finally:
+        runner.close()
+
+def run_sharded_update(shards, tickers, plans, master_df, manual_data, progress_callback, stop_event,
+                       existing, force, priority_tickers, checkpoint):
+    """
+    Splits the planned tickers round-robin in priority order (every shard starts with portfolio
+    holdings) and merges the shard results. Progress is summed into one progress_callback.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    events, stop = ctx.Queue(), ctx.Event()
+    parts = [[] for _ in range(shards)]
+    for i, (_, _, t) in enumerate(priority_order(tickers, priority_tickers)):
+        parts[i % shards].append(t)
+    parts = [p for p in parts if p]
+    total = len(tickers)
+
+    procs = []
+    for i, part in enumerate(parts):
+        proc = ctx.Process(
+            target=_run_shard, name=f"update-shard-{i}", daemon=True,
+            args=(i, len(parts), part, {t: plans[t] for t in part}, master_df.loc[master_df.index.intersection(part)],
+                  manual_data, {t: existing[t] for t in part if t in existing}, force, priority_tickers,
+                  checkpoint.for_shard(i).path, events, stop))
+        proc.start()
+        procs.append(proc)
+    print(f"[Shard] {total} tickers across {len(procs)} processes")
+
+    results, done, finished, exited = {}, [0] * len(procs), set(), set()
+    while len(finished) < len(procs):
+        if stop_event and stop_event.is_set():
+            stop.set()
+        try:
+            kind, i, payload = events.get(timeout=STOP_POLL_INTERVAL)
+        except Empty:
+            for i, proc in enumerate(procs):
+                if i in finished or proc.exitcode is None:
+                    continue
+                if i not in exited:
+                    exited.add(i) # Its last events are flushed before exit: poll the queue once more
+                    continue
+                # Exited (crash, or code 0 with the result lost) without a result:
+                # what it finished is in its checkpoint file
+                records, _ = checkpoint.for_shard(i).load()
+                results.update(records)
+                finished.add(i)
+                print(f"[Shard] {proc.name} exited with {proc.exitcode} without a result, "
+                      f"recovered {len(records)} tickers")
+            continue
+        if i in finished:
+            continue # Late event of a shard already recovered from its checkpoint
+        if kind == "progress":
+            done[i] = payload
+            if progress_callback:
+                n = sum(done)
+                progress_callback(f"Collecting Dividends ({n}/{total}, {len(procs)} shards)", int(n / total * 100))
+        elif kind == "result":
+            records, hits, misses = payload
+            results.update(records)
+            HTTP_CACHE.hits += hits
+            HTTP_CACHE.misses += misses
+            finished.add(i)
+        else:
+            print(f"[Shard] shard {i} failed: {payload}")
+            records, _ = checkpoint.for_shard(i).load()
+            results.update(records)
+            finished.add(i)
+
+    for proc in procs:
+        proc.join(timeout=5)
+    return results
+
+def resume_checkpoint(cache):
+    """
+    Merges tickers finished by an interrupted update (crash, kill, stop) into the universe.
+    Returns the tickers a recent force=True run had already refetched.
+    """
+    try:
+        records, forced = cache.checkpoint.load()
+        if records:
+            cache.merge(records)
+            print(f"[Checkpoint] Recovered {len(records)} tickers from an interrupted update")
+        cache.checkpoint.clear()
+        return forced
+    except Exception as e:
+        print(f"[Checkpoint] Recovery failed: {e}")
+        return set()
+
+def load_data(progress_callback=None, target_tickers=None, stop_event=None, force=False, priority_tickers=None,
+              shards=None):
+    """
+    force=True refetches every source; otherwise refresh_planner skips fresh field classes.
+    priority_tickers (portfolio holdings) are fetched first.
+    shards: worker processes for the ticker phase (None: UPDATE_SHARDS)
+    """
     print("[START] loader (Async)")
+    HTTP_CACHE.prune()
+    HTTP_CACHE.reset_stats() # Counts reported at [DONE] are for this run
+    TRADING_CALENDAR.refresh() # KRX call here, before any thread or the event loop looks days up
+    cache = universe_store.get_cache(OUTPUT_PATH)
+    resumed_tickers = resume_checkpoint(cache)
 
     # 1. KRX Prices (Sync, Threaded)
-    now_dt = datetime.now()
+    now_dt = now_kst()
     dates = {
         "now": now_dt,
         "1m": now_dt - timedelta(days=30),
@@ -950,8 +1360,11 @@ def load_data(progress_callback=None, target_tickers=None, stop_event=None):
         if os.path.exists(OUTPUT_PATH):
              print(f"[WARN] Loading from {OUTPUT_PATH} (Fallback)")
              try:
-                 with open(OUTPUT_PATH, 'r', encoding='utf-8') as f:
-                     cached_data = json.load(f)
+                 # Scalar columns only: history lists are not needed here
+                 cached_data = universe_store.get_cache(OUTPUT_PATH).get_records(
+                     ["price"] + [f"return_{p}" for p in ["1m", "3m", "6m", "1y", "3y", "5y"]])
+                 if cached_data is None:
+                     raise ValueError("universe file unreadable")
                  
                  # Construct valid master df from cache
                  cached_tickers = list(cached_data.keys())
@@ -1039,99 +1452,153 @@ def load_data(progress_callback=None, target_tickers=None, stop_event=None):
                 manual_data = json.load(f)
         except: pass
 
-    # Windows Asyncio Policy fix for some environments
-    if sys.platform == 'win32':
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-
-    # Run Async Loop
-    results = asyncio.run(process_tickers_async(tickers, master, manual_data, progress_callback, stop_event))
+    existing = cache.get() or {}
+
+    # Discovery + plan on the shared session loop (pooled connections, DNS cache)
+    runner = async_session.get_runner()
+    valid_tickers, plans = runner.run(
+        lambda session: select_tickers_async(async_session.RunSession(session), tickers, master, progress_callback,
+                                             existing, force, resumed_tickers))
+
+    shards = UPDATE_SHARDS if shards is None else shards
+    if shards > 1 and len(valid_tickers) >= SHARD_MIN_TICKERS:
+        results = run_sharded_update(shards, valid_tickers, plans, master, manual_data, progress_callback,
+                                     stop_event, existing, force, priority_tickers, cache.checkpoint)
+    elif valid_tickers:
+        # Holdings-only / price-only runs plan few or no FnGuide pages: no worker processes for them
+        fnguide_count = sum("fnguide" in refresh_planner.endpoints_for(plans.get(t)) for t in valid_tickers)
+        if fnguide_count >= PARSE_POOL_MIN_TICKERS:
+            PARSE_POOL.start()
+        try:
+            results = runner.run(
+                lambda session: run_ticker_queue(async_session.RunSession(session), valid_tickers, plans, master,
+                                                 manual_data, progress_callback, stop_event, existing, force,
+                                                 priority_tickers, cache.checkpoint))
+        finally:
+            PARSE_POOL.shutdown()
+    else:
+        results = {}
     
     if stop_event and stop_event.is_set():
-        print("[loader] STOPPED.")
-        return
+        print(f"[loader] STOPPED. Keeping {len(results)} finished tickers.")
 
-    # Load existing data if exists to merge (for partial updates)
-    existing_data = {}
-    if os.path.exists(OUTPUT_PATH):
-        try:
-            with open(OUTPUT_PATH, "r", encoding="utf-8") as f:
-                existing_data = json.load(f)
-        except:
-            pass
-            
-    # Merge: update existing with new results
-    existing_data.update(results)
-    
-    # Save
-    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as fp:
-        json.dump(existing_data, fp, ensure_ascii=False, indent=4)
+    # Merge: update existing with new results (for partial updates)
+    # (also refreshes the in-process cache shared with flask_app; sqlite backend upserts only these rows)
+    if cache.store is not None:
+        cache.store.import_manual_history(manual_data)
+    existing_data = cache.merge(results)
+    cache.checkpoint.clear()
 
-    print(f"[DONE] saved -> {OUTPUT_PATH} (updated={len(results)}, total={len(existing_data)})")
+    print(f"[DONE] saved -> {OUTPUT_PATH} (updated={len(results)}, total={len(existing_data)}, "
+          f"http cache hits={HTTP_CACHE.hits} misses={HTTP_CACHE.misses})")
 
 # =========================
 # Fast Refresh Logic
 # =========================
-async def fetch_basic_info_only(session, ticker):
+def _quote_from_stock_basic(stock_data, ticker):
+    p = _safe_int(_clean_num(stock_data.get('closePrice', '0')))
+    rate = float(stock_data.get('fluctuationsRatio', 0) or 0)
+    val = _safe_int(_clean_num(stock_data.get('compareToPreviousClosePrice', '0') or '0'))
+
+    status_name = stock_data.get('compareToPreviousPrice', {}).get('name', '')
+    if status_name in ['FALLING', 'SHOCK', 'LOWER_LIMIT']:
+        val = -abs(val)
+        rate = -abs(rate)
+    elif status_name in ['RISING', 'UPPER_LIMIT']:
+        val = abs(val)
+        rate = abs(rate)
+
+    return {
+        'closePrice': p,
+        'change_rate': rate,
+        'change_val': val,
+        'name': stock_data.get('stockName', ticker),
+    }
+
+async def fetch_basic_info_only(session, ticker, etf_listed=True):
     """
     Fetch only price and change data.
+    etf_listed=False (not in the Naver ETF list): try Stock Basic first and
+    only fall back to ETF Basic if it has no price.
     """
-    try:
-        # Launch intraday fetch early
-        intraday_task = asyncio.create_task(fetch_naver_intraday_async(session, ticker))
-
-        # Try ETF Basic first
+    async def from_etf():
         etf_data = await fetch_naver_etf_basic_async(session, ticker)
         if etf_data.get('closePrice') and etf_data['closePrice'] > 0:
-            trend_data = await intraday_task
-            etf_data['trend_1d'] = trend_data
-            return ticker, etf_data
+            return etf_data
+        return None
 
-        # Fallback to Stock Basic
+    async def from_stock():
         stock_data = await fetch_naver_stock_basic_async(session, ticker)
         if stock_data:
-             p = _safe_int(_clean_num(stock_data.get('closePrice', '0')))
-             rate = float(stock_data.get('fluctuationsRatio', 0) or 0)
-             val = _safe_int(_clean_num(stock_data.get('compareToPreviousClosePrice', '0') or '0'))
-             
-             status_name = stock_data.get('compareToPreviousPrice', {}).get('name', '')
-             if status_name in ['FALLING', 'SHOCK', 'LOWER_LIMIT']:
-                 val = -abs(val)
-                 rate = -abs(rate)
-             elif status_name in ['RISING', 'UPPER_LIMIT']:
-                 val = abs(val)
-                 rate = abs(rate)
-             
-             trend_data = await intraday_task
-             return ticker, {
-                 'closePrice': p,
-                 'change_rate': rate,
-                 'change_val': val,
-                 'name': stock_data.get('stockName', ticker),
-                 'trend_1d': trend_data
-             }
-        
+            quote = _quote_from_stock_basic(stock_data, ticker)
+            if quote['closePrice'] > 0:
+                return quote
+        return None
+
+    try:
+        # Launch intraday fetch early
+        intraday_task = asyncio.create_task(fetch_naver_intraday_async(session, ticker))
+
+        sources = (from_etf, from_stock) if etf_listed else (from_stock, from_etf)
+        for source in sources:
+            quote = await source()
+            if quote:
+                quote['trend_1d'] = await intraday_task
+                return ticker, quote
+
         # Ensure intraday task is completed even if basics fail
         await intraday_task
     except:
         pass
     return ticker, None
 
-async def refresh_prices_async(tickers):
+async def refresh_prices_async(session, tickers, trend_tickers=None):
+    """
+    Bulk mode: price/change for every listed ETF comes from one etfItemList call.
+    Per-ticker requests are only made for
+      - tickers missing from the list (stocks, new listings) -> fetch_basic_info_only
+      - trend_1d (intraday) of `trend_tickers` (None = all tickers)
+    """
     results = {}
-    conn = aiohttp.TCPConnector(limit=20) # Higher limit for fast refresh
-    async with aiohttp.ClientSession(connector=conn) as session:
-        tasks = [fetch_basic_info_only(session, t) for t in tickers]
-        for f in asyncio.as_completed(tasks):
-            t, data = await f
+    session = async_session.RunSession(session) # Request memo for this run
+    items = await fetch_naver_etf_items(session)
+    fallback = []
+    for t in tickers:
+        quote = _quote_from_etf_item(items[t]) if t in items else None
+        if quote:
+            results[t] = quote
+        else:
+            fallback.append(t)
+
+    trend_targets = [t for t in (tickers if trend_tickers is None else trend_tickers) if t in results]
+
+    async def fetch_trend(t):
+        return t, await fetch_naver_intraday_async(session, t)
+
+    # An empty list means the list call failed, not that the tickers are stocks
+    tasks = [fetch_basic_info_only(session, t, etf_listed=not items) for t in fallback] + \
+            [fetch_trend(t) for t in trend_targets]
+    fallback_set = set(fallback)
+    for f in asyncio.as_completed(tasks):
+        t, data = await f
+        if t in fallback_set:
             if data:
                 results[t] = data
+        elif data:
+            results[t]['trend_1d'] = data
+
+    print(f"[Refresh] bulk={len(tickers) - len(fallback)} per-ticker={len(fallback)} trend={len(trend_targets)}")
     return results
 
-def refresh_prices(tickers):
-    if sys.platform == 'win32':
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    return asyncio.run(refresh_prices_async(tickers))
+def refresh_prices(tickers, trend_tickers=None):
+    # Reuses the warm keep-alive connections of the shared session
+    return async_session.get_runner().run(refresh_prices_async, tickers, trend_tickers)
 
 if __name__ == "__main__":
-    load_data()
+    import argparse
+    parser = argparse.ArgumentParser(description="Rebuild data/dividend_universe")
+    parser.add_argument("--shards", type=int, default=None,
+                        help=f"worker processes for the per-ticker phase (default KR_ETF_UPDATE_SHARDS={UPDATE_SHARDS})")
+    parser.add_argument("--force", action="store_true", help="refetch every source, ignoring freshness")
+    args = parser.parse_args()
+    load_data(force=args.force, shards=args.shards)
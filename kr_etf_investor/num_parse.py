@@ -0,0 +1,29 @@
+"""
+Number Parsing Helpers (loader / parse_pool 공용)
+✅ 스크래핑한 문자열 → 숫자 변환 규칙을 한 곳에서 관리
+   - clean_num : 숫자/소수점/부호 이외 문자 제거 ("1,234원" → "1234")
+   - safe_float / safe_int : 변환 실패 시 기본값 (환경 변수 파싱에도 사용)
+✅ pykrx/aiohttp 를 import 하지 않음 → parse_pool 워커(spawn)에서도 가볍게 import
+"""
+
+import re
+
+
+def clean_num(x):
+    if x is None:
+        return ""
+    return re.sub(r"[^\d\.\-]", "", str(x))
+
+
+def safe_float(x, default=0.0):
+    try:
+        return float(x)
+    except Exception:
+        return default
+
+
+def safe_int(x, default=0):
+    try:
+        return int(x)
+    except Exception:
+        return default
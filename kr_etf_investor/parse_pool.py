@@ -0,0 +1,145 @@
+"""
+HTML Parse Pool (loader CPU offload)
+✅ FnGuide snapshot 추출(fnguide_snapshot.py) + 분배금 표(pd.read_html) 파싱을 ProcessPoolExecutor 워커에서 실행
+   - GIL 을 잡는 파싱이 이벤트 루프 / 대시보드 Flask 스레드를 멈추지 않음, 코어 수만큼 병렬
+✅ 워커는 갱신(load_data) 한 번에 한 번만 띄우고 pandas/lxml 를 미리 import (warm-up)
+✅ 결과는 작은 tuple/list 로만 반환 (HTML 원문은 워커로 한 번만 전달)
+✅ 풀이 없거나 깨지면 기존처럼 스레드(asyncio.to_thread)에서 파싱
+✅ 워커 함수는 이 모듈 최상위에 정의 (loader/pykrx 를 import 하지 않음 → spawn 비용 최소)
+✅ 숫자 변환은 loader 와 같은 num_parse 헬퍼 사용
+
+KR_ETF_PARSE_WORKERS=0 : 프로세스 풀 사용 안 함 (loader 는 FnGuide 파싱이 PARSE_POOL_MIN_TICKERS 미만인 실행에서도 풀을 띄우지 않음)
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
+
+import pandas as pd
+
+try:
+    from .fnguide_snapshot import extract_snapshot
+    from .num_parse import clean_num, safe_float, safe_int
+except ImportError:
+    from fnguide_snapshot import extract_snapshot
+    from num_parse import clean_num, safe_float, safe_int
+
+# Leave one core for the event loop / Flask (an unparsable env value keeps the default)
+PARSE_WORKERS = max(0, safe_int(os.environ.get("KR_ETF_PARSE_WORKERS"),
+                                max(1, min(4, (os.cpu_count() or 2) - 1))))
+
+HISTORY_DATE_KEYS = ["지급기준일", "분배기준일", "기준일", "지급일", "일자", "날짜"]
+HISTORY_AMOUNT_KEYS = ["분배금", "현금분배", "현금 분배", "분배금(원)", "현금분배(원)", "금액"]
+
+
+# =========================
+# Worker functions (picklable, module level)
+# =========================
+def parse_fnguide_snapshot(html):
+    """FnGuide etf_snapshot HTML -> (yield, dist_recent, dist_base_date, dist_freq_1y, name)"""
+    if not html:
+        return 0.0, 0, "", 0, ""
+    snap = extract_snapshot(html)
+    return (
+        safe_float(clean_num(snap["yield"]) or 0.0),
+        safe_int(clean_num(snap["dist_recent"]) or 0),
+        snap["dist_base_date"],
+        safe_int(clean_num(snap["dist_freq_1y"]) or 0),
+        snap["name"],
+    )
+
+
+def extract_history_from_html_tables(html):
+    """Distribution tables in the HTML -> [(date, amount)] newest first"""
+    rows = []
+    try:
+        tables = pd.read_html(StringIO(html))
+    except Exception:
+        return rows
+
+    def find_col(cols, keys):
+        for c in cols:
+            cs = str(c).replace(" ", "")
+            if any(k.replace(" ", "") in cs for k in keys):
+                return c
+        return None
+
+    for t in tables:
+        try:
+            cols = list(t.columns)
+            date_col = find_col(cols, HISTORY_DATE_KEYS)
+            amt_col = find_col(cols, HISTORY_AMOUNT_KEYS)
+            if date_col is None or amt_col is None:
+                continue
+
+            sub = t[[date_col, amt_col]].dropna()
+            # Column-wise parsing (same rules as loader._parse_date_any / num_parse.clean_num)
+            dates = pd.to_datetime(
+                sub[date_col].astype(str).str.strip().str.replace(r"[/.]", "-", regex=True),
+                format="%Y-%m-%d", errors="coerce"
+            )
+            amts = sub[amt_col].astype(str).str.replace(r"[^\d\.\-]", "", regex=True)
+            ok = dates.notna() & amts.str.isdigit()
+            rows.extend(zip(dates[ok].dt.date.tolist(), amts[ok].astype(int).tolist()))
+        except Exception:
+            continue
+
+    rows = list(set(rows))
+    rows.sort(key=lambda x: x[0], reverse=True)
+    return rows
+
+
+def _warm_up():
+    """Worker initializer: pay the pandas/lxml import and first-parse cost before real work arrives."""
+    try:
+        pd.read_html(StringIO("<table><tr><th>일자</th><th>분배금</th></tr><tr><td>2024-01-02</td><td>10</td></tr></table>"))
+    except Exception:
+        pass
+
+
+# =========================
+# Pool
+# =========================
+class ParsePool:
+    """
+    ProcessPoolExecutor for one update run: start() before, shutdown() after.
+    run() falls back to a thread while no pool is running.
+    """
+
+    def __init__(self, workers=PARSE_WORKERS):
+        self.workers = workers
+        self._executor = None
+
+    def start(self):
+        if self._executor is not None or self.workers <= 0:
+            return
+        try:
+            # spawn: the parent runs the aiohttp loop and Flask threads, which fork would copy mid-lock
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            # Spawn every worker now instead of on the first parse
+            for f in [self._executor.submit(_warm_up) for _ in range(self.workers)]:
+                f.result()
+            print(f"[Parse] {self.workers} parse workers ready")
+        except Exception as e:
+            print(f"[Parse] Process pool unavailable ({e}), parsing in threads")
+            self.shutdown()
+
+    def shutdown(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn, *args):
+        executor = self._executor
+        if executor is not None:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                print("[Parse] Worker died, parsing in threads for the rest of the run")
+                if self._executor is executor:
+                    self.shutdown()
+        return await asyncio.to_thread(fn, *args)
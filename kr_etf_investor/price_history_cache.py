@@ -0,0 +1,208 @@
+"""
+Price History Cache (/api/history)
+✅ 종목별 일봉(OHLCV) 을 data/price_history/<ticker>.csv 에 append-only 로 저장
+   - 재시작 후에도 차트 데이터 유지 (warm start)
+   - 마지막 캐시 날짜 이후(당일 포함)만 추가로 받아옴 → 매번 380일 재조회 없음
+   - 같은 날짜가 여러 번 기록되면 마지막 행이 우선 (장중 당일 봉 갱신)
+✅ 주말/휴장일/장 마감 후에는 마지막 확인이 장 마감 이후면 재조회 생략 (trading_calendar)
+✅ 메모리는 LRU 로 최대 N 종목만 유지
+   - 항목마다 파일 (mtime, size) 를 기억 → 다른 프로세스(샤딩 갱신 워커)가 쓴 파일은 다시 읽음
+✅ 컬럼형 표현: int32 epoch-day 배열 + int64 OHLCV 배열 (행마다 dict/tuple 을 만들지 않음)
+✅ get_cache(dir): /api/history(KRX) 와 loader(Naver 가격 페이지)가 같은 인스턴스/파일을 공유
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+HEADER = "date,open,high,low,close,volume\n"
+BAR_COLUMNS = ["open", "high", "low", "close", "volume"]
+CLOSE = 3
+
+
+def to_epoch_days(dates):
+    """DatetimeIndex / 'YYYY-MM-DD' strings -> int32 days since 1970-01-01"""
+    return pd.to_datetime(dates).values.astype("datetime64[D]").astype(np.int32)
+
+
+def epoch_days_to_str(days):
+    """int days -> ['YYYY-MM-DD', ...]"""
+    return np.asarray(days, dtype=np.int64).astype("datetime64[D]").astype(str).tolist()
+
+
+def _last_wins(days, bars):
+    """Sort by day; for a repeated day the row that comes last wins."""
+    uniq, first_in_reversed = np.unique(days[::-1], return_index=True)
+    return uniq.astype(np.int32), bars[len(days) - 1 - first_in_reversed]
+
+
+class PriceSeries:
+    """Sorted daily bars of one ticker. days: int32[n], bars: int64[n, 5] (open, high, low, close, volume)"""
+
+    def __init__(self, days=None, bars=None):
+        self.days = days if days is not None else np.empty(0, dtype=np.int32)
+        self.bars = bars if bars is not None else np.empty((0, 5), dtype=np.int64)
+        self.stamp = None # (mtime_ns, size) of the file these bars match
+
+    @property
+    def last_date(self):
+        return epoch_days_to_str(self.days[-1:])[0] if len(self.days) else None
+
+
+class PriceHistoryCache:
+    def __init__(self, cache_dir, max_memory=256, refresh_interval=3600):
+        self.cache_dir = cache_dir
+        self.max_memory = max_memory
+        self.refresh_interval = refresh_interval # seconds between incremental fetches
+        self._mem = OrderedDict() # ticker -> PriceSeries (LRU)
+        self._lock = threading.RLock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, ticker):
+        return os.path.join(self.cache_dir, f"{ticker}.csv")
+
+    def _stat(self, ticker):
+        try:
+            st = os.stat(self._path(ticker))
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read_file(self, ticker):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return PriceSeries()
+        try:
+            df = pd.read_csv(path, dtype={"date": str}, on_bad_lines="skip")
+            # Torn line from an interrupted append
+            df[BAR_COLUMNS] = df[BAR_COLUMNS].apply(pd.to_numeric, errors="coerce")
+            df = df.dropna()
+            days = to_epoch_days(df["date"])
+        except Exception as e:
+            print(f"[History] Unreadable cache for {ticker}: {e}")
+            return PriceSeries()
+        series = PriceSeries(*_last_wins(days, df[BAR_COLUMNS].to_numpy(dtype=np.int64)))
+        if len(days) > len(series.days) + 50:
+            self._rewrite(ticker, series) # Drop superseded intraday rows
+        return series
+
+    @staticmethod
+    def _csv_lines(days, bars):
+        return [f"{d},{o},{h},{l},{c},{v}\n" for d, (o, h, l, c, v) in zip(epoch_days_to_str(days), bars.tolist())]
+
+    def _rewrite(self, ticker, series):
+        path = self._path(ticker)
+        temp = path + ".tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            f.write(HEADER)
+            f.writelines(self._csv_lines(series.days, series.bars))
+        os.replace(temp, path)
+
+    def load(self, ticker):
+        with self._lock:
+            series = self._mem.get(ticker)
+            stamp = self._stat(ticker)
+            if series is None or series.stamp != stamp:
+                # New, or written by another process (sharded update worker) since it was read
+                series = self._read_file(ticker)
+                series.stamp = stamp
+                self._mem[ticker] = series
+                while len(self._mem) > self.max_memory:
+                    self._mem.popitem(last=False)
+            else:
+                self._mem.move_to_end(ticker)
+            return series
+
+    def is_fresh(self, ticker, calendar=None):
+        """
+        Checked within refresh_interval (file mtime survives restarts), or, given a
+        trading_calendar, checked after the last close while the market stays shut.
+        """
+        try:
+            checked = os.path.getmtime(self._path(ticker))
+        except OSError:
+            return False
+        if (time.time() - checked) < self.refresh_interval:
+            return True
+        return calendar is not None and calendar.quiet_since(checked) # mtime: epoch seconds
+
+    def fetch_start(self, ticker, default_start):
+        """
+        First date (YYYYMMDD) to request. The last cached day is re-fetched
+        because it may be an unfinished intraday bar.
+        """
+        last = self.load(ticker).last_date
+        if last is None:
+            return default_start
+        return max(last.replace("-", ""), default_start)
+
+    def append(self, ticker, days, bars):
+        """days: int32[n] epoch days, bars: int64[n, 5]. Only new or changed bars hit the file."""
+        path = self._path(ticker)
+        days = np.asarray(days, dtype=np.int32)
+        bars = np.asarray(bars, dtype=np.int64).reshape(-1, 5)
+        with self._lock:
+            series = self.load(ticker)
+            pos = np.searchsorted(series.days, days)
+            known = pos < len(series.days)
+            known[known] = series.days[pos[known]] == days[known]
+            changed = ~known
+            changed[known] = (series.bars[pos[known]] != bars[known]).any(axis=1)
+
+            new_file = not os.path.exists(path)
+            with open(path, 'a', encoding='utf-8') as f:
+                if new_file:
+                    f.write(HEADER)
+                f.writelines(self._csv_lines(days[changed], bars[changed]))
+            os.utime(path) # Marks the check time even when no bars were new
+            series.stamp = self._stat(ticker)
+
+            if changed.any():
+                series.days, series.bars = _last_wins(
+                    np.concatenate([series.days, days[changed]]),
+                    np.concatenate([series.bars, bars[changed]]),
+                )
+
+    def replace(self, ticker, days, bars):
+        """Drops the stored series and writes these bars instead (series that could not be caught up)."""
+        days = np.asarray(days, dtype=np.int32)
+        bars = np.asarray(bars, dtype=np.int64).reshape(-1, 5)
+        with self._lock:
+            series = self.load(ticker)
+            series.days, series.bars = _last_wins(days, bars)
+            self._rewrite(ticker, series)
+            series.stamp = self._stat(ticker)
+
+    def get_columns(self, ticker, since=None):
+        """{"dates": [...], "prices": [...]} (close) from `since` (YYYY-MM-DD) onward."""
+        series = self.load(ticker)
+        start = 0
+        if since is not None:
+            start = int(np.searchsorted(series.days, to_epoch_days([since])[0]))
+        return {
+            "dates": epoch_days_to_str(series.days[start:]),
+            "prices": series.bars[start:, CLOSE].tolist(),
+        }
+
+    def get(self, ticker, since=None):
+        """[{date, price}] (close) from `since` (YYYY-MM-DD) onward."""
+        cols = self.get_columns(ticker, since)
+        return [{"date": d, "price": p} for d, p in zip(cols["dates"], cols["prices"])]
+
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+def get_cache(cache_dir):
+    """Shared PriceHistoryCache per directory (flask routes + loader)."""
+    key = os.path.normcase(os.path.abspath(cache_dir))
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = PriceHistoryCache(cache_dir)
+            _CACHES[key] = cache
+        return cache
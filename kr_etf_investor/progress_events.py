@@ -0,0 +1,70 @@
+"""
+Update Progress Broadcaster (Server-Sent Events)
+✅ 갱신 스레드(load_data 콜백)가 publish() 한 진행 이벤트를 구독자(SSE 연결)마다 큐로 전달
+   - 구독자별 queue.Queue(maxsize) + Lock → 로더 스레드는 절대 블록되지 않음
+   - 느린 구독자의 큐가 가득 차면 가장 오래된 이벤트를 버림 (진행률은 최신 값만 의미 있음)
+✅ 새 구독자는 연결 직후 현재 상태 스냅샷(snapshot 이벤트)부터 받음 (flask_app 에서 전송)
+✅ format_sse(): text/event-stream 프레임 ("id: ..." + "data: {json}", 종류는 data 의 type 필드)
+✅ SSE 연결 하나가 서버 스레드 하나를 계속 잡으므로 구독자는 MAX_SUBSCRIBERS 까지만
+   - 초과 시 subscribe() 가 None → flask_app 이 503, 브라우저는 폴링으로 전환
+
+flask_app.py: /api/system/events (폴링용 /api/system/status 는 그대로 유지)
+"""
+
+import itertools
+import json
+import queue
+import threading
+
+SUBSCRIBER_QUEUE_SIZE = 256
+MAX_SUBSCRIBERS = 32 # open streams (= server threads held); later connections get 503 and poll
+KEEPALIVE_INTERVAL = 15 # seconds between ": keep-alive" comments on an idle stream
+
+
+class ProgressBroadcaster:
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE, max_subscribers=MAX_SUBSCRIBERS):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """New subscriber queue, or None when max_subscribers streams are already open."""
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def publish(self, event_type, **payload):
+        """Queues {"id", "type", **payload} for every subscriber without blocking."""
+        with self._lock:
+            event = {"id": next(self._ids), "type": event_type, **payload}
+            for q in self._subscribers:
+                while True:
+                    try:
+                        q.put_nowait(event)
+                        break
+                    except queue.Full:
+                        try:
+                            q.get_nowait() # Drop the oldest event for a slow client
+                        except queue.Empty:
+                            pass
+        return event
+
+    def make_event(self, event_type, **payload):
+        """Event with the next id that is not queued (e.g. a per-connection snapshot)."""
+        with self._lock:
+            return {"id": next(self._ids), "type": event_type, **payload}
+
+
+def format_sse(event):
+    """One text/event-stream frame."""
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"id: {event['id']}\ndata: {data}\n\n"
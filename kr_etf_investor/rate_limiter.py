@@ -0,0 +1,176 @@
+"""
+Adaptive Per-Host Rate Limiter
+✅ 호스트별(m.stock.naver.com, api.stock.naver.com, comp.fnguide.com ...) 토큰 버킷 + 동시요청 한도
+✅ AIMD: 정상 응답이 이어지면 동시요청/초당요청을 조금씩 올리고,
+   403/429/503 이면 절반으로 줄이고 지터를 섞은 지수 백오프 동안 해당 호스트 요청을 멈춤
+✅ Retry-After 헤더가 있으면 그 시간을 우선
+✅ 샤딩 갱신(loader --shards N)의 워커 프로세스는 scale_limits(1/N) 로 전체 예산을 나눠 씀
+   - 고정 분할: 한 샤드가 받은 429 는 그 샤드만 늦춤 (다른 샤드는 자기 몫을 계속 사용)
+✅ loader 의 fetcher 는 HTTP_CACHE.fetch(session, url, ...) (response_cache.py) 로 요청
+   - 캐시 적중이면 네트워크/리미터를 거치지 않고, 미스·캐시 제외 endpoint 만 limited_get() 으로 전송
+"""
+
+import asyncio
+import random
+import time
+import weakref
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+# rate = requests/second (token refill), concurrency = requests in flight
+HOST_LIMITS = {
+    "m.stock.naver.com": {"rate": 10.0, "max_rate": 40.0, "concurrency": 10, "max_concurrency": 16},
+    "api.stock.naver.com": {"rate": 10.0, "max_rate": 40.0, "concurrency": 10, "max_concurrency": 16},
+    "comp.fnguide.com": {"rate": 5.0, "max_rate": 20.0, "concurrency": 6, "max_concurrency": 12},
+}
+DEFAULT_LIMITS = {"rate": 10.0, "max_rate": 20.0, "concurrency": 8, "max_concurrency": 12}
+
+MIN_RATE = 1.0
+MIN_CONCURRENCY = 1
+THROTTLE_STATUSES = (403, 429, 503)
+BACKOFF_BASE = 1.0 # seconds, doubled per consecutive throttle
+BACKOFF_MAX = 60.0
+RETRY_AFTER_MAX = 120.0
+
+
+def _parse_retry_after(value):
+    """Retry-After in seconds (HTTP-date form is rare here and ignored)."""
+    try:
+        return min(max(float(value), 0.0), RETRY_AFTER_MAX)
+    except (TypeError, ValueError):
+        return None
+
+
+class HostLimiter:
+    def __init__(self, host, rate, max_rate, concurrency, max_concurrency):
+        self.host = host
+        self.rate = rate
+        self.max_rate = max_rate
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.tokens = 1.0
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._healthy = 0 # consecutive successes since the last increase
+        self._throttles = 0 # consecutive throttled responses (backoff exponent)
+        self._last_refill = time.monotonic()
+        self._admit = asyncio.Lock() # FIFO admission, no polling
+        self._slot = asyncio.Event()
+
+    def _refill(self, now):
+        self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self):
+        async with self._admit:
+            while True:
+                while self.in_flight >= self.concurrency:
+                    self._slot.clear()
+                    await self._slot.wait()
+                now = time.monotonic()
+                self._refill(now)
+                wait = max(self.blocked_until - now, (1.0 - self.tokens) / self.rate, 0.0)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self.tokens -= 1.0
+            self.in_flight += 1
+
+    def release(self, status, retry_after=None):
+        """status None = transport error / timeout."""
+        self.in_flight -= 1
+        if status in THROTTLE_STATUSES or status is None:
+            self._on_congestion(status, _parse_retry_after(retry_after))
+        elif status < 500:
+            self._on_success()
+        self._slot.set()
+
+    def _on_success(self):
+        self._throttles = 0
+        self._healthy += 1
+        # Additive increase: +1 slot and +1 req/s per window of healthy responses
+        if self._healthy >= self.concurrency:
+            self._healthy = 0
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+            self.rate = min(self.max_rate, self.rate + 1.0)
+
+    def _on_congestion(self, status, retry_after):
+        self._healthy = 0
+        # Multiplicative decrease
+        self.concurrency = max(MIN_CONCURRENCY, self.concurrency // 2)
+        self.rate = max(MIN_RATE, self.rate / 2)
+        if status is None:
+            return # Timeouts shrink the window but do not pause the host
+        self._throttles += 1
+        if retry_after is None:
+            backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self._throttles - 1))
+            retry_after = backoff * random.uniform(0.5, 1.5)
+        until = time.monotonic() + retry_after
+        if until > self.blocked_until:
+            self.blocked_until = until
+            print(f"[RateLimit] {self.host} HTTP {status}: pause {retry_after:.1f}s, "
+                  f"concurrency={self.concurrency}, rate={self.rate:.1f}/s")
+
+
+class RateLimiter:
+    def __init__(self):
+        self._hosts = {}
+
+    def for_url(self, url):
+        host = urlsplit(url).hostname or ""
+        limiter = self._hosts.get(host)
+        if limiter is None:
+            limiter = HostLimiter(host, **HOST_LIMITS.get(host, DEFAULT_LIMITS))
+            self._hosts[host] = limiter
+        return limiter
+
+    def stats(self):
+        return {h: {"concurrency": l.concurrency, "rate": round(l.rate, 1), "in_flight": l.in_flight}
+                for h, l in self._hosts.items()}
+
+
+def scale_limits(share):
+    """
+    Keep `share` (0..1] of every host budget in this process. Called by sharded
+    update workers before their first request so N shards together stay within one budget.
+
+    The split is static: each shard runs its own AIMD limiter, so a 429 seen by
+    one shard backs off only that shard while the others keep their share.
+    MIN_RATE / MIN_CONCURRENCY floors also let many shards exceed the budget.
+    """
+    for limits in list(HOST_LIMITS.values()) + [DEFAULT_LIMITS]:
+        limits["rate"] = max(MIN_RATE, limits["rate"] * share)
+        limits["max_rate"] = max(MIN_RATE, limits["max_rate"] * share)
+        limits["concurrency"] = max(MIN_CONCURRENCY, int(limits["concurrency"] * share))
+        limits["max_concurrency"] = max(MIN_CONCURRENCY, int(limits["max_concurrency"] * share))
+
+
+# asyncio primitives belong to one loop: one limiter per running loop
+_LIMITERS = weakref.WeakKeyDictionary()
+
+def get_limiter():
+    loop = asyncio.get_running_loop()
+    limiter = _LIMITERS.get(loop)
+    if limiter is None:
+        limiter = RateLimiter()
+        _LIMITERS[loop] = limiter
+    return limiter
+
+
+@asynccontextmanager
+async def limited_get(session, url, **kwargs):
+    """`async with limited_get(session, url, headers=...) as res:` — session.get() through the host limiter."""
+    limiter = get_limiter().for_url(url)
+    await limiter.acquire()
+    status, retry_after = None, None
+    try:
+        async with session.get(url, **kwargs) as res:
+            status, retry_after = res.status, res.headers.get("Retry-After")
+            yield res
+    finally:
+        limiter.release(status, retry_after)
+
+
+async def retry_delay(attempt):
+    """Jittered exponential pause between retries of one fetcher."""
+    await asyncio.sleep(min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5))
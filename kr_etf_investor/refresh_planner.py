@@ -0,0 +1,148 @@
+"""
+Refresh Planner (staleness-driven update)
+✅ 유니버스 필드를 갱신 주기별 클래스로 나누고, 레코드의 fetched_at 에 클래스별 마지막 수집 시각 기록
+   - price         : 현재가/등락/당일 추이      → 분 단위
+   - returns       : 기간 수익률 (Naver 보조값)  → 하루
+   - distributions : 분배금/횟수/히스토리 (FnGuide) → 다음 예상 지급기준일이 지난 뒤에만
+   - identity      : 종목명/섹터               → 일주일
+   - price/returns 는 마지막 수집 이후 장이 열린 적이 없으면(trading_calendar) 주기와 무관하게 fresh
+   - fetched_at 은 KST 기준 (trading_calendar.now_kst) → 서버 시간대와 무관하게 장 운영 시간과 비교
+✅ 오래된 클래스만 골라 종목별로 호출할 최소 endpoint 집합을 계산
+   → 정기 전체 갱신에서 FnGuide HTML/분배 히스토리 재수집을 대부분 생략
+"""
+
+from datetime import datetime, timedelta
+
+try:
+    from .trading_calendar import now_kst
+except ImportError:
+    from trading_calendar import now_kst
+
+FIELD_CLASSES = ("price", "returns", "distributions", "identity")
+
+FRESHNESS = {
+    "price": timedelta(minutes=10),
+    "returns": timedelta(days=1),
+    "identity": timedelta(days=7),
+    "distributions": timedelta(days=31), # Upper bound even if no ex-date is expected
+}
+
+# After an expected ex-date, re-check daily until a newer one shows up (or the grace runs out)
+DIST_RECHECK = timedelta(days=1)
+DIST_GRACE = timedelta(days=10)
+
+# Loader endpoints needed to refresh each class
+CLASS_ENDPOINTS = {
+    "price": {"etf_basic", "intraday"},
+    "returns": {"etf_basic", "price_history"},
+    "identity": {"etf_basic"},
+    "distributions": {"fnguide", "dividend_history"},
+}
+ALL_ENDPOINTS = set().union(*CLASS_ENDPOINTS.values())
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S" # naive KST
+
+
+def _parse_ts(value):
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def fetched_time(record, cls):
+    """When `cls` of a universe record was last fetched (datetime) or None."""
+    return _parse_ts(((record or {}).get("fetched_at") or {}).get(cls))
+
+
+def _parse_day(value):
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def expected_next_ex_date(record):
+    """Last known ex-date + payment interval (dist_freq_1y, else the gap of the last two)."""
+    history = record.get("dist_history") or []
+    dates = sorted(filter(None, (_parse_day(r.get("date")) for r in history)), reverse=True)
+    if not dates:
+        return None
+    freq = record.get("dist_freq_1y") or 0
+    if freq > 0:
+        interval = timedelta(days=365 / freq)
+    elif len(dates) >= 2:
+        interval = dates[0] - dates[1]
+    else:
+        return None
+    return dates[0] + interval
+
+
+def _distributions_stale(record, fetched, now):
+    if now - fetched >= FRESHNESS["distributions"]:
+        return True
+    expected = expected_next_ex_date(record)
+    if expected is None or now < expected:
+        return False
+    # Ex-date has passed: poll daily while the new row may still be missing
+    return now - fetched >= DIST_RECHECK and now <= expected + DIST_GRACE
+
+
+# Classes whose values only move while the market is open
+MARKET_CLASSES = ("price", "returns")
+
+
+def stale_classes(record, now=None, calendar=None):
+    """Field classes of one universe record that need refetching (calendar: trading_calendar.TradingCalendar)."""
+    now = now or now_kst()
+    if not record:
+        return set(FIELD_CLASSES)
+    fetched_at = record.get("fetched_at") or {}
+    stale = set()
+    for cls in FIELD_CLASSES:
+        fetched = _parse_ts(fetched_at.get(cls))
+        if fetched is None:
+            stale.add(cls)
+        elif cls == "distributions":
+            if _distributions_stale(record, fetched, now):
+                stale.add(cls)
+        elif now - fetched >= FRESHNESS[cls]:
+            if cls in MARKET_CLASSES and calendar is not None and calendar.quiet_since(fetched, now):
+                continue
+            stale.add(cls)
+    return stale
+
+
+def endpoints_for(classes):
+    if classes is None:
+        return set(ALL_ENDPOINTS)
+    return set().union(*(CLASS_ENDPOINTS[c] for c in classes)) if classes else set()
+
+
+def plan(universe, tickers, now=None, force=False, calendar=None):
+    """{ticker: stale classes}; tickers with nothing stale are left out."""
+    now = now or now_kst()
+    plans = {}
+    for t in tickers:
+        classes = set(FIELD_CLASSES) if force else stale_classes((universe or {}).get(t), now, calendar)
+        if classes:
+            plans[t] = classes
+    return plans
+
+
+def confirmed_classes(classes, fetched, ok):
+    """
+    Classes whose fetched endpoints all returned data (fetched / ok: endpoint names).
+    A class with a failed source is not stamped, so it stays stale instead of
+    being frozen for its whole freshness window.
+    """
+    return [c for c in classes if (CLASS_ENDPOINTS[c] & set(fetched)) <= set(ok)]
+
+
+def mark_fetched(previous, classes, now=None):
+    """New fetched_at dict: previous timestamps updated for the refreshed classes."""
+    stamp = (now or now_kst()).strftime(TIMESTAMP_FORMAT)
+    fetched_at = dict(previous or {})
+    for cls in classes:
+        fetched_at[cls] = stamp
+    return fetched_at
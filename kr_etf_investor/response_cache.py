@@ -0,0 +1,215 @@
+"""
+HTTP Response Cache (loader sources)
+✅ loader 가 받는 원본 응답(FnGuide HTML, Naver 분배 히스토리/basic/가격 페이지)을
+   data/http_cache/ 에 URL 키로 gzip 압축 저장
+✅ endpoint 종류별 TTL (현재가가 들어 있는 basic / intraday / etfItemList 는 캐시하지 않음)
+   → 중단되었거나 반복된 전체 갱신이 ~1000개 FnGuide 페이지를 다시 받지 않음
+✅ HTTP 200 이라도 body 가 해당 endpoint 의 정상 응답 모양일 때만 저장 (에러/점검 페이지는 캐시 안 함)
+✅ hits / misses 는 reset_stats() 이후 누적 (load_data 가 실행마다 초기화)
+✅ KR_ETF_HTTP_CACHE=offline : TTL 무시, 네트워크 없이 캐시만 사용 (파싱/계산 단계 벤치마크용)
+   KR_ETF_HTTP_CACHE=off     : 캐시 사용 안 함
+
+엔트리 형식: gzip( meta JSON 한 줄 + "\n" + 원본 body )
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+try:
+    from .rate_limiter import limited_get
+except ImportError:
+    from rate_limiter import limited_get
+
+# "on" (default), "off" or "offline"
+HTTP_CACHE_MODE = os.environ.get("KR_ETF_HTTP_CACHE", "on").lower()
+
+def _fnguide_snapshot_page(body):
+    # Error/maintenance pages come back as 200 too; snapshot pages carry the fund name header
+    return b"giName" in body
+
+
+def _json_body(check):
+    def valid(body):
+        try:
+            return bool(check(json.loads(body)))
+        except ValueError:
+            return False
+    return valid
+
+
+# (URL pattern, TTL seconds, body validator); first match wins, unmatched URLs are not cached
+ENDPOINT_TTLS = [
+    (re.compile(r"comp\.fnguide\.com/.*etf_snapshot\.asp"), 12 * 3600, _fnguide_snapshot_page),
+    (re.compile(r"/api/etf/[^/]+/dividend/history"), 6 * 3600,
+     _json_body(lambda d: isinstance(d, dict) and "result" in d)),
+    (re.compile(r"/api/stock/[^/]+/price\?"), 3600, _json_body(lambda d: isinstance(d, list))),
+    (re.compile(r"/api/(etf|stock)/[^/]+/basic"), 0, None), # current price, always live
+    (re.compile(r"api\.stock\.naver\.com/chart/"), 0, None), # intraday, always live
+    (re.compile(r"etfItemList\.nhn"), 0, None), # bulk quotes, always live
+]
+
+# Entries older than this are removed by prune()
+MAX_ENTRY_AGE = 7 * 24 * 3600
+
+
+def _rule_for(url):
+    for pattern, ttl, validator in ENDPOINT_TTLS:
+        if pattern.search(url):
+            return ttl, validator
+    return 0, None
+
+
+def ttl_for(url):
+    return _rule_for(url)[0]
+
+
+def cacheable_body(url, body):
+    """True if `body` looks like a normal response of the URL's endpoint."""
+    validator = _rule_for(url)[1]
+    return bool(body) and (validator is None or validator(body))
+
+
+class CachedResponse:
+    """Subset of aiohttp.ClientResponse used by the loader fetchers."""
+
+    def __init__(self, status, body=b"", encoding="utf-8"):
+        self.status = status
+        self.headers = {}
+        self._body = body
+        self._encoding = encoding or "utf-8"
+
+    async def read(self):
+        return self._body
+
+    async def text(self, encoding=None, errors="strict"):
+        return self._body.decode(encoding or self._encoding, errors=errors)
+
+    async def json(self, **kwargs):
+        return json.loads(self._body)
+
+
+class RecordingResponse:
+    """Live response whose 200 body is stored in the cache once read."""
+
+    def __init__(self, res, cache, url):
+        self._res = res
+        self._cache = cache
+        self._url = url
+        self._body = None
+        self.status = res.status
+        self.headers = res.headers
+
+    async def read(self):
+        if self._body is None:
+            self._body = await self._res.read()
+            if self.status == 200 and cacheable_body(self._url, self._body):
+                await asyncio.to_thread(self._cache.put, self._url, self._body, self._encoding())
+        return self._body
+
+    def _encoding(self):
+        try:
+            return self._res.get_encoding()
+        except Exception:
+            return "utf-8"
+
+    async def text(self, encoding=None, errors="strict"):
+        return (await self.read()).decode(encoding or self._encoding(), errors=errors)
+
+    async def json(self, **kwargs):
+        return json.loads(await self.read())
+
+
+class ResponseCache:
+    def __init__(self, cache_dir, mode=None):
+        self.cache_dir = cache_dir
+        self.mode = mode or HTTP_CACHE_MODE
+        self.hits = 0
+        self.misses = 0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + ".gz")
+
+    def get(self, url, ttl):
+        """(body, encoding) if a usable entry exists, else None."""
+        path = self._path(url)
+        try:
+            age = time.time() - os.path.getmtime(path)
+            if self.mode != "offline" and age >= ttl:
+                return None
+            with gzip.open(path, "rb") as f:
+                meta_line, _, body = f.read().partition(b"\n")
+            meta = json.loads(meta_line)
+        except (OSError, ValueError, EOFError):
+            return None
+        if meta.get("url") != url:
+            return None # Hash collision
+        return body, meta.get("encoding")
+
+    def put(self, url, body, encoding=None):
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        meta = json.dumps({"url": url, "encoding": encoding, "fetched_at": time.time()}).encode("utf-8")
+        fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                f.write(meta + b"\n" + body)
+            os.replace(temp_name, path)
+        except Exception:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+
+    def prune(self, max_age=MAX_ENTRY_AGE):
+        """Delete expired entries. Returns the number removed."""
+        if self.mode == "offline" or not os.path.isdir(self.cache_dir):
+            return 0
+        cutoff = time.time() - max_age
+        removed = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    @asynccontextmanager
+    async def fetch(self, session, url, **kwargs):
+        """
+        Drop-in for limited_get(session, url, ...): serves a fresh cached body,
+        otherwise performs the request and stores a 200 response once it is read.
+        """
+        ttl = ttl_for(url)
+        if self.mode == "off" or (ttl <= 0 and self.mode != "offline"):
+            async with limited_get(session, url, **kwargs) as res:
+                yield res
+            return
+
+        entry = await asyncio.to_thread(self.get, url, ttl)
+        if entry is not None and cacheable_body(url, entry[0]): # Also skips bad entries written by older versions
+            self.hits += 1
+            yield CachedResponse(200, *entry)
+            return
+        if self.mode == "offline":
+            self.misses += 1
+            yield CachedResponse(504)
+            return
+
+        self.misses += 1
+        async with limited_get(session, url, **kwargs) as res:
+            yield RecordingResponse(res, self, url)
@@ -0,0 +1,215 @@
+"""
+KRX Trading Calendar
+✅ KRX 영업일 목록을 data/trading_calendar.json 에 캐시 (지난 날짜만 확정, 하루 1번 이어받기)
+   - 가장 가까운 거래일 / n 거래일 전 을 bisect 로 O(log n) 조회 → 날짜별 역방향 탐색 없음
+   - KRX 조회 실패 시 평일=거래일로 가정 (저장하지 않음)
+   - KRX 호출은 refresh() 에서만 블록 (load_data 시작 시 이벤트 루프 밖에서 호출)
+     조회 메서드는 절대 기다리지 않음: 범위가 오래되면 백그라운드 스레드로 이어받고 그동안 평일 추정
+✅ 장 운영 시간(09:00 ~ 15:30 KST) 인지
+   - is_market_open(), last_settled_close(), quiet_since()
+   - 모든 비교는 KST naive 기준 (epoch / aware datetime 은 to_kst() 로 변환)
+   → 주말/휴장일/장 마감 후에는 가격·일봉 재조회를 건너뜀
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, time as dtime, timedelta, timezone
+
+from pykrx import stock
+
+KST = timezone(timedelta(hours=9))
+MARKET_OPEN = dtime(9, 0)
+MARKET_CLOSE = dtime(15, 30)
+SETTLE_DELAY = timedelta(minutes=10) # Closing auction results reach the quote APIs a bit later
+
+HISTORY_YEARS = 6 # load_data anchors reach back 5 years
+REFRESH_RETRY = 3600 # seconds between KRX calendar fetch attempts
+DATE_FORMAT = "%Y%m%d"
+
+
+def now_kst():
+    """Naive datetime in KST (market hours are compared against this)."""
+    return datetime.now(KST).replace(tzinfo=None)
+
+
+def to_kst(value):
+    """Naive KST datetime from an epoch timestamp (e.g. a file mtime), an aware datetime, or a naive KST datetime."""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, KST).replace(tzinfo=None)
+    if value.tzinfo is not None:
+        return value.astimezone(KST).replace(tzinfo=None)
+    return value
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.strptime(value.replace("-", "")[:8], DATE_FORMAT).date()
+    return value
+
+
+class TradingCalendar:
+    def __init__(self, path):
+        self.path = path
+        self._ordinals = [] # sorted date.toordinal() of known trading days
+        self._covered_to = date.min # days up to here are definitive
+        self._last_attempt = 0.0
+        self._loaded = False
+        self._refreshing = False
+        self._lock = threading.RLock()
+
+    # ---------- storage ----------
+    def _load(self):
+        self._loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self._ordinals = sorted(datetime.strptime(d, DATE_FORMAT).toordinal() for d in data["days"])
+            self._covered_to = datetime.strptime(data["covered_to"], DATE_FORMAT).date()
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.exists(self.path):
+                print(f"[Calendar] Unreadable {self.path}: {e}")
+
+    def _save(self):
+        temp = self.path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({
+                "covered_to": self._covered_to.strftime(DATE_FORMAT),
+                "days": [date.fromordinal(o).strftime(DATE_FORMAT) for o in self._ordinals],
+            }, f)
+        os.replace(temp, self.path)
+
+    def refresh(self, today=None):
+        """
+        Extends the cached range through yesterday (at most one KRX attempt per
+        REFRESH_RETRY). Blocks on KRX: call it outside the event loop.
+        """
+        today = today or now_kst().date()
+        yesterday = today - timedelta(days=1)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if self._covered_to >= yesterday or time.time() - self._last_attempt < REFRESH_RETRY:
+                return
+            self._last_attempt = time.time()
+            start = max(self._covered_to + timedelta(days=1), today - timedelta(days=366 * HISTORY_YEARS))
+        try:
+            days = stock.get_previous_business_days(
+                fromdate=start.strftime(DATE_FORMAT), todate=yesterday.strftime(DATE_FORMAT))
+        except Exception as e:
+            print(f"[Calendar] KRX business days unavailable ({e}), assuming weekdays")
+            return
+        if not days:
+            return # Failed lookups come back empty as well; keep the weekday fallback
+        with self._lock:
+            known = set(self._ordinals)
+            known.update(_to_date(d).toordinal() for d in days)
+            self._ordinals = sorted(known)
+            self._covered_to = max(self._covered_to, yesterday)
+            self._save()
+        print(f"[Calendar] {len(days)} trading days cached through {yesterday}")
+
+    def _ensure(self):
+        """Loads the cache; a stale range is extended in the background so lookups never wait for KRX."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            yesterday = now_kst().date() - timedelta(days=1)
+            if (self._covered_to >= yesterday or self._refreshing
+                    or time.time() - self._last_attempt < REFRESH_RETRY):
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    # ---------- days ----------
+    def is_trading_day(self, value):
+        d = _to_date(value)
+        self._ensure()
+        if d > self._covered_to:
+            return d.weekday() < 5 # Not settled yet: weekday guess
+        i = bisect.bisect_left(self._ordinals, d.toordinal())
+        return i < len(self._ordinals) and self._ordinals[i] == d.toordinal()
+
+    def on_or_before(self, value):
+        """Latest trading day <= value."""
+        d = _to_date(value)
+        self._ensure()
+        while d > self._covered_to:
+            if d.weekday() < 5:
+                return d
+            d -= timedelta(days=1)
+        i = bisect.bisect_right(self._ordinals, d.toordinal()) - 1
+        if i >= 0:
+            return date.fromordinal(self._ordinals[i])
+        while d.weekday() >= 5: # Range not cached (KRX unavailable)
+            d -= timedelta(days=1)
+        return d
+
+    def previous(self, value, n=1):
+        """n-th trading day strictly before value."""
+        d = _to_date(value)
+        for _ in range(n):
+            d = self.on_or_before(d - timedelta(days=1))
+        return d
+
+    def latest_data_day(self, now=None):
+        """Newest day KRX/Naver already have quotes for (today once the market has opened)."""
+        now = now or now_kst()
+        today = now.date()
+        if self.is_trading_day(today) and now.time() >= MARKET_OPEN:
+            return today
+        return self.previous(today)
+
+    def anchor_day(self, value, now=None):
+        """Trading day whose closes stand for `value` (never past latest_data_day)."""
+        return self.on_or_before(min(_to_date(value), self.latest_data_day(now)))
+
+    # ---------- market hours ----------
+    def is_market_open(self, now=None):
+        """Regular session, including the settle delay after the close."""
+        now = now or now_kst()
+        if not self.is_trading_day(now):
+            return False
+        settled = datetime.combine(now.date(), MARKET_CLOSE) + SETTLE_DELAY
+        return MARKET_OPEN <= now.time() and now < settled
+
+    def last_settled_close(self, now=None):
+        """Datetime at which the most recent finished session's closes became final."""
+        now = now or now_kst()
+        today = now.date()
+        settled = datetime.combine(today, MARKET_CLOSE) + SETTLE_DELAY
+        if self.is_trading_day(today) and now >= settled:
+            return settled
+        return datetime.combine(self.previous(today), MARKET_CLOSE) + SETTLE_DELAY
+
+    def quiet_since(self, then, now=None):
+        """
+        True if no quote can have changed between `then` and `now` (market closed
+        throughout). Either may be naive KST, aware, or an epoch timestamp.
+        """
+        now = to_kst(now) if now is not None else now_kst()
+        return not self.is_market_open(now) and to_kst(then) >= self.last_settled_close(now)
+
+
+_CALENDARS = {}
+_CALENDARS_LOCK = threading.Lock()
+
+def get_calendar(path):
+    """Shared TradingCalendar per cache file."""
+    key = os.path.normcase(os.path.abspath(path))
+    with _CALENDARS_LOCK:
+        cal = _CALENDARS.get(key)
+        if cal is None:
+            cal = TradingCalendar(path)
+            _CALENDARS[key] = cal
+        return cal
@@ -0,0 +1,307 @@
+"""
+SQLite Universe Store (WAL)
+✅ dividend_universe.json 대체용 임베디드 DB (KR_ETF_UNIVERSE_BACKEND=sqlite)
+   - etf_snapshot : 종목별 스칼라 지표 (sector/가격/수익률 등, 원본 레코드 JSON 포함)
+                    dist_history / trend_1d 원본 JSON 도 별도 컬럼에 그대로 보관 (키가 없으면 NULL)
+   - dist_history : 분배금 히스토리 조회용 행 (universe = 수집 결과, manual = manual_dividend_history.json)
+                    금액은 원본 값 그대로 (소수 분배금 포함), 레코드 복원은 etf_snapshot 의 JSON 사용
+   - daily_prices : 일별 종가
+✅ 바뀐 종목 행만 upsert (row_hash 비교) → 단일 종목 갱신이 전체 파일 재작성이 되지 않음
+✅ Flask 라우트는 상세/필터 조회를 DB 에 직접 질의
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS etf_snapshot (
+    ticker TEXT PRIMARY KEY,
+    name TEXT,
+    sector TEXT,
+    price INTEGER,
+    income_yield REAL,
+    annual_yield_label TEXT,
+    last_updated TEXT,
+    record TEXT NOT NULL,
+    trend_1d TEXT,
+    dist_history TEXT,
+    row_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_snapshot_sector ON etf_snapshot(sector);
+CREATE INDEX IF NOT EXISTS idx_snapshot_yield ON etf_snapshot(income_yield);
+CREATE TABLE IF NOT EXISTS dist_history (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    amount NUMERIC NOT NULL,
+    source TEXT NOT NULL,
+    pos INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (ticker, source, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_dist_date ON dist_history(date);
+CREATE TABLE IF NOT EXISTS daily_prices (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    close INTEGER NOT NULL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_prices_date ON daily_prices(date);
+"""
+
+# Stored in their own table/column instead of the record JSON
+SPLIT_FIELDS = ("dist_history", "trend_1d")
+
+# Columns that may be used in ORDER BY / WHERE without json_extract
+INDEXED_COLUMNS = {
+    "name": "name",
+    "sector": "sector",
+    "price": "price",
+    "income_yield_annual_used": "income_yield",
+    "annual_yield_label": "annual_yield_label",
+    "last_updated": "last_updated",
+}
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class UniverseStore:
+    """
+    One connection per thread (sqlite3 objects are not shared across threads).
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        # DBs created before dist_history was kept as JSON: rows fall back to the dist_history table
+        if "dist_history" not in [r[1] for r in conn.execute("PRAGMA table_info(etf_snapshot)")]:
+            conn.execute("ALTER TABLE etf_snapshot ADD COLUMN dist_history TEXT")
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------- meta ----------
+    def version(self):
+        row = self._conn().execute("SELECT value FROM meta WHERE key='version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _bump_version(self, conn):
+        conn.execute(
+            "INSERT INTO meta(key, value) VALUES('version', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM etf_snapshot").fetchone()[0]
+
+    # ---------- write ----------
+    def upsert_universe(self, records):
+        """
+        records = {ticker: full record}. Rows whose content is unchanged are skipped.
+        Returns the number of tickers written.
+        """
+        conn = self._conn()
+        with self._write_lock:
+            existing = dict(conn.execute("SELECT ticker, row_hash FROM etf_snapshot"))
+            changed = 0
+            try:
+                for ticker, rec in records.items():
+                    core = {k: v for k, v in rec.items() if k not in SPLIT_FIELDS}
+                    core_json = _dumps(core)
+                    trend_json = _dumps(rec["trend_1d"]) if "trend_1d" in rec else None
+                    dist = rec.get("dist_history")
+                    dist_json = _dumps(dist) if "dist_history" in rec else None
+                    row_hash = hashlib.sha1(f"{core_json}\x00{trend_json}\x00{dist_json}".encode("utf-8")).hexdigest()
+                    if existing.get(ticker) == row_hash:
+                        continue
+
+                    conn.execute(
+                        "INSERT INTO etf_snapshot(ticker, name, sector, price, income_yield, annual_yield_label, "
+                        "last_updated, record, trend_1d, dist_history, row_hash) VALUES (?,?,?,?,?,?,?,?,?,?,?) "
+                        "ON CONFLICT(ticker) DO UPDATE SET name=excluded.name, sector=excluded.sector, "
+                        "price=excluded.price, income_yield=excluded.income_yield, "
+                        "annual_yield_label=excluded.annual_yield_label, last_updated=excluded.last_updated, "
+                        "record=excluded.record, trend_1d=excluded.trend_1d, dist_history=excluded.dist_history, "
+                        "row_hash=excluded.row_hash",
+                        (ticker, core.get("name"), core.get("sector"), core.get("price"),
+                         core.get("income_yield_annual_used"), core.get("annual_yield_label"),
+                         core.get("last_updated"), core_json, trend_json, dist_json, row_hash)
+                    )
+                    conn.execute("DELETE FROM dist_history WHERE ticker=? AND source='universe'", (ticker,))
+                    if isinstance(dist, list):
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO dist_history(ticker, date, amount, source, pos) VALUES (?,?,?,'universe',?)",
+                            [(ticker, r["date"], r["amount"], i) for i, r in enumerate(dist)
+                             if isinstance(r, dict) and r.get("date") and r.get("amount") is not None]
+                        )
+                    if core.get("price") and core.get("last_updated"):
+                        conn.execute(
+                            "INSERT INTO daily_prices(ticker, date, close) VALUES (?,?,?) "
+                            "ON CONFLICT(ticker, date) DO UPDATE SET close=excluded.close",
+                            (ticker, core["last_updated"], int(core["price"]))
+                        )
+                    changed += 1
+                if changed:
+                    self._bump_version(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return changed
+
+    def update_fields(self, patches):
+        """patches = {ticker: {field: value}}; only those rows are rewritten."""
+        records = {}
+        for ticker, fields in patches.items():
+            rec = self.get(ticker)
+            if rec is not None:
+                rec.update(fields)
+                records[ticker] = rec
+        return self.upsert_universe(records)
+
+    def import_manual_history(self, manual_data):
+        """manual_dividend_history.json: {ticker: [{date, amount}, ...]}"""
+        rows = []
+        for ticker, items in (manual_data or {}).items():
+            for item in items:
+                if item.get("date") and item.get("amount") is not None:
+                    rows.append((ticker, str(item["date"]).replace("/", "-").replace(".", "-"), item["amount"]))
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("DELETE FROM dist_history WHERE source='manual'")
+            conn.executemany("INSERT OR REPLACE INTO dist_history(ticker, date, amount, source) VALUES (?,?,?,'manual')", rows)
+            conn.commit()
+        return len(rows)
+
+    def upsert_daily_prices(self, ticker, rows):
+        """rows: [(date 'YYYY-MM-DD', close), ...]"""
+        conn = self._conn()
+        with self._write_lock:
+            conn.executemany(
+                "INSERT INTO daily_prices(ticker, date, close) VALUES (?,?,?) "
+                "ON CONFLICT(ticker, date) DO UPDATE SET close=excluded.close",
+                [(ticker, d, int(p)) for d, p in rows]
+            )
+            conn.commit()
+
+    # ---------- read ----------
+    def _assemble(self, record_json, trend_json, dist_json, legacy_dist=None):
+        """
+        Record as it was stored: dist_history / trend_1d only if the record had them.
+        legacy_dist: rows of the dist_history table for DBs written before the JSON column.
+        """
+        rec = json.loads(record_json)
+        if dist_json is not None:
+            rec["dist_history"] = json.loads(dist_json)
+        elif legacy_dist:
+            rec["dist_history"] = legacy_dist
+        if trend_json is not None:
+            rec["trend_1d"] = json.loads(trend_json)
+        return rec
+
+    def _legacy_dist(self, conn, ticker=None):
+        sql = "SELECT ticker, date, amount FROM dist_history WHERE source='universe'"
+        params = ()
+        if ticker is not None:
+            sql += " AND ticker=?"
+            params = (ticker,)
+        dist = {}
+        for t, d, amount in conn.execute(sql + " ORDER BY ticker, pos", params):
+            dist.setdefault(t, []).append({"date": d, "amount": amount})
+        return dist
+
+    def load_all(self, include_history=True):
+        """{ticker: record}; include_history=False leaves dist_history out entirely."""
+        conn = self._conn()
+        dist_col = "dist_history" if include_history else "NULL"
+        rows = conn.execute(f"SELECT ticker, record, trend_1d, {dist_col} FROM etf_snapshot ORDER BY rowid").fetchall()
+        legacy = {}
+        if include_history and any(r[3] is None for r in rows):
+            legacy = self._legacy_dist(conn)
+        return {ticker: self._assemble(record, trend, dist, legacy.get(ticker))
+                for ticker, record, trend, dist in rows}
+
+    def get(self, ticker):
+        conn = self._conn()
+        row = conn.execute("SELECT record, trend_1d, dist_history FROM etf_snapshot WHERE ticker=?",
+                           (ticker,)).fetchone()
+        if row is None:
+            return None
+        legacy = self._legacy_dist(conn, ticker).get(ticker) if row[2] is None else None
+        return self._assemble(row[0], row[1], row[2], legacy)
+
+    def get_records(self, columns):
+        """{ticker: {col: value}} for scalar columns, straight from the record JSON."""
+        conn = self._conn()
+        if not columns:
+            return {t: {} for (t,) in conn.execute("SELECT ticker FROM etf_snapshot ORDER BY rowid")}
+        exprs = ", ".join("json_extract(record, ?)" for _ in columns)
+        out = {}
+        for row in conn.execute(f"SELECT ticker, {exprs} FROM etf_snapshot ORDER BY rowid",
+                                [f'$."{c}"' for c in columns]):
+            out[row[0]] = {c: v for c, v in zip(columns, row[1:]) if v is not None}
+        return out
+
+    def query(self, symbols=None, sector=None, min_yield=None, label=None, sort=None, offset=0, limit=None):
+        """
+        Filtered/paged tickers. Returns (total, [ticker, ...]).
+        sort: field name, '-' prefix for descending; missing values last.
+        """
+        where, params = [], []
+        if symbols:
+            where.append(f"ticker IN ({','.join('?' * len(symbols))})")
+            params.extend(symbols)
+        if sector:
+            where.append("sector = ?")
+            params.append(sector)
+        if min_yield is not None:
+            where.append("income_yield >= ?")
+            params.append(min_yield)
+        if label:
+            where.append("annual_yield_label = ?")
+            params.append(label)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM etf_snapshot{clause}", params).fetchone()[0]
+
+        order = "rowid"
+        order_params = []
+        if sort:
+            desc = sort.startswith("-")
+            key = sort.lstrip("-")
+            if key in INDEXED_COLUMNS:
+                expr = INDEXED_COLUMNS[key]
+            else:
+                expr = "json_extract(record, ?)"
+                order_params.append(f'$."{key}"')
+            order = f"({expr}) IS NULL, {expr} {'DESC' if desc else 'ASC'}"
+            order_params = order_params * 2
+
+        sql = f"SELECT ticker FROM etf_snapshot{clause} ORDER BY {order} LIMIT ? OFFSET ?"
+        rows = conn.execute(sql, params + order_params + [limit if limit is not None else -1, offset])
+        return total, [r[0] for r in rows]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,275 @@
+"""
+Columnar Universe Snapshot
+✅ dividend_universe.json 대신 컬럼 단위 .npy 파일로 저장 (디렉토리 1개)
+   - 숫자/불리언 컬럼: int64 / float64 / bool 배열 (mmap 으로 필요한 컬럼만 읽음)
+   - 문자열 컬럼 (name, sector, 날짜 등): 문자열 테이블 + int32 코드
+   - 리스트/혼합 컬럼 (dist_history, trend_1d ...): 종목별 compact JSON blob + offsets
+✅ 스칼라 지표만 읽을 때 히스토리 리스트를 만들지 않음
+✅ 가격 갱신처럼 일부 컬럼만 바뀌면 해당 컬럼 파일만 다시 씀
+
+레이아웃:
+  dividend_universe.cols/
+    meta.json              # 컬럼 목록/종류, 행 수, 버전 (항상 마지막에 기록)
+    tickers.npy
+    <col>.npy              # kind = i8 / f8 / bool
+    <col>.codes.npy        # kind = str  (+ <col>.table.npy)
+    <col>.blob.npy         # kind = json (+ <col>.offsets.npy)
+    <col>.mask.npy         # 일부 종목에 키가 없는 컬럼만
+    <col>.null.npy         # 값이 명시적 null 인 종목이 있는 컬럼만 (키는 있음)
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+
+# Stands for "key not in the record" (None is a stored JSON null)
+ABSENT = object()
+
+
+def snapshot_dir_for(json_path):
+    """dividend_universe.json -> dividend_universe.cols"""
+    base, _ = os.path.splitext(json_path)
+    return base + ".cols"
+
+
+def _column_kind(values):
+    present = [v for v in values if v is not None and v is not ABSENT]
+    if not present:
+        return "json"
+    if all(isinstance(v, bool) for v in present):
+        return "bool"
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        # Keep exact ints; anything beyond int64 goes to json
+        if all(-2**63 <= v < 2**63 for v in present):
+            return "i8"
+        return "json"
+    if all(isinstance(v, float) for v in present):
+        return "f8"
+    if all(isinstance(v, str) for v in present):
+        return "str"
+    # Lists, dicts and mixed int/float columns keep their exact JSON form
+    return "json"
+
+
+def _column_files(name, kind):
+    if kind == "str":
+        return [f"{name}.codes.npy", f"{name}.table.npy"]
+    if kind == "json":
+        return [f"{name}.blob.npy", f"{name}.offsets.npy"]
+    return [f"{name}.npy"]
+
+
+def _save_npy(directory, filename, arr):
+    # Column file replaced atomically so readers never see a half-written array
+    fd, temp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, arr, allow_pickle=False)
+        os.replace(temp_name, os.path.join(directory, filename))
+    except Exception:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+
+def _remove_if_exists(directory, filename):
+    path = os.path.join(directory, filename)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _write_column(directory, name, kind, values):
+    """
+    values: list aligned to tickers, ABSENT = no key, None = null.
+    Returns (mask flag, nulls flag).
+    """
+    missing = [v is ABSENT for v in values]
+    nulls = [v is None for v in values]
+    has_mask = any(missing)
+    has_nulls = any(nulls)
+    values = [None if v is ABSENT else v for v in values]
+
+    if kind == "i8":
+        _save_npy(directory, f"{name}.npy", np.array([0 if v is None else v for v in values], dtype=np.int64))
+    elif kind == "f8":
+        _save_npy(directory, f"{name}.npy", np.array([0.0 if v is None else v for v in values], dtype=np.float64))
+    elif kind == "bool":
+        _save_npy(directory, f"{name}.npy", np.array([bool(v) for v in values], dtype=np.bool_))
+    elif kind == "str":
+        table = {}
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, v in enumerate(values):
+            codes[i] = table.setdefault("" if v is None else v, len(table))
+        _save_npy(directory, f"{name}.codes.npy", codes)
+        _save_npy(directory, f"{name}.table.npy", np.array(list(table), dtype=np.str_))
+    else:
+        chunks = [b"" if v is None else json.dumps(v, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                  for v in values]
+        offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in chunks], out=offsets[1:])
+        _save_npy(directory, f"{name}.blob.npy", np.frombuffer(b"".join(chunks), dtype=np.uint8))
+        _save_npy(directory, f"{name}.offsets.npy", offsets)
+
+    if has_mask:
+        _save_npy(directory, f"{name}.mask.npy", ~np.array(missing, dtype=np.bool_))
+    else:
+        _remove_if_exists(directory, f"{name}.mask.npy")
+    if has_nulls:
+        _save_npy(directory, f"{name}.null.npy", np.array(nulls, dtype=np.bool_))
+    else:
+        _remove_if_exists(directory, f"{name}.null.npy")
+    return has_mask, has_nulls
+
+
+def _write_meta(directory, meta):
+    meta["version"] = time.time_ns()
+    fd, temp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(temp_name, os.path.join(directory, META_FILE))
+
+
+def read_meta(directory):
+    path = os.path.join(directory, META_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT_VERSION:
+        return None
+    return meta
+
+
+def write_snapshot(directory, universe):
+    """Full write of {ticker: record}. Builds a new directory and swaps it in."""
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    tickers = list(universe.keys())
+    records = [universe[t] for t in tickers]
+
+    columns = {}
+    for rec in records:
+        for k in rec.keys():
+            columns.setdefault(k, None)
+
+    work_dir = tempfile.mkdtemp(dir=parent, prefix=".cols_")
+    try:
+        _save_npy(work_dir, "tickers.npy", np.array(tickers, dtype=np.str_))
+        meta = {"format": FORMAT_VERSION, "rows": len(tickers), "columns": {}}
+        for name in columns:
+            values = [rec.get(name, ABSENT) for rec in records]
+            kind = _column_kind(values)
+            has_mask, has_nulls = _write_column(work_dir, name, kind, values)
+            meta["columns"][name] = {"kind": kind, "mask": has_mask, "nulls": has_nulls}
+        _write_meta(work_dir, meta)
+
+        old_dir = None
+        if os.path.exists(directory):
+            old_dir = directory + f".old_{os.getpid()}_{time.time_ns()}"
+            os.rename(directory, old_dir)
+        os.rename(work_dir, directory)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+
+
+def update_columns(directory, patches):
+    """
+    In-place patch: patches = {ticker: {col: value}}.
+    Only the touched column files are rewritten. Returns False (nothing written)
+    if the patch needs a full rewrite (unknown ticker/column or type change).
+    """
+    meta = read_meta(directory)
+    if meta is None:
+        return False
+    tickers = np.load(os.path.join(directory, "tickers.npy")).tolist()
+    index = {t: i for i, t in enumerate(tickers)}
+
+    by_col = {}
+    for t, fields in patches.items():
+        if t not in index:
+            return False
+        for col, val in fields.items():
+            by_col.setdefault(col, {})[index[t]] = val
+
+    new_columns = {}
+    for col, changes in by_col.items():
+        info = meta["columns"].get(col)
+        if info is None:
+            return False
+        values = read_column(directory, col, meta, missing=ABSENT)
+        for i, v in changes.items():
+            values[i] = v
+        kind = _column_kind(values)
+        # A column left with only nulls fits any kind
+        if kind != info["kind"] and any(v is not None and v is not ABSENT for v in values):
+            return False
+        new_columns[col] = values
+
+    for col, values in new_columns.items():
+        info = meta["columns"][col]
+        info["mask"], info["nulls"] = _write_column(directory, col, info["kind"], values)
+    _write_meta(directory, meta)
+    return True
+
+
+def read_tickers(directory):
+    return np.load(os.path.join(directory, "tickers.npy")).tolist()
+
+
+def read_column(directory, name, meta=None, missing=None):
+    """Python values aligned to tickers (None for nulls, `missing` where the key is absent)."""
+    meta = meta or read_meta(directory)
+    info = meta["columns"][name]
+    kind = info["kind"]
+
+    if kind in ("i8", "f8", "bool"):
+        values = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r").tolist()
+    elif kind == "str":
+        codes = np.load(os.path.join(directory, f"{name}.codes.npy"))
+        table = np.load(os.path.join(directory, f"{name}.table.npy"))
+        values = table[codes].tolist() if len(table) else [""] * len(codes)
+    else:
+        blob = np.load(os.path.join(directory, f"{name}.blob.npy")).tobytes()
+        offsets = np.load(os.path.join(directory, f"{name}.offsets.npy")).tolist()
+        values = [json.loads(blob[offsets[i]:offsets[i + 1]]) if offsets[i + 1] > offsets[i] else None
+                  for i in range(len(offsets) - 1)]
+
+    if info.get("nulls"):
+        nulls = np.load(os.path.join(directory, f"{name}.null.npy")).tolist()
+        values = [None if null else v for v, null in zip(values, nulls)]
+    if info.get("mask"):
+        mask = np.load(os.path.join(directory, f"{name}.mask.npy")).tolist()
+        values = [v if present else missing for v, present in zip(values, mask)]
+    return values
+
+
+def read_columns(directory, columns=None, missing=None):
+    """{col: [values...]} for the requested columns (all if None) plus tickers."""
+    meta = read_meta(directory)
+    if meta is None:
+        return None, {}
+    names = list(meta["columns"]) if columns is None else [c for c in columns if c in meta["columns"]]
+    return read_tickers(directory), {c: read_column(directory, c, meta, missing) for c in names}
+
+
+def read_records(directory, columns=None):
+    """{ticker: {col: value}} with absent keys omitted and nulls kept, like the JSON file."""
+    tickers, cols = read_columns(directory, columns, missing=ABSENT)
+    if tickers is None:
+        return None
+    records = {t: {} for t in tickers}
+    for name, values in cols.items():
+        for t, v in zip(tickers, values):
+            if v is not ABSENT:
+                records[t][name] = v
+    return records
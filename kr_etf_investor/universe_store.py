@@ -0,0 +1,454 @@
+"""
+Universe Store
+✅ dividend_universe.json 을 프로세스당 한 번만 파싱하여 모든 라우트가 공유
+✅ 파일 mtime/size 가 바뀌었을 때만 다시 읽음 (외부 수정 감지)
+✅ loader / price refresh 가 save() 로 쓰면 즉시 캐시 교체 (재파싱 없음)
+✅ 저장 포맷: 컬럼 스냅샷(dividend_universe.cols, universe_snapshot 참고)이 기본,
+   dividend_universe.json 은 호환용 export (둘 중 더 최근 것을 읽음)
+✅ 가격 갱신(update_fields)은 dividend_universe.journal.jsonl 에 패치만 append
+   → 읽을 때 스냅샷 위에 재적용, 일정 크기를 넘으면 스냅샷으로 compact
+   → JSON export 는 save()/merge() 와 compact 때만 다시 씀 (그 사이 가격 패치는 반영 안 됨)
+✅ 갱신 중 완료된 종목은 dividend_universe.checkpoint.jsonl 에 바로 append (UpdateCheckpoint)
+   → 중단/강제 종료된 갱신도 다음 실행 시작 시 병합되어 처음부터 다시 받지 않음
+✅ KR_ETF_UNIVERSE_BACKEND=sqlite 이면 dividend_universe.db (universe_db.UniverseStore) 사용
+   - 바뀐 행만 upsert, dividend_universe.json export 는 기본으로 쓰지 않음
+     (KR_ETF_SQLITE_EXPORT_JSON=1 이거나 export_json() 을 직접 호출할 때만)
+✅ /api/universe 응답 바이트(JSON + gzip/brotli)와 ETag 를 버전당 한 번만 생성
+   - view="full": 전체 레코드 / view="list": 무거운 필드(dist_history 등) 제외
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    from . import universe_snapshot
+    from .universe_db import UniverseStore
+except ImportError:
+    import universe_snapshot
+    from universe_db import UniverseStore
+
+try:
+    import brotli # Optional: pip install brotli
+except ImportError:
+    brotli = None
+
+
+# "columnar" (default) or "sqlite"
+UNIVERSE_BACKEND = os.environ.get("KR_ETF_UNIVERSE_BACKEND", "columnar").lower()
+
+# sqlite backend: also rewrite dividend_universe.json on save()/merge() (off: only explicit export_json())
+SQLITE_EXPORT_JSON = os.environ.get("KR_ETF_SQLITE_EXPORT_JSON", "0") == "1"
+
+# Journal is merged into the snapshot once it grows past this size
+JOURNAL_COMPACT_BYTES = 2 * 1024 * 1024
+
+# Checkpointed tickers of a force=True run count as done for this long after they were written
+CHECKPOINT_RESUME_WINDOW = 6 * 3600
+
+# Per-ticker payloads that the list view does not need (served by the detail endpoint)
+HEAVY_FIELDS = ("dist_history", "price_hist", "intraday_data")
+
+VIEWS = {
+    "full": (),
+    "list": HEAVY_FIELDS,
+}
+
+
+class UniversePayload:
+    """Serialized /api/universe body for one universe version."""
+
+    def __init__(self, version, body):
+        self.version = version
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.encoded = {"identity": body, "gzip": gzip.compress(body, compresslevel=6)}
+        if brotli is not None:
+            self.encoded["br"] = brotli.compress(body, quality=5)
+
+    def etag_for(self, encoding):
+        # Strong validators must differ per representation
+        if encoding == "identity":
+            return self.etag
+        return f"{self.etag}-{encoding}"
+
+
+class PatchJournal:
+    """Append-only JSON-lines log of {ticker: {field: value}} patches."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def size(self):
+        sig = self.signature()
+        return sig[1] if sig else 0
+
+    def append(self, patches):
+        line = json.dumps({"ts": time.time(), "patches": patches}, ensure_ascii=False, separators=(",", ":"))
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def collapsed(self):
+        """All patches merged in order; a torn last line (crash mid-append) is skipped."""
+        merged = {}
+        if not os.path.exists(self.path):
+            return merged
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                for t, fields in entry.get("patches", {}).items():
+                    merged.setdefault(t, {}).update(fields)
+        return merged
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class UpdateCheckpoint:
+    """
+    Append-only JSON-lines log of {ticker: record} finished by a running update.
+    Flushed per line (survives a killed process); merged and cleared by the next load_data.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def for_shard(self, index):
+        """Own file per sharded-update worker process; load()/clear() of the parent cover it."""
+        stem, ext = os.path.splitext(self.path)
+        return UpdateCheckpoint(f"{stem}.shard{index}{ext}")
+
+    def _paths(self):
+        stem, ext = os.path.splitext(self.path)
+        return [self.path] + sorted(glob.glob(f"{glob.escape(stem)}.shard*{ext}"))
+
+    def append(self, ticker, record, force=False):
+        line = json.dumps({"ts": time.time(), "force": force, "ticker": ticker, "record": record},
+                          ensure_ascii=False, separators=(",", ":"))
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+            f.flush()
+
+    def load(self):
+        """
+        ({ticker: record}, {tickers finished by a recent force=True run}).
+        A torn last line is skipped.
+        """
+        records, forced = {}, set()
+        cutoff = time.time() - CHECKPOINT_RESUME_WINDOW
+        for path in self._paths():
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        ticker = entry["ticker"]
+                        records[ticker] = entry["record"]
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if entry.get("force") and entry.get("ts", 0) >= cutoff:
+                        forced.add(ticker)
+        return records, forced
+
+    def clear(self):
+        with self._lock:
+            for path in self._paths():
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+class UniverseCache:
+    """
+    Process-wide cache of the parsed universe file.
+    The returned dict is shared between requests: treat it as read-only
+    and persist changes through save().
+    """
+
+    def __init__(self, path, backend=None):
+        self.path = path
+        self.snapshot_dir = universe_snapshot.snapshot_dir_for(path)
+        self.journal = PatchJournal(os.path.splitext(path)[0] + ".journal.jsonl")
+        self.checkpoint = UpdateCheckpoint(os.path.splitext(path)[0] + ".checkpoint.jsonl")
+        self.version = 0
+        self._data = None
+        self._signature = None
+        self._payloads = {}
+        self._lock = threading.RLock()
+
+        self.store = None
+        if (backend or UNIVERSE_BACKEND) == "sqlite":
+            self.store = UniverseStore(os.path.splitext(path)[0] + ".db")
+            if self.store.count() == 0:
+                self._import_legacy()
+
+    def _import_legacy(self):
+        """First sqlite run: seed the DB from the snapshot/JSON file if present."""
+        legacy = None
+        if universe_snapshot.read_meta(self.snapshot_dir) is not None:
+            legacy = universe_snapshot.read_records(self.snapshot_dir)
+        elif os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        if legacy:
+            n = self.store.upsert_universe(legacy)
+            print(f"[Store] Imported {n} tickers into {self.store.db_path}")
+
+    def _stat_signature(self):
+        """
+        ("snapshot"|"json", mtime_ns, size, journal) of the newest source.
+        The JSON export only wins if it was written after the snapshot
+        (e.g. restored from a backup or synced from the bundled data).
+        With the sqlite backend the DB write counter is the signature.
+        """
+        if self.store is not None:
+            return ("sqlite", self.store.version(), 0, None)
+        sources = []
+        for kind, p in (("snapshot", os.path.join(self.snapshot_dir, universe_snapshot.META_FILE)), ("json", self.path)):
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            sources.append((kind, st.st_mtime_ns, st.st_size))
+        if not sources:
+            return None
+        return max(sources, key=lambda x: (x[1], x[0] == "snapshot")) + (self.journal.signature(),)
+
+    def get(self):
+        """
+        Returns the universe dict ({} if the file does not exist,
+        None if it exists but cannot be parsed).
+        """
+        sig = self._stat_signature()
+        with self._lock:
+            if self._data is not None and sig == self._signature:
+                return self._data
+
+            if sig is None:
+                self._set({}, None)
+                return self._data
+
+            try:
+                if sig[0] == "sqlite":
+                    data = self.store.load_all()
+                elif sig[0] == "snapshot":
+                    data = universe_snapshot.read_records(self.snapshot_dir)
+                    if data is None:
+                        raise ValueError(f"unsupported snapshot format in {self.snapshot_dir}")
+                else:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                if sig[0] != "sqlite":
+                    self._apply_journal(data)
+            except Exception as e:
+                print(f"Error loading universe: {e}")
+                return None
+
+            self._set(data, sig)
+            return self._data
+
+    def get_records(self, columns):
+        """
+        {ticker: {col: value}} for a few scalar columns. Served from memory if
+        the full dict is already loaded, otherwise only those column files are read.
+        """
+        sig = self._stat_signature()
+        with self._lock:
+            if not (self._data is not None and sig == self._signature) and self.store is not None:
+                return self.store.get_records(columns)
+            if not (self._data is not None and sig == self._signature) and sig and sig[0] == "snapshot":
+                try:
+                    records = universe_snapshot.read_records(self.snapshot_dir, columns)
+                    if records is not None:
+                        self._apply_journal(records, columns)
+                        return records
+                except Exception as e:
+                    print(f"Error loading universe columns: {e}")
+            data = self.get()
+            if data is None:
+                return None
+            return {t: {c: info[c] for c in columns if c in info} for t, info in data.items()}
+
+    def _exports_by_default(self):
+        return self.store is None or SQLITE_EXPORT_JSON
+
+    def save(self, data, export_json=None):
+        """
+        Full write (snapshot + optional compact JSON export) and swap the
+        cached dict without re-parsing. export_json=None: on for the
+        columnar backend, SQLITE_EXPORT_JSON for sqlite.
+        """
+        if export_json is None:
+            export_json = self._exports_by_default()
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            if export_json:
+                # Export first: the snapshot written afterwards stays the newest source
+                self.export_json(data)
+            if self.store is not None:
+                self.store.upsert_universe(data) # Unchanged rows are skipped
+            else:
+                # data already contains the journal patches
+                self.journal.clear()
+                universe_snapshot.write_snapshot(self.snapshot_dir, data)
+            self._set(data, self._stat_signature())
+
+    def merge(self, results, export_json=None):
+        """
+        Merge {ticker: record} into the universe (loader partial/full updates).
+        The sqlite backend writes only these tickers' rows and, unless
+        SQLITE_EXPORT_JSON is set, no JSON export.
+        Returns the merged universe dict.
+        """
+        if export_json is None:
+            export_json = self._exports_by_default()
+        with self._lock:
+            merged = dict(self.get() or {})
+            merged.update(results)
+            if self.store is None:
+                self.save(merged, export_json=export_json)
+                return merged
+            if export_json:
+                self.export_json(merged)
+            self.store.upsert_universe(results)
+            self._set(merged, self._stat_signature())
+            return merged
+
+    def update_fields(self, patches):
+        """
+        patches = {ticker: {field: value}}; unknown tickers are ignored.
+        The patch is appended to the journal; the snapshot and the JSON export
+        are rewritten only when the journal is compacted, so the export lags
+        behind until then. Returns the new universe dict.
+        """
+        with self._lock:
+            data = self.get()
+            if data is None:
+                raise ValueError("Universe data not readable")
+            patches = {t: f for t, f in patches.items() if t in data}
+            new_data = dict(data)
+            for t, fields in patches.items():
+                new_data[t] = {**data[t], **fields}
+
+            if self.store is not None:
+                self.store.update_fields(patches)
+                self._set(new_data, self._stat_signature())
+                return new_data
+
+            # Append-only: cost scales with the number of patched tickers
+            self.journal.append(patches)
+            self._set(new_data, self._stat_signature())
+            if self.journal.size() > JOURNAL_COMPACT_BYTES:
+                self.compact()
+            return new_data
+
+    def compact(self):
+        """
+        Fold the journal into the snapshot (touched columns only when possible)
+        and refresh the JSON export.
+        """
+        with self._lock:
+            data = self.get()
+            if data is None:
+                return
+            patches = self.journal.collapsed()
+            if not patches and self._signature[0] == "snapshot":
+                return
+            snapshot_current = self._signature[0] == "snapshot"
+            # Export first: the snapshot written afterwards stays the newest source
+            self.export_json(data)
+            if not (snapshot_current and universe_snapshot.update_columns(self.snapshot_dir, patches)):
+                universe_snapshot.write_snapshot(self.snapshot_dir, data)
+            self.journal.clear()
+            self._signature = self._stat_signature() # Same data, no version bump
+
+    def _apply_journal(self, data, columns=None):
+        for t, fields in self.journal.collapsed().items():
+            if t not in data:
+                continue
+            if columns is not None:
+                fields = {k: v for k, v in fields.items() if k in columns}
+            data[t].update(fields)
+
+    def export_json(self, data=None):
+        """Compact dividend_universe.json for tools that still read the flat file."""
+        if data is None:
+            data = self.get()
+        directory = os.path.dirname(self.path)
+        temp_name = None
+        try:
+            with tempfile.NamedTemporaryFile('w', delete=False, dir=directory, encoding='utf-8', suffix='.tmp') as tf:
+                temp_name = tf.name
+                json.dump(data, tf, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_name, self.path)
+        except Exception:
+            if temp_name and os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+
+    def get_payload(self, view="full"):
+        """
+        Returns the UniversePayload of a view for the current version
+        ([{symbol, data}] list, same shape as before), or None if unreadable.
+        """
+        excluded = VIEWS[view]
+        with self._lock:
+            data = self.get()
+            if data is None:
+                return None
+            payload = self._payloads.get(view)
+            if payload is None or payload.version != self.version:
+                if excluded:
+                    result = [{"symbol": symbol, "data": {k: v for k, v in info.items() if k not in excluded}}
+                              for symbol, info in data.items()]
+                else:
+                    result = [{"symbol": symbol, "data": info} for symbol, info in data.items()]
+                body = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                payload = UniversePayload(self.version, body)
+                self._payloads[view] = payload
+            return payload
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
+            self._signature = None
+            self._payloads = {}
+
+    def _set(self, data, sig):
+        self._data = data
+        self._signature = sig
+        self.version += 1
+
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+def get_cache(path):
+    """Shared UniverseCache per file path (flask routes + loader)."""
+    key = os.path.normcase(os.path.abspath(path))
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = UniverseCache(path)
+            _CACHES[key] = cache
+        return cache
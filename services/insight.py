@@ -66,14 +66,30 @@ def get_sector_rotation(universe_data):
 # ================================
 # 2. Supply & Demand (Investor Trends)
 # ================================
-def get_supply_demand_ranking(universe_tickers=None):
+def _shared_calendar():
+    """loader.TRADING_CALENDAR (KRX trading days), or None if the loader cannot be imported."""
+    try:
+        from kr_etf_investor.loader import TRADING_CALENDAR
+        return TRADING_CALENDAR
+    except Exception:
+        return None
+
+def get_supply_demand_ranking(universe_tickers=None, calendar=None):
     """
     Fetches Net Purchases for Institution & Foreigner for the last 5 trading days.
     Filters to return only ETFs in our universe.
+    calendar: kr_etf_investor.trading_calendar.TradingCalendar (default: the loader's shared one);
+    without one, 7 calendar days are used.
     """
     try:
-        end_date = datetime.now().strftime("%Y%m%d")
-        start_date = (datetime.now() - timedelta(days=7)).strftime("%Y%m%d") # Approx 5 trading days
+        calendar = calendar or _shared_calendar()
+        if calendar is not None:
+            end_day = calendar.latest_data_day()
+            end_date = end_day.strftime("%Y%m%d")
+            start_date = calendar.previous(end_day, 4).strftime("%Y%m%d")
+        else:
+            end_date = datetime.now().strftime("%Y%m%d")
+            start_date = (datetime.now() - timedelta(days=7)).strftime("%Y%m%d") # Approx 5 trading days
         
         # PyKRX: stock.get_market_net_purchases_of_equities_by_ticker(start, end, "KOSPI", investor="기관합계")
         # Retry with KOSPI first, as most ETFs are there.
@@ -0,0 +1,76 @@
+import asyncio
+
+from kr_etf_investor import async_session
+
+CALLS = []
+
+
+@async_session.single_flight(lambda key, delay=0: key)
+async def fetch(session, key, delay=0):
+    CALLS.append(key)
+    await asyncio.sleep(delay)
+    return {"key": key}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_duplicate_requests_share_one_fetch():
+    async def main():
+        session = async_session.RunSession(object())
+        CALLS.clear()
+        a, b = await asyncio.gather(fetch(session, "x", 0.01), fetch(session, "x", 0.01))
+        c = await fetch(session, "x")
+        assert a == b == c == {"key": "x"}
+        assert a is not b # Each caller gets its own copy
+        assert CALLS == ["x"]
+    run(main())
+
+
+def test_scope_releases_finished_responses():
+    async def main():
+        session = async_session.RunSession(object())
+        await fetch(session, "list")
+        with session.scope("069500"):
+            await fetch(session, "069500/basic")
+            assert "069500/basic" in session.memo
+        assert list(session.memo) == ["list"]
+    run(main())
+
+
+def test_memo_is_capped():
+    async def main():
+        session = async_session.RunSession(object(), max_entries=3)
+        for i in range(10):
+            await fetch(session, f"k{i}")
+        assert list(session.memo) == ["k7", "k8", "k9"]
+    run(main())
+
+
+def test_cancelling_last_waiter_cancels_the_fetch():
+    async def main():
+        session = async_session.RunSession(object())
+        first = asyncio.ensure_future(fetch(session, "slow", 10))
+        second = asyncio.ensure_future(fetch(session, "slow", 10))
+        await asyncio.sleep(0.01)
+        shared = session.memo["slow"]
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not shared.done() # Still awaited by `second`
+
+        second.cancel()
+        await asyncio.sleep(0.01)
+        assert shared.cancelled()
+        assert "slow" not in session.memo
+    run(main())
+
+
+def test_plain_session_bypasses_memo():
+    async def main():
+        CALLS.clear()
+        await fetch(object(), "y")
+        await fetch(object(), "y")
+        assert CALLS == ["y", "y"]
+    run(main())
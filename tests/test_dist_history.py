@@ -0,0 +1,26 @@
+from datetime import date
+
+from kr_etf_investor.loader import merge_dist_history
+
+
+def test_fnguide_row_does_not_double_a_naver_payout():
+    # Last run fell back to FnGuide (pay date 2024-02-02); Naver now reports the same payout by ex-date
+    stored = [{"date": "2024-02-02", "amount": 120, "source": "fnguide"},
+              {"date": "2023-12-28", "amount": 110, "source": "naver"}]
+    rows = merge_dist_history([(date(2024, 1, 30), 120)], stored, naver_since="2023-12-28")
+    assert sorted(rows) == [(date(2023, 12, 28), 110, "naver"), (date(2024, 1, 30), 120, "naver")]
+
+
+def test_first_full_fetch_replaces_untagged_rows():
+    stored = [{"date": "2024-02-02", "amount": 120}] # Written before rows were tagged
+    assert merge_dist_history([(date(2024, 1, 30), 120)], stored) == [(date(2024, 1, 30), 120, "naver")]
+
+
+def test_stored_rows_kept_without_new_naver_rows():
+    stored = [{"date": "2024-02-02", "amount": 120, "source": "manual"},
+              {"date": "2024-01-02", "amount": 100}]
+    assert merge_dist_history([], stored) == [(date(2024, 2, 2), 120, "manual"), (date(2024, 1, 2), 100, None)]
+
+    incremental = merge_dist_history([(date(2024, 1, 2), 105)], [{"date": "2024-01-02", "amount": 100}],
+                                     naver_since="2024-01-02")
+    assert incremental == [(date(2024, 1, 2), 105, "naver")] # The fetched row wins on the same date
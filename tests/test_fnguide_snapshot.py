@@ -0,0 +1,64 @@
+import re
+
+import pytest
+
+from kr_etf_investor.fnguide_snapshot import extract_snapshot
+
+SUMMARY_ROWS = (
+    "\t\t<tr>\n\t\t\t<th>배당수익률(%)</th>\n\t\t\t<td class='r'>14.52</td>\n\t\t</tr>\n"
+    "\t\t<tr>\n\t\t\t<th>최근 분배금(원)</th>\n\t\t\t<td class='r'>1,234</td>\n\t\t</tr>\n"
+    "\t\t<tr>\n\t\t\t<th>최근 분배금 지급기준일</th>\n\t\t\t<td class='c'>2026/09/30</td>\n\t\t</tr>\n"
+    "\t\t<tr>\n\t\t\t<th>연 분배횟수(회)</th>\n\t\t\t<td class='r'>12</td>\n\t\t</tr>\n"
+)
+
+
+def synthetic_page(summary_rows):
+    """Page shaped like etf_snapshot.asp: scripts, summary table, long holdings table."""
+    return (
+        "<html>\n<head>\n" + "\t<script>\n\t\tvar cfg = {a: 1, b: 2};\n\t</script>\n" * 20
+        + "</head>\n<body>\n\t<h1 id=\"giName\">KODEX 200타겟위클리커버드콜</h1>\n"
+        + "\t<table>\n" + summary_rows + "\t</table>\n"
+        + "\t<table>\n" + "\t\t<tr><td class='c1'>구성종목</td><td class='r2'>1,000</td></tr>\n" * 300
+        + "\t</table>\n</body>\n</html>\n"
+    )
+
+
+def legacy_find_text_by_label(labels, html):
+    """The per-label full-page scan extract_snapshot replaced (old loader._find_text_by_label)."""
+    h = html.replace("\n", " ").replace("\t", " ")
+    for lab in labels:
+        m = re.search(rf"{re.escape(lab)}.*?(\d{{4}}[\/\.\-]\d{{2}}[\/\.\-]\d{{2}}|[0-9]+(?:\.[0-9]+)?)", h)
+        if m:
+            return m.group(1)
+    return ""
+
+
+def legacy_extract(html):
+    m = re.search(r"<h1[^>]*id=\"giName\"[^>]*>(.*?)</h1>", html)
+    return {
+        "yield": legacy_find_text_by_label(["배당수익률", "배당수익률(%)"], html),
+        "dist_recent": legacy_find_text_by_label(["최근 분배금", "최근 분배금(원)"], html),
+        "dist_base_date": legacy_find_text_by_label(["최근 분배금 지급기준일"], html),
+        "dist_freq_1y": legacy_find_text_by_label(["연 분배횟수", "연 분배횟수(회)"], html),
+        "name": m.group(1).strip() if m else "",
+    }
+
+
+PAGES = {
+    "distributing": synthetic_page(SUMMARY_ROWS),
+    "no_distributions": synthetic_page(""),
+    "no_name": SUMMARY_ROWS.replace("14.52", "0"),
+    "partial": "<h1 id=\"giName\">TIGER 미국S&P500</h1>\n<th>연 분배횟수(회)</th>\n<td>4</td>\n<th>배당수익률</th><td>-</td><td>1.2</td>",
+    "empty": "",
+}
+
+
+@pytest.mark.parametrize("name", PAGES)
+def test_matches_legacy_extractor(name):
+    assert extract_snapshot(PAGES[name]) == legacy_extract(PAGES[name])
+
+
+def test_summary_values():
+    snap = extract_snapshot(PAGES["distributing"])
+    assert (snap["yield"], snap["dist_base_date"], snap["dist_freq_1y"]) == ("14.52", "2026/09/30", "12")
+    assert snap["name"] == "KODEX 200타겟위클리커버드콜"
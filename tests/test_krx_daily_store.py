@@ -0,0 +1,68 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from kr_etf_investor import krx_daily_store as kds
+
+TODAY = date(2024, 3, 6)
+
+
+def closes():
+    return pd.DataFrame({kds.CLOSE_COLUMN: [10000, 20000], "거래량": [1, 2]},
+                        index=pd.Index(["069500", "102110"], name="티커"))
+
+
+@pytest.fixture
+def krx(monkeypatch):
+    frames = {}
+    calls = []
+
+    def ohlcv(day):
+        calls.append(day)
+        return frames.get(day, pd.DataFrame())
+
+    monkeypatch.setattr(kds.stock, "get_etf_ohlcv_by_ticker", ohlcv)
+    return frames, calls
+
+
+def test_past_day_is_stored_once(tmp_path, krx):
+    frames, calls = krx
+    frames["20240305"] = closes()
+    store = kds.KrxDailyStore(str(tmp_path))
+    assert list(store.fetch("20240305", TODAY)[kds.CLOSE_COLUMN]) == [10000, 20000]
+
+    reloaded = kds.KrxDailyStore(str(tmp_path))
+    assert list(reloaded.fetch("20240305", TODAY).index) == ["069500", "102110"]
+    assert calls == ["20240305"]
+
+
+def test_today_is_never_stored(tmp_path, krx):
+    frames, calls = krx
+    frames["20240306"] = closes()
+    store = kds.KrxDailyStore(str(tmp_path))
+    store.fetch("20240306", TODAY)
+    store.fetch("20240306", TODAY)
+    assert calls == ["20240306", "20240306"]
+    assert store.load("20240306") is None
+
+
+def test_empty_holiday_is_marked_closed(tmp_path, krx):
+    _, calls = krx
+    store = kds.KrxDailyStore(str(tmp_path), is_trading_day=lambda day: False)
+    assert store.fetch("20240301", TODAY).empty
+    assert kds.KrxDailyStore(str(tmp_path)).is_closed("20240301")
+    assert store.fetch("20240301", TODAY).empty
+    assert calls == ["20240301"]
+
+
+def test_empty_trading_day_is_an_error_and_not_recorded(tmp_path, krx):
+    frames, calls = krx
+    store = kds.KrxDailyStore(str(tmp_path), is_trading_day=lambda day: True)
+    with pytest.raises(ValueError):
+        store.fetch("20240305", TODAY)
+    assert not store.is_closed("20240305")
+
+    frames["20240305"] = closes() # KRX recovered: the next run fetches the day again
+    assert not store.fetch("20240305", TODAY).empty
+    assert calls == ["20240305", "20240305"]
@@ -0,0 +1,14 @@
+from kr_etf_investor.loader import _naver_info_from_record
+
+
+def test_skipped_etf_basic_reuses_raw_naver_returns():
+    record = {"name": "KODEX 200", "price": 35000, "return_1m": 4.2, "return_3m": 7.5,
+              "naver_returns": {"1m": 4.0, "3m": 0}}
+    info = _naver_info_from_record(record)
+    assert info["returns"] == {"1m": 4.0, "3m": 0} # Not the KRX-blended return_* values
+    info["returns"]["1m"] = 0
+    assert record["naver_returns"]["1m"] == 4.0
+
+
+def test_record_without_naver_returns_has_no_fallback():
+    assert _naver_info_from_record({"return_1y": 12.3})["returns"] == {}
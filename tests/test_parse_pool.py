@@ -0,0 +1,28 @@
+import asyncio
+from datetime import date
+
+from kr_etf_investor import parse_pool
+from kr_etf_investor.num_parse import clean_num, safe_int
+
+HTML = """
+<table><tr><th>지급기준일</th><th>분배금(원)</th></tr>
+<tr><td>2024/01/31</td><td>1,250</td></tr>
+<tr><td>2023.12.28</td><td>1,100원</td></tr>
+<tr><td>-</td><td>-</td></tr></table>
+"""
+
+
+def test_history_table_rows_newest_first():
+    assert parse_pool.extract_history_from_html_tables(HTML) == [(date(2024, 1, 31), 1250), (date(2023, 12, 28), 1100)]
+
+
+def test_unstarted_pool_parses_in_a_thread():
+    pool = parse_pool.ParsePool(workers=2) # start() never called
+    rows = asyncio.run(pool.run(parse_pool.extract_history_from_html_tables, HTML))
+    assert rows[0] == (date(2024, 1, 31), 1250)
+
+
+def test_number_helpers():
+    assert clean_num("1,234원") == "1234"
+    assert safe_int("4 workers", 3) == 3
+    assert safe_int(None, 1) == 1
@@ -0,0 +1,50 @@
+import numpy as np
+
+from kr_etf_investor import price_history_cache as phc
+
+
+def bars(*closes):
+    return [(c, c, c, c, 1) for c in closes]
+
+
+def test_append_keeps_last_bar_per_day(tmp_path):
+    cache = phc.PriceHistoryCache(str(tmp_path))
+    cache.append("069500", phc.to_epoch_days(["2024-01-02", "2024-01-03"]), bars(100, 101))
+    cache.append("069500", phc.to_epoch_days(["2024-01-03", "2024-01-04"]), bars(105, 106)) # Intraday bar updated
+    assert cache.get("069500") == [{"date": "2024-01-02", "price": 100},
+                                   {"date": "2024-01-03", "price": 105},
+                                   {"date": "2024-01-04", "price": 106}]
+
+    reloaded = phc.PriceHistoryCache(str(tmp_path))
+    assert reloaded.get_columns("069500", since="2024-01-03") == {"dates": ["2024-01-03", "2024-01-04"],
+                                                                  "prices": [105, 106]}
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    cache = phc.PriceHistoryCache(str(tmp_path))
+    cache.append("069500", phc.to_epoch_days(["2024-01-02"]), bars(100))
+    with open(tmp_path / "069500.csv", "a", encoding="utf-8") as f:
+        f.write("2024-01-03,10")
+    assert phc.PriceHistoryCache(str(tmp_path)).get("069500") == [{"date": "2024-01-02", "price": 100}]
+
+
+def test_replace_drops_the_old_series(tmp_path):
+    cache = phc.PriceHistoryCache(str(tmp_path))
+    cache.append("069500", phc.to_epoch_days(["2020-01-02"]), bars(50))
+    cache.replace("069500", phc.to_epoch_days(["2024-01-03", "2024-01-02"]), bars(101, 100))
+    assert phc.PriceHistoryCache(str(tmp_path)).load("069500").last_date == "2024-01-03"
+    assert cache.get("069500")[0] == {"date": "2024-01-02", "price": 100}
+    assert np.all(np.diff(cache.load("069500").days) > 0)
+
+
+def test_reloads_bars_written_by_another_process(tmp_path):
+    parent = phc.PriceHistoryCache(str(tmp_path))
+    parent.append("069500", phc.to_epoch_days(["2024-01-02"]), bars(100))
+    assert parent.get("069500")[-1]["date"] == "2024-01-02"
+
+    shard = phc.PriceHistoryCache(str(tmp_path)) # Sharded update worker: own instance, same files
+    shard.append("069500", phc.to_epoch_days(["2024-01-03"]), bars(101))
+    assert parent.get("069500")[-1] == {"date": "2024-01-03", "price": 101}
+
+    shard.replace("069500", phc.to_epoch_days(["2024-01-04"]), bars(90))
+    assert parent.get("069500") == [{"date": "2024-01-04", "price": 90}]
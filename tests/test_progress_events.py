@@ -0,0 +1,41 @@
+import json
+
+from kr_etf_investor import progress_events as pe
+
+
+def test_publish_reaches_every_subscriber_in_order():
+    broadcaster = pe.ProgressBroadcaster()
+    a, b = broadcaster.subscribe(), broadcaster.subscribe()
+    broadcaster.publish("started", pct=0)
+    broadcaster.publish("progress", pct=50)
+    for q in (a, b):
+        assert [q.get_nowait()["type"] for _ in range(2)] == ["started", "progress"]
+
+    broadcaster.unsubscribe(a)
+    broadcaster.publish("completed")
+    assert a.empty() and b.get_nowait()["type"] == "completed"
+
+
+def test_slow_subscriber_keeps_the_newest_events():
+    broadcaster = pe.ProgressBroadcaster(queue_size=2)
+    q = broadcaster.subscribe()
+    for pct in range(5):
+        broadcaster.publish("progress", pct=pct)
+    assert [q.get_nowait()["pct"] for _ in range(2)] == [3, 4]
+
+
+def test_subscriber_cap():
+    broadcaster = pe.ProgressBroadcaster(max_subscribers=1)
+    q = broadcaster.subscribe()
+    assert broadcaster.subscribe() is None
+    broadcaster.unsubscribe(q)
+    assert broadcaster.subscribe() is not None
+
+
+def test_sse_frame():
+    broadcaster = pe.ProgressBroadcaster()
+    snapshot = broadcaster.make_event("snapshot", message="갱신 중")
+    frame = pe.format_sse(snapshot)
+    assert frame.startswith(f"id: {snapshot['id']}\ndata: ") and frame.endswith("\n\n")
+    assert json.loads(frame.split("data: ", 1)[1]) == snapshot
+    assert broadcaster.publish("progress")["id"] == snapshot["id"] + 1
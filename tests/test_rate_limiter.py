@@ -0,0 +1,45 @@
+import asyncio
+import copy
+
+from kr_etf_investor import rate_limiter as rl
+
+
+def test_scale_limits_splits_each_host_budget(monkeypatch):
+    monkeypatch.setattr(rl, "HOST_LIMITS", copy.deepcopy(rl.HOST_LIMITS))
+    monkeypatch.setattr(rl, "DEFAULT_LIMITS", dict(rl.DEFAULT_LIMITS))
+    fnguide = dict(rl.HOST_LIMITS["comp.fnguide.com"])
+    rl.scale_limits(0.5)
+    scaled = rl.HOST_LIMITS["comp.fnguide.com"]
+    assert scaled["rate"] == fnguide["rate"] / 2
+    assert scaled["concurrency"] == fnguide["concurrency"] // 2
+
+    rl.scale_limits(0.01) # Floors keep every shard able to make requests
+    assert rl.DEFAULT_LIMITS["rate"] == rl.MIN_RATE
+    assert rl.DEFAULT_LIMITS["concurrency"] == rl.MIN_CONCURRENCY
+
+
+def test_throttle_halves_and_success_grows(monkeypatch):
+    monkeypatch.setattr(rl.random, "uniform", lambda a, b: 1.0)
+
+    async def scenario():
+        limiter = rl.HostLimiter("example.com", rate=8.0, max_rate=9.0, concurrency=4, max_concurrency=5)
+        await limiter.acquire()
+        limiter.release(429, retry_after="2")
+        assert (limiter.concurrency, limiter.rate) == (2, 4.0)
+        assert limiter.blocked_until > 0
+
+        limiter.blocked_until = 0.0
+        for _ in range(2):
+            limiter.tokens = 1.0
+            await limiter.acquire()
+            limiter.release(200)
+        return limiter.concurrency, limiter.rate
+
+    assert asyncio.run(scenario()) == (3, 5.0)
+
+
+def test_retry_after_is_clamped():
+    assert rl._parse_retry_after("5") == 5.0
+    assert rl._parse_retry_after("-3") == 0.0
+    assert rl._parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") is None
+    assert rl._parse_retry_after(str(rl.RETRY_AFTER_MAX * 10)) == rl.RETRY_AFTER_MAX
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from kr_etf_investor import refresh_planner as rp
+
+NOW = datetime(2024, 3, 6, 11, 0) # Wednesday, market open
+
+
+def stamp(dt):
+    return dt.strftime(rp.TIMESTAMP_FORMAT)
+
+
+def record(**ages):
+    return {"fetched_at": {cls: stamp(NOW - age) for cls, age in ages.items()}}
+
+
+class QuietCalendar:
+    def quiet_since(self, then, now=None):
+        return True
+
+
+def test_missing_record_or_stamp_is_stale():
+    assert rp.stale_classes(None, NOW) == set(rp.FIELD_CLASSES)
+    assert rp.stale_classes(record(price=timedelta(minutes=1)), NOW) == {"returns", "identity", "distributions"}
+
+
+def test_freshness_windows():
+    rec = record(price=timedelta(minutes=11), returns=timedelta(hours=2),
+                 identity=timedelta(days=8), distributions=timedelta(days=2))
+    assert rp.stale_classes(rec, NOW) == {"price", "identity"}
+
+
+def test_market_classes_stay_fresh_while_quiet():
+    rec = record(price=timedelta(hours=5), returns=timedelta(days=3),
+                 identity=timedelta(days=1), distributions=timedelta(days=1))
+    assert rp.stale_classes(rec, NOW, QuietCalendar()) == set()
+
+
+def test_distributions_recheck_after_expected_ex_date():
+    rec = record(price=timedelta(0), returns=timedelta(0), identity=timedelta(0),
+                 distributions=timedelta(days=2))
+    rec["dist_freq_1y"] = 12
+    rec["dist_history"] = [{"date": "2024-01-31", "amount": 100}]
+    # Expected ~2024-03-01, fetched 2 days ago (2024-03-04): daily re-check within the grace period
+    assert rp.stale_classes(rec, NOW) == {"distributions"}
+    # Past the grace period only the 31-day bound applies
+    assert "distributions" not in rp.stale_classes(rec, NOW + timedelta(days=15))
+
+
+def test_plan_and_force():
+    universe = {"A": record(price=timedelta(0), returns=timedelta(0), identity=timedelta(0),
+                            distributions=timedelta(0))}
+    assert rp.plan(universe, ["A", "B"], NOW) == {"B": set(rp.FIELD_CLASSES)}
+    assert rp.plan(universe, ["A"], NOW, force=True) == {"A": set(rp.FIELD_CLASSES)}
+
+
+def test_confirmed_classes_skip_failed_sources():
+    fetched = {"etf_basic", "intraday", "fnguide", "dividend_history"}
+    ok = {"etf_basic", "intraday", "dividend_history"} # FnGuide page failed
+    classes = ["price", "identity", "distributions", "returns"]
+    assert rp.confirmed_classes(classes, fetched, ok) == ["price", "identity", "returns"]
+    assert rp.confirmed_classes(["price"], fetched, set()) == []
+
+
+def test_mark_fetched_keeps_other_stamps():
+    previous = {"identity": "2024-01-01T00:00:00"}
+    assert rp.mark_fetched(previous, ["price"], NOW) == {"identity": "2024-01-01T00:00:00", "price": stamp(NOW)}
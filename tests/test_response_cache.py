@@ -0,0 +1,72 @@
+import asyncio
+import contextlib
+
+from kr_etf_investor import response_cache
+
+FNGUIDE_URL = "https://comp.fnguide.com/svo2/asp/etf_snapshot.asp?pGB=1&gicode=A069500"
+HISTORY_URL = "https://m.stock.naver.com/api/etf/069500/dividend/history?page=1&pageSize=20"
+BASIC_URL = "https://m.stock.naver.com/api/etf/069500/basic"
+
+
+class FakeResponse:
+    def __init__(self, body, status=200):
+        self.status = status
+        self.headers = {}
+        self._body = body
+
+    async def read(self):
+        return self._body
+
+    def get_encoding(self):
+        return "utf-8"
+
+
+def fake_limited_get(body, calls):
+    @contextlib.asynccontextmanager
+    async def limited_get(session, url, **kwargs):
+        calls.append(url)
+        yield FakeResponse(body)
+    return limited_get
+
+
+def fetch_body(cache, url):
+    async def main():
+        async with cache.fetch(None, url) as res:
+            return res.status, await res.read()
+    return asyncio.run(main())
+
+
+def test_ttls():
+    assert response_cache.ttl_for(FNGUIDE_URL) == 12 * 3600
+    assert response_cache.ttl_for(BASIC_URL) == 0 # Current price: never cached
+    assert response_cache.ttl_for("https://example.com/") == 0
+
+
+def test_body_validation():
+    assert response_cache.cacheable_body(FNGUIDE_URL, b'<h1 id="giName">KODEX 200</h1>')
+    assert not response_cache.cacheable_body(FNGUIDE_URL, b"<html>service maintenance</html>")
+    assert response_cache.cacheable_body(HISTORY_URL, b'{"result": []}')
+    assert not response_cache.cacheable_body(HISTORY_URL, b"<html>error</html>")
+    assert not response_cache.cacheable_body(HISTORY_URL, b"")
+
+
+def test_valid_response_is_cached(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(response_cache, "limited_get", fake_limited_get(b'{"result": [1]}', calls))
+    cache = response_cache.ResponseCache(str(tmp_path), mode="on")
+    assert fetch_body(cache, HISTORY_URL) == (200, b'{"result": [1]}')
+    assert fetch_body(cache, HISTORY_URL) == (200, b'{"result": [1]}')
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.reset_stats()
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_error_page_is_not_cached(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(response_cache, "limited_get", fake_limited_get(b"<html>error</html>", calls))
+    cache = response_cache.ResponseCache(str(tmp_path), mode="on")
+    fetch_body(cache, FNGUIDE_URL)
+    fetch_body(cache, FNGUIDE_URL)
+    assert len(calls) == 2
+    assert cache.get(FNGUIDE_URL, 3600) is None
@@ -0,0 +1,66 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from kr_etf_investor import trading_calendar as tc
+
+# 2024-03-01 (Fri) is a KRX holiday
+MARCH_2024 = ["20240226", "20240227", "20240228", "20240229",
+              "20240304", "20240305", "20240306", "20240307", "20240308"]
+
+
+@pytest.fixture
+def calendar(tmp_path, monkeypatch):
+    calls = []
+
+    def business_days(fromdate, todate):
+        calls.append((fromdate, todate))
+        return [d for d in MARCH_2024 if fromdate <= d <= todate]
+
+    monkeypatch.setattr(tc.stock, "get_previous_business_days", business_days)
+    cal = tc.TradingCalendar(str(tmp_path / "trading_calendar.json"))
+    cal.refresh(today=date(2024, 3, 9))
+    cal.calls = calls
+    return cal
+
+
+def test_refresh_is_cached_on_disk(calendar, tmp_path):
+    assert len(calendar.calls) == 1
+    calendar.refresh(today=date(2024, 3, 9)) # Already covered: no KRX call
+    assert len(calendar.calls) == 1
+
+    reloaded = tc.TradingCalendar(str(tmp_path / "trading_calendar.json"))
+    reloaded._last_attempt = float("inf") # No background refresh
+    assert not reloaded.is_trading_day("2024-03-01")
+    assert reloaded.is_trading_day(date(2024, 3, 4))
+
+
+def test_anchors_skip_weekends_and_holidays(calendar):
+    assert calendar.on_or_before(date(2024, 3, 3)) == date(2024, 2, 29)
+    assert calendar.previous(date(2024, 3, 4)) == date(2024, 2, 29)
+    assert calendar.previous(date(2024, 3, 8), 4) == date(2024, 3, 4)
+
+    before_open = datetime(2024, 3, 11, 8, 0) # Monday, past the cached range: weekday guess
+    assert calendar.latest_data_day(before_open) == date(2024, 3, 8)
+    assert calendar.latest_data_day(datetime(2024, 3, 11, 9, 5)) == date(2024, 3, 11)
+    assert calendar.anchor_day(date(2024, 3, 10), before_open) == date(2024, 3, 8)
+    assert calendar.anchor_day(date(2024, 3, 1), before_open) == date(2024, 2, 29)
+
+
+def test_quiet_window(calendar):
+    saturday = datetime(2024, 3, 9, 12, 0)
+    assert calendar.quiet_since(datetime(2024, 3, 8, 15, 45), saturday)
+    assert not calendar.quiet_since(datetime(2024, 3, 8, 15, 0), saturday) # Before the settled close
+    assert not calendar.quiet_since(datetime(2024, 3, 9, 10, 0), datetime(2024, 3, 11, 10, 0)) # Market open
+
+    holiday = datetime(2024, 3, 1, 12, 0)
+    assert calendar.quiet_since(datetime(2024, 2, 29, 16, 0), holiday)
+
+
+def test_quiet_window_converts_to_kst(calendar):
+    saturday = datetime(2024, 3, 9, 12, 0)
+    after_close_utc = datetime(2024, 3, 8, 6, 45, tzinfo=timezone.utc) # 15:45 KST
+    assert calendar.quiet_since(after_close_utc, saturday)
+    assert calendar.quiet_since(after_close_utc.timestamp(), saturday)
+    assert not calendar.quiet_since((after_close_utc - timedelta(minutes=30)).timestamp(), saturday)
+    assert tc.to_kst(datetime(2024, 3, 8, 15, 45)) == datetime(2024, 3, 8, 15, 45) # Naive is already KST
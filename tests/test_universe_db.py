@@ -0,0 +1,65 @@
+import os
+import sqlite3
+
+from kr_etf_investor import universe_db, universe_store
+
+RECORDS = {
+    "069500": {"name": "KODEX 200", "price": 35000, "sector": "국내주식",
+               "dist_history": [{"date": "2024-01-31", "amount": 120.5, "source": "naver"},
+                                {"date": "2023-10-31", "amount": 100}]},
+    "498400": {"name": "KODEX 200타겟위클리커버드콜", "price": 10500, "dist_history": []},
+    "000000": {"name": "No history", "price": 1000},
+}
+
+
+def test_records_round_trip_exactly(tmp_path):
+    store = universe_db.UniverseStore(str(tmp_path / "u.db"))
+    store.upsert_universe(RECORDS)
+    assert store.load_all() == RECORDS
+    assert store.get("069500") == RECORDS["069500"]
+    assert "dist_history" not in store.get("000000")
+    assert store.get("498400")["dist_history"] == []
+
+
+def test_load_all_can_skip_history(tmp_path):
+    store = universe_db.UniverseStore(str(tmp_path / "u.db"))
+    store.upsert_universe(RECORDS)
+    assert all("dist_history" not in rec for rec in store.load_all(include_history=False).values())
+
+
+def test_history_rows_keep_fractional_amounts(tmp_path):
+    store = universe_db.UniverseStore(str(tmp_path / "u.db"))
+    store.upsert_universe(RECORDS)
+    rows = store._conn().execute(
+        "SELECT date, amount FROM dist_history WHERE ticker='069500' ORDER BY pos").fetchall()
+    assert rows == [("2024-01-31", 120.5), ("2023-10-31", 100)]
+
+
+def test_unchanged_rows_are_skipped(tmp_path):
+    store = universe_db.UniverseStore(str(tmp_path / "u.db"))
+    assert store.upsert_universe(RECORDS) == 3
+    assert store.upsert_universe(RECORDS) == 0
+    assert store.update_fields({"069500": {"price": 36000}}) == 1
+    assert store.get("069500")["dist_history"] == RECORDS["069500"]["dist_history"]
+
+
+def test_legacy_db_without_history_column(tmp_path):
+    path = str(tmp_path / "u.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(universe_db.SCHEMA.replace("    dist_history TEXT,\n", ""))
+    conn.execute("INSERT INTO etf_snapshot(ticker, record) VALUES ('069500', '{\"price\": 1}')")
+    conn.execute("INSERT INTO dist_history(ticker, date, amount, source, pos) VALUES ('069500', '2024-01-31', 120, 'universe', 0)")
+    conn.commit()
+    conn.close()
+    store = universe_db.UniverseStore(path)
+    assert store.get("069500") == {"price": 1, "dist_history": [{"date": "2024-01-31", "amount": 120}]}
+
+
+def test_sqlite_merge_does_not_export_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(universe_store, "SQLITE_EXPORT_JSON", False)
+    cache = universe_store.UniverseCache(str(tmp_path / "dividend_universe.json"), backend="sqlite")
+    merged = cache.merge(RECORDS)
+    assert merged == RECORDS
+    assert not os.path.exists(cache.path)
+    cache.export_json()
+    assert os.path.exists(cache.path)
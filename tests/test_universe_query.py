@@ -0,0 +1,30 @@
+import types
+
+import pytest
+
+from kr_etf_investor import flask_app
+
+UNIVERSE = {
+    "069500": {"name": "KODEX 200", "income_yield_annual_used": 1.5},
+    "102110": {"name": "TIGER 200", "income_yield_annual_used": 2.5},
+    "458730": {"name": "TIGER 미국배당다우존스", "income_yield_annual_used": 3.5},
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(flask_app, "universe_cache", types.SimpleNamespace(store=None))
+    monkeypatch.setattr(flask_app, "load_universe_data", lambda: UNIVERSE)
+    return flask_app.app.test_client()
+
+
+@pytest.mark.parametrize("query", ["limit=-1", "offset=-2", "offset=-1&limit=2"])
+def test_negative_paging_is_rejected(client, query):
+    assert client.get(f"/api/universe?{query}").status_code == 400
+
+
+def test_paging(client):
+    resp = client.get("/api/universe?sort=-income_yield_annual_used&offset=1&limit=1&fields=name")
+    assert resp.status_code == 200
+    assert resp.headers["X-Total-Count"] == "3"
+    assert resp.get_json() == [{"symbol": "102110", "data": {"name": "TIGER 200"}}]
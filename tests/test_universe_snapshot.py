@@ -0,0 +1,61 @@
+import json
+
+from kr_etf_investor import universe_snapshot, universe_store
+
+UNIVERSE = {
+    "069500": {"name": "KODEX 200", "price": 35000, "yield": 1.5, "listed": True,
+               "dist_base_date": None, "trend_1d": [1, 2, 3],
+               "dist_history": [{"date": "2024-01-31", "amount": 120}]},
+    "498400": {"name": "KODEX 200타겟위클리커버드콜", "price": 10500, "yield": 14.2, "listed": False,
+               "dist_base_date": "2024-09-30"},
+    "000000": {"name": None, "price": None},
+}
+
+
+def test_round_trip_keeps_nulls_and_absent_keys(tmp_path):
+    d = str(tmp_path / "u.cols")
+    universe_snapshot.write_snapshot(d, UNIVERSE)
+    assert universe_snapshot.read_records(d) == UNIVERSE
+
+
+def test_read_column_defaults_absent_to_none(tmp_path):
+    d = str(tmp_path / "u.cols")
+    universe_snapshot.write_snapshot(d, UNIVERSE)
+    assert universe_snapshot.read_column(d, "dist_base_date") == [None, "2024-09-30", None]
+    assert universe_snapshot.read_records(d, ["price"]) == {t: {"price": r["price"]} for t, r in UNIVERSE.items()}
+
+
+def test_update_columns_patches_in_place(tmp_path):
+    d = str(tmp_path / "u.cols")
+    universe_snapshot.write_snapshot(d, UNIVERSE)
+    assert universe_snapshot.update_columns(d, {"498400": {"dist_base_date": None, "price": 10600}})
+    records = universe_snapshot.read_records(d)
+    assert records["498400"]["dist_base_date"] is None
+    assert records["498400"]["price"] == 10600
+    assert "dist_base_date" not in records["000000"]
+
+
+def test_update_columns_needs_rewrite_on_unknown_ticker_or_type_change(tmp_path):
+    d = str(tmp_path / "u.cols")
+    universe_snapshot.write_snapshot(d, UNIVERSE)
+    assert not universe_snapshot.update_columns(d, {"999999": {"price": 1}})
+    assert not universe_snapshot.update_columns(d, {"069500": {"price": "n/a"}})
+    assert universe_snapshot.read_records(d) == UNIVERSE
+
+
+def test_compaction_refreshes_json_export(tmp_path, monkeypatch):
+    cache = universe_store.UniverseCache(str(tmp_path / "dividend_universe.json"), backend="columnar")
+    cache.save(UNIVERSE)
+    cache.update_fields({"069500": {"price": 36000}})
+    with open(cache.path, encoding="utf-8") as f:
+        assert json.load(f)["069500"]["price"] == 35000 # Export lags until compaction
+
+    monkeypatch.setattr(universe_store, "JOURNAL_COMPACT_BYTES", 0)
+    cache.update_fields({"498400": {"price": 10700}})
+    with open(cache.path, encoding="utf-8") as f:
+        exported = json.load(f)
+    assert exported["069500"]["price"] == 36000
+    assert exported["498400"]["price"] == 10700
+
+    cache.invalidate()
+    assert cache.get()["069500"]["price"] == 36000
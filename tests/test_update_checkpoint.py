@@ -0,0 +1,30 @@
+import os
+
+from kr_etf_investor.universe_store import UpdateCheckpoint
+
+
+def test_parent_load_and_clear_cover_shard_files(tmp_path):
+    checkpoint = UpdateCheckpoint(str(tmp_path / "dividend_universe.checkpoint.jsonl"))
+    checkpoint.append("069500", {"price": 1})
+    checkpoint.for_shard(0).append("102110", {"price": 2}, force=True)
+    checkpoint.for_shard(1).append("069500", {"price": 3})
+
+    records, forced = checkpoint.load()
+    assert records == {"069500": {"price": 3}, "102110": {"price": 2}} # Shards load after the parent file
+    assert forced == {"102110"}
+
+    shard_records, _ = checkpoint.for_shard(1).load()
+    assert shard_records == {"069500": {"price": 3}}
+
+    checkpoint.clear()
+    assert checkpoint.load() == ({}, set())
+    assert os.listdir(tmp_path) == []
+
+
+def test_torn_line_is_skipped(tmp_path):
+    checkpoint = UpdateCheckpoint(str(tmp_path / "update.checkpoint.jsonl"))
+    shard = checkpoint.for_shard(0)
+    shard.append("069500", {"price": 1})
+    with open(shard.path, "a", encoding="utf-8") as f:
+        f.write('{"ticker": "102110", "rec')
+    assert checkpoint.load() == ({"069500": {"price": 1}}, set())
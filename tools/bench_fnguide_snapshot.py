@@ -0,0 +1,124 @@
+"""
+FnGuide snapshot extractor micro-benchmark
+  legacy : 라벨마다 전체 HTML 정규식 스캔 4회 + giName 정규식 (기존 loader._find_text_by_label)
+  single : fnguide_snapshot.extract_snapshot (모든 라벨을 한 패턴으로 한 번 훑고, 값을 다 찾으면 중단)
+
+Sample pages (first found):
+  1) python tools/bench_fnguide_snapshot.py <dir with *.html>
+  2) FnGuide etf_snapshot entries in kr_etf_investor/data/http_cache (response_cache.py)
+  3) built-in synthetic page
+"""
+
+import glob
+import gzip
+import io
+import json
+import os
+import re
+import sys
+import timeit
+
+# Run from anywhere: the repository root holds the kr_etf_investor package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from kr_etf_investor.fnguide_snapshot import extract_snapshot
+
+HTTP_CACHE_DIR = os.path.join(ROOT, 'kr_etf_investor', 'data', 'http_cache')
+REPEAT = 20
+
+SUMMARY_ROWS = (
+    "\t\t<tr>\n\t\t\t<th>배당수익률(%)</th>\n\t\t\t<td class='r'>14.52</td>\n\t\t</tr>\n"
+    "\t\t<tr>\n\t\t\t<th>최근 분배금(원)</th>\n\t\t\t<td class='r'>1,234</td>\n\t\t</tr>\n"
+    "\t\t<tr>\n\t\t\t<th>최근 분배금 지급기준일</th>\n\t\t\t<td class='c'>2026/09/30</td>\n\t\t</tr>\n"
+    "\t\t<tr>\n\t\t\t<th>연 분배횟수(회)</th>\n\t\t\t<td class='r'>12</td>\n\t\t</tr>\n"
+)
+
+
+def synthetic_page(summary_rows):
+    """~180 KB page shaped like etf_snapshot.asp (scripts, summary table, holdings table)."""
+    return (
+        "<html>\n<head>\n<title>ETF Snapshot</title>\n"
+        + "\t<script>\n\t\tvar cfg = {a: 1, b: 2};\n\t</script>\n" * 200
+        + "</head>\n<body>\n<div id='compBody'>\n\t<h1 id=\"giName\">KODEX 200타겟위클리커버드콜</h1>\n"
+        + "\t<div class='um_table'>\n\t<table>\n" + summary_rows + "\t</table>\n\t</div>\n"
+        + "\t<table class='us_table_ty1'>\n"
+        + "\t\t<tr><td class='c1'>구성종목</td><td class='r2'>1,000</td></tr>\n" * 3000
+        + "\t</table>\n</div>\n</body>\n</html>\n"
+    )
+
+
+def legacy_find_text_by_label(labels, html):
+    h = html.replace("\n", " ").replace("\t", " ")
+    for lab in labels:
+        m = re.search(
+            rf"{re.escape(lab)}.*?(\d{{4}}[\/\.\-]\d{{2}}[\/\.\-]\d{{2}}|[0-9]+(?:\.[0-9]+)?)",
+            h
+        )
+        if m:
+            return m.group(1)
+    return ""
+
+
+def legacy_extract(html):
+    m = re.search(r"<h1[^>]*id=\"giName\"[^>]*>(.*?)</h1>", html)
+    return {
+        "yield": legacy_find_text_by_label(["배당수익률", "배당수익률(%)"], html),
+        "dist_recent": legacy_find_text_by_label(["최근 분배금", "최근 분배금(원)"], html),
+        "dist_base_date": legacy_find_text_by_label(["최근 분배금 지급기준일"], html),
+        "dist_freq_1y": legacy_find_text_by_label(["연 분배횟수", "연 분배횟수(회)"], html),
+        "name": m.group(1).strip() if m else "",
+    }
+
+
+def load_pages():
+    if len(sys.argv) > 1:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(sys.argv[1], "*.html"))):
+            with open(path, 'rb') as f:
+                raw = f.read()
+            try:
+                pages.append(raw.decode('utf-8'))
+            except UnicodeDecodeError:
+                pages.append(raw.decode('euc-kr', errors='replace'))
+        return pages, sys.argv[1]
+
+    pages = []
+    for path in glob.glob(os.path.join(HTTP_CACHE_DIR, "*", "*.gz")):
+        try:
+            with gzip.open(path, 'rb') as f:
+                meta_line, _, body = f.read().partition(b"\n")
+            meta = json.loads(meta_line)
+        except (OSError, ValueError, EOFError):
+            continue
+        if "etf_snapshot" in meta.get("url", ""):
+            pages.append(body.decode(meta.get("encoding") or 'utf-8', errors='replace'))
+    if pages:
+        return pages, HTTP_CACHE_DIR
+    # Distributing ETF + one without distribution rows (labels missing: full scans)
+    return [synthetic_page(SUMMARY_ROWS), synthetic_page("")], "synthetic"
+
+
+def main():
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    pages, source = load_pages()
+    print(f"Pages: {len(pages)} ({source}), avg {sum(map(len, pages)) // len(pages):,} chars")
+
+    # Both extractors must return the same raw values
+    mismatches = 0
+    for i, html in enumerate(pages):
+        old, new = legacy_extract(html), extract_snapshot(html)
+        if old != new:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  [diff] page {i}: legacy={old} single={new}")
+    print(f"Mismatches: {mismatches}/{len(pages)}")
+
+    for label, fn in [("legacy", legacy_extract), ("single", extract_snapshot)]:
+        sec = min(timeit.repeat(lambda: [fn(p) for p in pages], number=1, repeat=REPEAT))
+        print(f"  {label:<7} {sec / len(pages) * 1000:8.3f} ms/page")
+
+
+if __name__ == "__main__":
+    main()